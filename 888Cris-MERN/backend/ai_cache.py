@@ -0,0 +1,188 @@
+# Cache persistente de respuestas de IA para el generador de documentación 888Cargo
+# Respaldado por SQLite: cada inserción es una transacción atómica y las lecturas son bajo demanda
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_cache (
+    cache_key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    content_type TEXT,
+    timestamp TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL DEFAULT 0
+)
+"""
+
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ai_cache_last_access ON ai_cache (last_access)",
+    "CREATE INDEX IF NOT EXISTS ai_cache_timestamp ON ai_cache (timestamp)",
+)
+
+# Entradas expulsadas por consulta al aplicar los límites LRU
+_EVICTION_BATCH = 64
+
+class AIResponseCache:
+    """
+    Cache clave → respuesta de IA almacenada en SQLite.
+    La base de datos se abre en el primer acceso y nunca se carga completa en memoria;
+    cada set() se confirma por separado (journal WAL), de modo que una interrupción
+    a mitad de escritura no corrompe las entradas ya guardadas.
+
+    Límites opcionales (0 = sin límite): número de entradas y bytes de contenido,
+    aplicados con expulsión LRU, y antigüedad máxima en horas, barrida al guardar.
+    """
+
+    def __init__(self, db_path, max_entries=0, max_bytes=0, ttl_hours=0):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_hours = ttl_hours
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entries = 0
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexión a la base de datos, creada en el primer uso"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute(_SCHEMA)
+                self._upgrade_schema()
+                for index in _INDEXES:
+                    self._conn.execute(index)
+            self._entries, self._bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ai_cache"
+            ).fetchone()
+            self._enforce_limits()
+        return self._conn
+
+    def _upgrade_schema(self):
+        """Añade las columnas de tamaño y último acceso a caches creados sin ellas"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(ai_cache)")}
+        if 'size' not in columns:
+            self._conn.execute("ALTER TABLE ai_cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE ai_cache SET size = LENGTH(CAST(content AS BLOB))")
+        if 'last_access' not in columns:
+            self._conn.execute("ALTER TABLE ai_cache ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+
+    def _ttl_cutoff(self) -> Optional[str]:
+        """Marca de tiempo ISO anterior a la cual una entrada está caducada"""
+        if not self.ttl_hours:
+            return None
+        return (datetime.now() - timedelta(hours=self.ttl_hours)).isoformat()
+
+    def _delete(self, rows, counter):
+        """Elimina las filas (clave, tamaño) indicadas y actualiza totales y contadores"""
+        self._conn.executemany("DELETE FROM ai_cache WHERE cache_key = ?", [(key,) for key, _ in rows])
+        self._entries -= len(rows)
+        self._bytes -= sum(size for _, size in rows)
+        self.stats[counter] += len(rows)
+
+    def _enforce_limits(self):
+        """Barre las entradas caducadas y expulsa las menos usadas hasta cumplir los límites"""
+        with self._conn:
+            cutoff = self._ttl_cutoff()
+            if cutoff:
+                expired = self._conn.execute(
+                    "SELECT cache_key, size FROM ai_cache WHERE timestamp < ?", (cutoff,)
+                ).fetchall()
+                if expired:
+                    self._delete(expired, 'expired')
+
+            while ((self.max_entries and self._entries > self.max_entries)
+                   or (self.max_bytes and self._bytes > self.max_bytes)):
+                victims = self._conn.execute(
+                    "SELECT cache_key, size FROM ai_cache ORDER BY last_access LIMIT ?",
+                    (_EVICTION_BATCH,)
+                ).fetchall()
+                if not victims:
+                    break
+                # Expulsar solo las necesarias del lote, de la menos a la más reciente
+                selected = []
+                entries, size_total = self._entries, self._bytes
+                for key, size in victims:
+                    if not ((self.max_entries and entries > self.max_entries)
+                            or (self.max_bytes and size_total > self.max_bytes)):
+                        break
+                    selected.append((key, size))
+                    entries -= 1
+                    size_total -= size
+                self._delete(selected, 'evictions')
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """Devuelve la entrada {content, content_type, timestamp} vigente o None"""
+        row = self.conn.execute(
+            "SELECT content, content_type, timestamp, size FROM ai_cache WHERE cache_key = ?",
+            (cache_key,)
+        ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+
+        cutoff = self._ttl_cutoff()
+        with self._conn:
+            if cutoff and row[2] < cutoff:
+                self._delete([(cache_key, row[3])], 'expired')
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute(
+                "UPDATE ai_cache SET last_access = ? WHERE cache_key = ?", (time.time(), cache_key)
+            )
+        self.stats['hits'] += 1
+        return {"content": row[0], "content_type": row[1], "timestamp": row[2]}
+
+    def set(self, cache_key: str, entry: Dict):
+        """Guarda (o reemplaza) una entrada en su propia transacción y aplica los límites"""
+        size = len(entry["content"].encode('utf-8'))
+        with self.conn:
+            previous = self._conn.execute(
+                "SELECT size FROM ai_cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (cache_key, content, content_type, timestamp, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, entry["content"], entry.get("content_type"), entry["timestamp"], size, time.time())
+            )
+        if previous:
+            self._bytes += size - previous[0]
+        else:
+            self._entries += 1
+            self._bytes += size
+        self._enforce_limits()
+
+    def summary(self) -> Dict:
+        """Contadores de uso (aciertos, fallos, expulsiones, caducadas) y tamaño actual"""
+        self.conn  # Abre la base de datos y carga los totales si aún no se ha hecho
+        return {**self.stats, 'entries': self._entries, 'bytes': self._bytes}
+
+    def __contains__(self, cache_key: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM ai_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        self.conn  # Abre la base de datos y carga los totales si aún no se ha hecho
+        return self._entries
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        with self.conn:
+            self._conn.execute("DELETE FROM ai_cache")
+        self._entries = 0
+        self._bytes = 0
+
+    def close(self):
+        """Cierra la conexión (se reabrirá en el siguiente acceso)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,97 @@
+# Control de cuota de la API de IA para el generador de documentación 888Cargo
+# Token buckets de peticiones y tokens por minuto, pausa global por Retry-After y backoff con jitter
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+class TokenBucket:
+    """
+    Token bucket asíncrono: se rellena a rate_per_minute unidades por minuto hasta su
+    capacidad (por defecto, un minuto de cuota). Con rate_per_minute = 0 no limita.
+    Los que esperan se atienden en orden de llegada.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Espera hasta disponer de amount unidades y las consume"""
+        if not self.rate:
+            return
+        amount = min(amount, self.capacity)  # Una petición mayor que el bucket no debe bloquearse para siempre
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def refund(self, amount: float):
+        """Devuelve unidades reservadas de más (p. ej. tokens de respuesta no usados)"""
+        if self.rate and amount > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class RateLimiter:
+    """Límites combinados de peticiones y tokens por minuto con pausa global tras un 429"""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._resume_at = 0.0
+
+    async def acquire(self, tokens: int):
+        """Reserva una petición y tokens estimados, respetando cualquier pausa vigente"""
+        delay = self._resume_at - time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._resume_at - time.monotonic()
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+    def refund_tokens(self, tokens: int):
+        """Devuelve tokens reservados y no consumidos"""
+        self.tokens.refund(tokens)
+
+    def defer(self, seconds: float):
+        """Pausa todas las peticiones nuevas durante seconds (p. ej. Retry-After de un 429)"""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Segundos de espera indicados por Retry-After / retry-after-ms (None si no hay)"""
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    retry_after = headers.get('Retry-After')
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Backoff exponencial con jitter completo: aleatorio en [0, min(cap, base·2^intento)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
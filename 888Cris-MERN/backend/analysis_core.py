@@ -0,0 +1,390 @@
+# Núcleo de análisis compartido por los generadores de documentación 888Cargo
+# Un único recorrido del backend (package.json, archivos JavaScript por directorio y esquema de
+# la base de datos) cuyo resultado pueden renderizar tanto el generador básico como el de IA
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from js_lexer import scan_javascript
+from schema_providers import SQLiteSchemaProvider, find_sqlite_database
+from source_walker import find_ignore_root, walk_source_files, map_source, DEFAULT_MAX_FILE_SIZE
+
+# Versión del formato del manifiesto incremental. Incrementar cuando cambie
+# la estructura de analyze_javascript_file para invalidar manifiestos antiguos.
+MANIFEST_VERSION = 4
+
+# Directorios del backend que se documentan, en orden de aparición
+DIRECTORIES_TO_ANALYZE = [
+    'controllers', 'services', 'models', 'repositories',
+    'routes', 'middlewares', 'validators', 'utils', 'config'
+]
+
+# Datos del proyecto usados si package.json no los define
+DEFAULT_PROJECT_INFO = {
+    'name': '888Cargo Backend',
+    'version': '1.0.0',
+    'description': 'Sistema de gestión de listas de empaque con códigos QR',
+    'author': 'FiveCGroup',
+    'license': 'MIT'
+}
+
+class AnalysisManifest:
+    """
+    Manifiesto persistente hash de archivo → resultado de analyze_javascript_file
+    Permite re-analizar únicamente los archivos nuevos, modificados o eliminados
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = Path(manifest_path)
+        self.files = {}
+        self.fingerprint = None
+        self.output_file = None
+        self.seen = set()
+        self.current_hashes = {}
+        self.stats = {'reused': 0, 'analyzed': 0, 'removed': 0}
+        self.load()
+
+    def load(self):
+        """Carga el manifiesto desde disco (si existe y es compatible)"""
+        if not self.manifest_path.exists():
+            return
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Manifiesto incremental ilegible, se reconstruirá: {e}")
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            return
+
+        self.files = data.get('files', {})
+        self.fingerprint = data.get('fingerprint')
+        self.output_file = data.get('output_file')
+
+    def save(self):
+        """Guarda el manifiesto de forma atómica (archivo temporal + reemplazo)"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+
+        data = {
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'output_file': self.output_file,
+            'files': self.files
+        }
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def hash_file(self, rel_path, file_path, stat=None):
+        """
+        Calcula el hash del contenido de un archivo.
+        Si tamaño y mtime coinciden con el manifiesto se reutiliza el hash guardado
+        sin volver a leer el archivo. stat puede venir ya calculado por el recorrido.
+        """
+        if rel_path in self.current_hashes:
+            return self.current_hashes[rel_path]
+
+        stat = stat or file_path.stat()
+        entry = self.files.get(rel_path)
+
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            file_hash = entry['hash']
+        else:
+            with map_source(file_path) as content:
+                file_hash = hashlib.sha256(content).hexdigest()
+            # Contenido idéntico con mtime distinto (p.ej. checkout): refrescar stat
+            if entry and entry.get('hash') == file_hash:
+                entry['size'] = stat.st_size
+                entry['mtime_ns'] = stat.st_mtime_ns
+
+        self.current_hashes[rel_path] = file_hash
+        return file_hash
+
+    def get(self, rel_path, file_hash):
+        """Devuelve el análisis guardado si el hash coincide, None en otro caso"""
+        self.seen.add(rel_path)
+        entry = self.files.get(rel_path)
+
+        if entry and entry.get('hash') == file_hash:
+            self.stats['reused'] += 1
+            return entry.get('analysis')
+        return None
+
+    def put(self, rel_path, file_path, file_hash, analysis):
+        """Registra el análisis de un archivo junto con su hash y metadatos de stat"""
+        stat = file_path.stat()
+        self.seen.add(rel_path)
+        self.stats['analyzed'] += 1
+        self.files[rel_path] = {
+            'hash': file_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'analysis': analysis
+        }
+
+    def prune(self):
+        """Elimina del manifiesto los archivos que ya no existen en el proyecto"""
+        removed = [rel_path for rel_path in self.files if rel_path not in self.seen]
+        for rel_path in removed:
+            del self.files[rel_path]
+        self.stats['removed'] = len(removed)
+        return removed
+
+def analyze_javascript_content(content, rel_path):
+    """
+    Análisis estructural de un código JavaScript (str o buffer de bytes UTF-8).
+
+    Además de lo que muestra el generador básico incluye la complejidad y los comentarios
+    relevantes para el generador con IA ('key_comments': comentarios largos, TODO/FIXME y
+    JSDoc, recortados a 100 caracteres), de modo que un único escaneo sirve a ambos.
+    """
+    # Un único escaneo léxico (ignora el contenido de strings, templates y comentarios)
+    scan = scan_javascript(content)
+
+    key_comments = []
+    for kind, text in scan['comments']:
+        if kind == 'block':
+            continue
+        if kind == 'line' and len(text) < 20 and not text.upper().startswith(('TODO', 'FIXME')):
+            continue
+        if len(text) > 10:
+            key_comments.append(text[:100])  # Limitar longitud
+
+    return {
+        'path': rel_path,
+        'lines': scan['lines'],
+        'functions': scan['functions'],
+        # Métodos estáticos y propiedades de objeto con función como valor, aparte de las funciones
+        'static_methods': scan['static_methods'],
+        'object_methods': scan['object_methods'],
+        'classes': scan['classes'],
+        'exports': scan['exports'],
+        'imports': [module for module in scan['imports'] if not module.startswith('.')],
+        # Comentarios de línea y JSDoc relevantes
+        'comments': [text for kind, text in scan['comments'] if kind != 'block' and len(text) > 10],
+        'key_comments': key_comments,
+        'complexity_score': scan['complexity_score']
+    }
+
+def analyze_javascript_file(file_path, backend_path):
+    """
+    Analiza un archivo JavaScript para extraer información.
+    Función de módulo (sin estado) para poder ejecutarse en un ProcessPoolExecutor.
+    """
+    try:
+        # Escaneo directo sobre los bytes del archivo (mmap si es grande): solo se decodifican
+        # los nombres y comentarios que pasan al documento
+        with map_source(file_path) as content:
+            return analyze_javascript_content(content, str(file_path.relative_to(backend_path)))
+
+    except Exception as e:
+        print(f"Error analizando archivo {file_path}: {e}")
+        return None
+
+@dataclass
+class DirectoryScan:
+    """Archivos JavaScript de un directorio del backend y su análisis, en el mismo orden"""
+    name: str
+    path: Path
+    files: List[Path]
+    analyses: List[Optional[Dict]]
+
+@dataclass
+class ProjectScan:
+    """Resultado de un recorrido completo del backend, reutilizable por varios generadores"""
+    project_info: Dict
+    directories: List[DirectoryScan] = field(default_factory=list)
+    database_schema: Dict = field(default_factory=dict)
+    database_performance: Dict = field(default_factory=dict)
+    # Origen del esquema según su proveedor (p. ej. 'SQLite packing_list.db' o 'mysql 888cargo')
+    database_description: str = ''
+
+    def directory(self, name: str) -> Optional[DirectoryScan]:
+        """Análisis de un directorio por nombre (None si no existe en el backend)"""
+        return next((directory for directory in self.directories if directory.name == name), None)
+
+class AnalysisEngine:
+    """
+    Motor de análisis del backend compartido por los generadores básico y con IA.
+    Recorre los directorios, analiza los archivos (reutilizando el manifiesto incremental si
+    lo hay y repartiendo el trabajo en un pool de procesos si se proporciona), y lee
+    package.json y el esquema de la base de datos a través de un SchemaProvider (por defecto
+    el packing_list.db local si existe).
+    """
+
+    def __init__(self, backend_path, directories=None, max_file_size=DEFAULT_MAX_FILE_SIZE, manifest=None,
+                 exact_row_counts=False, representative_queries=None, schema_provider=None):
+        self.backend_path = Path(backend_path)
+        self.directories = list(directories or DIRECTORIES_TO_ANALYZE)
+        # Archivos mayores (bundles, código generado) se omiten del análisis
+        self.max_file_size = max_file_size
+        self.manifest = manifest
+        # Proveedor del esquema (p. ej. InformationSchemaProvider para un servidor); si no se
+        # indica se usa la base de datos SQLite local con estas opciones
+        self.schema_provider = schema_provider
+        self.exact_row_counts = exact_row_counts
+        self.representative_queries = representative_queries
+        # Los .gitignore se aplican desde la raíz del repositorio: las reglas del proyecto
+        # (build/, dist/, logs/...) están por encima del backend
+        self.ignore_root = find_ignore_root(self.backend_path)
+
+    def walk_js_files(self, dir_path):
+        """Recorre de forma recursiva los .js de un directorio: genera (ruta, stat)"""
+        return walk_source_files(dir_path, max_file_size=self.max_file_size, ignore_root=self.ignore_root)
+
+    def directory_js_files(self, dir_path):
+        """Archivos JavaScript de un directorio y sus subdirectorios, en orden estable"""
+        return [js_file for js_file, _ in self.walk_js_files(dir_path)]
+
+    def analyze_file(self, file_path):
+        """Analiza un archivo JavaScript del backend"""
+        return analyze_javascript_file(file_path, self.backend_path)
+
+    def analyze_files(self, js_files, executor=None):
+        """
+        Analiza una lista de archivos y devuelve los resultados en el mismo orden.
+        Reutiliza el manifiesto en modo incremental y reparte el resto entre el pool de procesos.
+        """
+        results = [None] * len(js_files)
+        pending = []
+
+        for index, js_file in enumerate(js_files):
+            rel_path = file_hash = None
+            if self.manifest:
+                rel_path = str(js_file.relative_to(self.backend_path))
+                file_hash = self.manifest.hash_file(rel_path, js_file)
+                cached = self.manifest.get(rel_path, file_hash)
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            pending.append((index, js_file, rel_path, file_hash))
+
+        pending_files = [js_file for _, js_file, _, _ in pending]
+        if executor and len(pending_files) > 1:
+            # Executor.map conserva el orden de entrada: resultado determinista
+            analyses = executor.map(analyze_javascript_file, pending_files, repeat(self.backend_path))
+        else:
+            analyses = map(self.analyze_file, pending_files)
+
+        for (index, js_file, rel_path, file_hash), analysis in zip(pending, analyses):
+            results[index] = analysis
+            if self.manifest and analysis:
+                self.manifest.put(rel_path, js_file, file_hash, analysis)
+
+        return results
+
+    def analyze_package_json(self):
+        """Datos del proyecto definidos en package.json (vacío si no existe o no se puede leer)"""
+        package_path = self.backend_path.parent / 'package.json'
+
+        if not package_path.exists():
+            return {}
+
+        try:
+            with open(package_path, 'r', encoding='utf-8') as f:
+                package_data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error analizando package.json: {e}")
+            return {}
+
+        info = {
+            'dependencies': package_data.get('dependencies', {}),
+            'devDependencies': package_data.get('devDependencies', {}),
+            'scripts': package_data.get('scripts', {})
+        }
+        for key in ('name', 'version', 'description'):
+            if package_data.get(key):
+                info[key] = package_data[key]
+        return info
+
+    def _get_schema_provider(self):
+        """Proveedor configurado o, si no hay, el de la base de datos SQLite local (None si no existe)"""
+        if self.schema_provider is None:
+            db_path = find_sqlite_database(self.backend_path)
+            if db_path:
+                self.schema_provider = SQLiteSchemaProvider(
+                    db_path, self.exact_row_counts, self.representative_queries
+                )
+        return self.schema_provider
+
+    def analyze_database_schema(self):
+        """Esquema de la base de datos: {tabla: columnas, índices, claves foráneas y filas}"""
+        provider = self._get_schema_provider()
+        if provider is None:
+            print("ℹ️ Sin base de datos: no se encontró packing_list.db ni hay servidor configurado (DOC_DB_DRIVER)")
+            return {}
+
+        try:
+            return provider.analyze_schema()
+        except Exception as e:
+            print(f"Error analizando base de datos ({provider.description}): {e}")
+            return {}
+
+    def database_fingerprint(self):
+        """
+        Huella de la base de datos que usaría el análisis ('none' si no hay ninguna);
+        None si el proveedor no puede calcularla (servidor inaccesible...)
+        """
+        provider = self._get_schema_provider()
+        if provider is None:
+            return 'none'
+
+        try:
+            return provider.fingerprint()
+        except Exception as e:
+            print(f"Error calculando la huella de la base de datos ({provider.description}): {e}")
+            return None
+        finally:
+            provider.close()
+
+    def analyze_database_performance(self, schema_info):
+        """
+        Perfil de rendimiento de la base de datos que el proveedor pueda medir: planes de las
+        consultas representativas, claves foráneas sin índice y estadísticas de páginas
+        """
+        provider = self._get_schema_provider()
+        if provider is None:
+            return {}
+
+        try:
+            return provider.analyze_performance(schema_info)
+        except Exception as e:
+            print(f"Error analizando rendimiento de la base de datos ({provider.description}): {e}")
+            return {}
+
+    def scan(self, executor=None, project_info=None, on_directory=None):
+        """
+        Recorre el backend una vez: package.json, archivos de cada directorio y base de datos.
+        on_directory(nombre) se llama antes de analizar cada directorio (progreso).
+        """
+        info = dict(project_info or DEFAULT_PROJECT_INFO)
+        info.update(self.analyze_package_json())
+        scan = ProjectScan(project_info=info)
+
+        for directory in self.directories:
+            dir_path = self.backend_path / directory
+            if not dir_path.exists():
+                continue
+            if on_directory:
+                on_directory(directory)
+            js_files = self.directory_js_files(dir_path)
+            scan.directories.append(
+                DirectoryScan(directory, dir_path, js_files, self.analyze_files(js_files, executor))
+            )
+
+        scan.database_schema = self.analyze_database_schema()
+        if scan.database_schema:
+            scan.database_performance = self.analyze_database_performance(scan.database_schema)
+        if self.schema_provider:
+            scan.database_description = self.schema_provider.description
+            self.schema_provider.close()
+        return scan
@@ -0,0 +1,396 @@
+# Benchmark del generador de documentación 888Cargo
+# Compara el escáner de una sola pasada (js_lexer) con el análisis por regex anterior, la extracción
+# de endpoints con patrones sueltos frente al registro precompilado (code_patterns),
+# la emisión de párrafos run a run con la emisión en bloque (ParagraphEmitter) y estilos de carácter,
+# el pico de memoria de leer un archivo grande frente a escanearlo mapeado en memoria
+# y la introspección del esquema SQLite tabla a tabla con COUNT(*) frente a una sola consulta
+#
+# Uso: python benchmark_documentation.py [repeticiones]
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+from docx import Document
+from docx.shared import Pt
+
+from analysis_core import AnalysisEngine
+from docx_stream import ParagraphEmitter
+from generate_documentation import RUN_FORMATS, add_character_styles
+from code_patterns import extract_routes
+from js_lexer import scan_javascript
+from schema_providers import SQLiteSchemaProvider
+from source_walker import DEFAULT_MAX_FILE_SIZE, map_source
+
+# Directorios usados como corpus del benchmark
+BENCHMARK_DIRECTORIES = ['controllers', 'services']
+
+# Directorio del benchmark de extracción de endpoints
+ROUTES_DIRECTORY = 'routes'
+
+# Funciones del archivo sintético del benchmark de renderizado
+RENDER_FUNCTION_COUNT = 500
+
+# Tamaño (MB) del archivo sintético tipo bundle del benchmark de memoria
+BUNDLE_SIZE_MB = 8
+
+# Base de datos sintética del benchmark de esquema: tablas pequeñas y dos tablas grandes
+SCHEMA_TABLE_COUNT = 20
+SCHEMA_LARGE_TABLE_ROWS = 500_000
+
+def legacy_javascript_analysis(content):
+    """Ruta regex original de analyze_javascript_file (cinco pasadas sobre el contenido)"""
+    analysis = {
+        'lines': len(content.split('\n')),
+        'functions': [],
+        'classes': [],
+        'exports': [],
+        'imports': [],
+        'comments': []
+    }
+
+    function_pattern = r'(?:function\s+(\w+)|const\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>))'
+    for match in re.finditer(function_pattern, content):
+        func_name = match.group(1) or match.group(2)
+        if func_name:
+            analysis['functions'].append(func_name)
+
+    for match in re.finditer(r'class\s+(\w+)', content):
+        analysis['classes'].append(match.group(1))
+
+    export_pattern = r'(?:module\.exports|export\s+(?:default\s+)?(?:class\s+|function\s+|const\s+)?(\w+))'
+    for match in re.finditer(export_pattern, content):
+        if match.group(1):
+            analysis['exports'].append(match.group(1))
+
+    import_pattern = r'(?:require\([\'"]([^\'"]+)[\'"]\)|import.*from\s+[\'"]([^\'"]+)[\'"])'
+    for match in re.finditer(import_pattern, content):
+        module = match.group(1) or match.group(2)
+        if module and not module.startswith('.'):
+            analysis['imports'].append(module)
+
+    for match in re.finditer(r'//\s*(.+)|/\*\*(.*?)\*/', content, re.DOTALL):
+        comment = match.group(1) or match.group(2)
+        if comment and len(comment.strip()) > 10:
+            analysis['comments'].append(comment.strip())
+
+    return analysis
+
+def legacy_basic_code_analysis(content):
+    """
+    Ruta regex original de _basic_code_analysis (14 patrones + 10 búsquedas de complejidad).
+    Las palabras clave se escapan: el patrón original rf'\\b?\\b' no compila.
+    """
+    analysis = {
+        'lines': len(content.split('\n')),
+        'functions': [],
+        'classes': [],
+        'exports': [],
+        'imports': [],
+        'comments': [],
+        'complexity_score': 0
+    }
+
+    function_patterns = [
+        r'(?:async\s+)?function\s+(\w+)',
+        r'const\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>)',
+        r'(\w+)\s*:\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>)',
+        r'static\s+(?:async\s+)?(\w+)\s*\(',
+    ]
+    for pattern in function_patterns:
+        for match in re.finditer(pattern, content):
+            func_name = match.group(1)
+            if func_name and func_name not in analysis['functions']:
+                analysis['functions'].append(func_name)
+
+    for match in re.finditer(r'class\s+(\w+)(?:\s+extends\s+\w+)?', content):
+        analysis['classes'].append(match.group(1))
+
+    export_patterns = [
+        r'module\.exports\s*=\s*(\w+)',
+        r'export\s+(?:default\s+)?(?:class\s+|function\s+|const\s+)?(\w+)',
+        r'exports\.(\w+)\s*='
+    ]
+    for pattern in export_patterns:
+        for match in re.finditer(pattern, content):
+            if match.group(1):
+                analysis['exports'].append(match.group(1))
+
+    import_patterns = [
+        r'require\([\'"]([^\'"]+)[\'"]\)',
+        r'import.*from\s+[\'"]([^\'"]+)[\'"]',
+        r'import\s+[\'"]([^\'"]+)[\'"]'
+    ]
+    for pattern in import_patterns:
+        for match in re.finditer(pattern, content):
+            module = match.group(1)
+            if module and not module.startswith('.'):
+                analysis['imports'].append(module)
+
+    complexity_keywords = ['if', 'else', 'while', 'for', 'switch', 'case', 'catch', '&&', '||', '?']
+    for keyword in complexity_keywords:
+        analysis['complexity_score'] += len(re.findall(rf'\b{re.escape(keyword)}\b', content))
+
+    comment_patterns = [
+        r'//\s*(.{20,})',
+        r'/\*\*(.*?)\*/',
+        r'//\s*TODO:?\s*(.+)',
+        r'//\s*FIXME:?\s*(.+)',
+    ]
+    for pattern in comment_patterns:
+        for match in re.finditer(pattern, content, re.DOTALL):
+            comment = match.group(1).strip()
+            if len(comment) > 10:
+                analysis['comments'].append(comment[:100])
+
+    return analysis
+
+def legacy_endpoint_extraction(content):
+    """Ruta original de _extract_endpoints_info: un patrón sin compilar y una pasada por método HTTP"""
+    endpoints = []
+    route_patterns = [
+        r'router\.get\([\'"]([^\'"]+)[\'"]',
+        r'router\.post\([\'"]([^\'"]+)[\'"]',
+        r'router\.put\([\'"]([^\'"]+)[\'"]',
+        r'router\.delete\([\'"]([^\'"]+)[\'"]'
+    ]
+    for pattern in route_patterns:
+        for match in re.findall(pattern, content):
+            endpoints.append((pattern.split('\\')[1].replace('.', '').upper(), match))
+    return endpoints
+
+def registry_endpoint_extraction(content):
+    """Extracción con el patrón precompilado del registro (todos los métodos en una pasada)"""
+    return extract_routes(content)
+
+def load_sources(backend_path, directories):
+    """
+    Carga el contenido de los .js de cada directorio del corpus con el mismo recorrido que los
+    generadores (AnalysisEngine: subdirectorios, .gitignore y límite de tamaño DOC_MAX_FILE_KB)
+    """
+    max_file_kb = int(os.getenv('DOC_MAX_FILE_KB', str(DEFAULT_MAX_FILE_SIZE // 1024)))
+    engine = AnalysisEngine(backend_path, max_file_size=max_file_kb * 1024 or None)
+    sources = {}
+    for directory in directories:
+        dir_path = backend_path / directory
+        if dir_path.exists():
+            sources[directory] = [
+                js_file.read_text(encoding='utf-8') for js_file in engine.directory_js_files(dir_path)
+            ]
+    return sources
+
+def time_analysis(analyzer, contents, repetitions):
+    """Tiempo medio (ms) de analizar todos los contenidos una vez"""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for content in contents:
+            analyzer(content)
+    return (time.perf_counter() - start) * 1000 / repetitions
+
+def run_benchmark(backend_path, repetitions):
+    """Ejecuta el benchmark e imprime una tabla comparativa por directorio (tiempos por archivo)"""
+    sources = load_sources(backend_path, BENCHMARK_DIRECTORIES + [ROUTES_DIRECTORY])
+    routes = sources.pop(ROUTES_DIRECTORY, [])
+
+    print(f"🏁 Benchmark de análisis JavaScript ({repetitions} repeticiones, ms por archivo)")
+    print(f"{'Directorio':<14}{'Archivos':>9}{'KB':>9}{'Regex plano':>14}{'Regex IA':>12}{'Lexer':>10}{'Mejora':>9}")
+
+    for directory, contents in sources.items():
+        size_kb = sum(len(content) for content in contents) / 1024
+        files = len(contents) or 1
+        plain_ms = time_analysis(legacy_javascript_analysis, contents, repetitions) / files
+        ai_ms = time_analysis(legacy_basic_code_analysis, contents, repetitions) / files
+        lexer_ms = time_analysis(scan_javascript, contents, repetitions) / files
+        speedup = (plain_ms + ai_ms) / lexer_ms if lexer_ms else 0
+
+        print(f"{directory:<14}{len(contents):>9}{size_kb:>9.1f}{plain_ms:>12.3f}ms{ai_ms:>10.3f}ms{lexer_ms:>8.3f}ms{speedup:>8.1f}x")
+
+    print("Mejora = (regex plano + regex IA) / lexer: ambos generadores usan ahora un único escaneo")
+
+    if routes:
+        files = len(routes)
+        legacy_ms = time_analysis(legacy_endpoint_extraction, routes, repetitions) / files
+        registry_ms = time_analysis(registry_endpoint_extraction, routes, repetitions) / files
+        speedup = legacy_ms / registry_ms if registry_ms else 0
+
+        print(f"\n🏁 Extracción de endpoints en {ROUTES_DIRECTORY}/ ({files} archivos, ms por archivo)")
+        print(f"{'Patrones sueltos':>18}{'Registro':>12}{'Mejora':>9}")
+        print(f"{legacy_ms:>16.3f}ms{registry_ms:>10.3f}ms{speedup:>8.1f}x")
+
+def synthetic_source(function_count):
+    """Archivo JavaScript con function_count funciones (controlador típico)"""
+    return '\n'.join(
+        f"const handler{i} = async (req, res) => {{\n  return res.json({{ id: {i} }});\n}};\n"
+        for i in range(function_count)
+    )
+
+def legacy_function_list(document, functions):
+    """Lista de funciones con add_paragraph/add_run y formato directo por run (ruta anterior)"""
+    for i, func in enumerate(functions, 1):
+        func_paragraph = document.add_paragraph()
+        func_number = func_paragraph.add_run(f"{i}. ")
+        func_number.font.bold = True
+        func_name = func_paragraph.add_run(func)
+        func_name.font.name = 'Consolas'
+        func_name.font.size = Pt(10)
+
+def bulk_function_list(document, functions):
+    """Lista de funciones construida en bloque a partir de las plantillas de formato"""
+    ParagraphEmitter(document, RUN_FORMATS).add_paragraphs(
+        [(f"{i}. ", 'bold'), (func, 'code_identifier')] for i, func in enumerate(functions, 1)
+    )
+
+def styled_document():
+    """Documento nuevo con los estilos de carácter del generador"""
+    document = Document()
+    add_character_styles(document)
+    return document
+
+def time_rendering(renderer, functions, repetitions):
+    """Tiempo medio (ms) de renderizar la lista completa en un documento nuevo"""
+    elapsed = 0.0
+    for _ in range(repetitions):
+        document = styled_document()
+        start = time.perf_counter()
+        renderer(document, functions)
+        elapsed += time.perf_counter() - start
+    return elapsed * 1000 / repetitions
+
+def measure_output(renderer, functions, repetitions):
+    """Tamaño (KB) de word/document.xml y tiempo medio (ms) de guardar el .docx"""
+    document = styled_document()
+    renderer(document, functions)
+
+    elapsed = 0.0
+    for _ in range(repetitions):
+        package = BytesIO()
+        start = time.perf_counter()
+        document.save(package)
+        elapsed += time.perf_counter() - start
+
+    with zipfile.ZipFile(package) as docx_file:
+        document_xml = docx_file.getinfo('word/document.xml').file_size
+    return document_xml / 1024, elapsed * 1000 / repetitions
+
+def run_render_benchmark(repetitions):
+    """Compara la emisión run a run con formato directo con la emisión en bloque con estilos de carácter"""
+    functions = scan_javascript(synthetic_source(RENDER_FUNCTION_COUNT))['functions']
+
+    legacy_ms = time_rendering(legacy_function_list, functions, repetitions)
+    bulk_ms = time_rendering(bulk_function_list, functions, repetitions)
+    speedup = legacy_ms / bulk_ms if bulk_ms else 0
+
+    print(f"\n🏁 Benchmark de renderizado: lista de {len(functions)} funciones ({repetitions} repeticiones)")
+    print(f"{'Run a run':>12}{'En bloque':>12}{'Mejora':>9}")
+    print(f"{legacy_ms:>10.2f}ms{bulk_ms:>10.2f}ms{speedup:>8.1f}x")
+
+    print("\n🏁 Tamaño y guardado del documento: formato directo vs estilos de carácter")
+    print(f"{'Variante':<20}{'document.xml':>14}{'Guardado':>12}")
+    for label, renderer in (('Formato directo', legacy_function_list), ('Estilos de carácter', bulk_function_list)):
+        size_kb, save_ms = measure_output(renderer, functions, repetitions)
+        print(f"{label:<20}{size_kb:>11.1f}KB{save_ms:>10.2f}ms")
+
+def read_and_scan(file_path):
+    """Ruta anterior: lectura completa en str y escaneo"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return scan_javascript(f.read())
+
+def map_and_scan(file_path):
+    """Escaneo directo sobre el archivo mapeado en memoria"""
+    with map_source(file_path) as content:
+        return scan_javascript(content)
+
+def measure_peak_memory(analyzer, file_path):
+    """Pico de memoria asignada por Python (MB) y tiempo (ms) de analizar el archivo"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    analyzer(file_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 ** 2, elapsed * 1000
+
+def run_memory_benchmark():
+    """Compara lectura completa y mmap sobre un archivo tipo bundle de varios MB"""
+    source = synthetic_source(RENDER_FUNCTION_COUNT).encode('utf-8')
+    with tempfile.NamedTemporaryFile(suffix='.js') as bundle:
+        while bundle.tell() < BUNDLE_SIZE_MB * 1024 ** 2:
+            bundle.write(source)
+        bundle.flush()
+
+        print(f"\n🏁 Memoria: archivo tipo bundle de {bundle.tell() / 1024 ** 2:.1f} MB")
+        print(f"{'Variante':<20}{'Pico':>10}{'Tiempo':>12}")
+        for label, analyzer in (('Lectura en str', read_and_scan), ('mmap + bytes', map_and_scan)):
+            peak_mb, elapsed_ms = measure_peak_memory(analyzer, bundle.name)
+            print(f"{label:<20}{peak_mb:>8.1f}MB{elapsed_ms:>10.0f}ms")
+
+def legacy_database_schema(db_path):
+    """Introspección anterior: PRAGMA table_info y COUNT(*) por tabla"""
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+    schema_info = {}
+    for (table,) in cursor.fetchall():
+        cursor.execute(f"PRAGMA table_info({table});")
+        columns = cursor.fetchall()
+        cursor.execute(f"SELECT COUNT(*) FROM {table};")
+        schema_info[table] = {'columns': columns, 'row_count': cursor.fetchone()[0]}
+    conn.close()
+    return schema_info
+
+def build_schema_database(db_path):
+    """Base de datos con SCHEMA_TABLE_COUNT tablas; articulos y qr_codes son grandes"""
+    conn = sqlite3.connect(str(db_path))
+    for index in range(SCHEMA_TABLE_COUNT):
+        conn.execute(f"CREATE TABLE tabla_{index} (id INTEGER PRIMARY KEY, nombre TEXT, valor REAL)")
+        conn.executemany(f"INSERT INTO tabla_{index} (nombre, valor) VALUES (?, ?)",
+                         ((f'fila {row}', row) for row in range(100)))
+    for table in ('articulos', 'qr_codes'):
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, codigo TEXT, datos TEXT)")
+        conn.executemany(f"INSERT INTO {table} (codigo, datos) VALUES (?, ?)",
+                         ((f'C{row:08d}', 'x' * 64) for row in range(SCHEMA_LARGE_TABLE_ROWS)))
+    conn.commit()
+    conn.close()
+
+def time_schema(analyzer, repetitions):
+    """Tiempo medio (ms) de una introspección del esquema"""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        analyzer()
+    return (time.perf_counter() - start) * 1000 / repetitions
+
+def run_schema_benchmark(repetitions):
+    """Compara la introspección tabla a tabla con COUNT(*) y la del proveedor SQLite"""
+    with tempfile.TemporaryDirectory() as backend_dir:
+        db_path = Path(backend_dir) / 'packing_list.db'
+        build_schema_database(db_path)
+        estimated = SQLiteSchemaProvider(db_path)
+        exact = SQLiteSchemaProvider(db_path, exact_row_counts=True)
+
+        print(f"\n🏁 Esquema SQLite: {SCHEMA_TABLE_COUNT + 2} tablas, "
+              f"2 con {SCHEMA_LARGE_TABLE_ROWS} filas ({db_path.stat().st_size / 1024 ** 2:.1f} MB)")
+        print(f"{'Variante':<28}{'Tiempo':>12}")
+        for label, analyzer in (
+            ('Tabla a tabla + COUNT(*)', lambda: legacy_database_schema(db_path)),
+            ('Una consulta + COUNT(*)', exact.analyze_schema),
+            ('Una consulta + estimación', estimated.analyze_schema),
+        ):
+            print(f"{label:<28}{time_schema(analyzer, repetitions):>10.2f}ms")
+
+def main():
+    """Función principal"""
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    run_benchmark(Path(__file__).parent, repetitions)
+    run_render_benchmark(repetitions)
+    run_memory_benchmark()
+    run_schema_benchmark(repetitions)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# Registro de expresiones regulares del generador de documentación 888Cargo
+# Patrones compilados una sola vez al importar el módulo y compartidos por ambos generadores,
+# para no volver a resolverlos en la cache interna de re dentro de los bucles por archivo.
+# El análisis estructural del código JavaScript (funciones, imports, complejidad...) lo hace
+# js_lexer con su propio patrón maestro; aquí quedan los patrones auxiliares
+
+import re
+
+# Métodos HTTP documentados, en el orden en que se listan los endpoints de cada archivo
+ROUTE_METHODS = ('get', 'post', 'put', 'delete')
+
+# Definición de ruta de Express: router.get('/ruta', ...) → (método, ruta) en una sola pasada
+# (empieza por el literal 'router' para que re pueda saltar directamente a cada aparición)
+ROUTE_DEFINITION = re.compile(r'router\.(' + '|'.join(ROUTE_METHODS) + r')\([\'"]([^\'"]+)[\'"]')
+
+# Marcador que separa la sección de cada archivo en la respuesta de un lote de IA
+BATCH_SECTION = re.compile(r'^=== ARCHIVO: (.+?) ===[ \t]*$', re.MULTILINE)
+
+# Indicios de patrones de diseño en el análisis serializado de un archivo (en minúsculas).
+# Solo se serializan los campos del análisis original: los añadidos después (comentarios
+# clave, complejidad...) harían aparecer patrones que el código no tiene
+PATTERN_HINT_FIELDS = ('path', 'lines', 'functions', 'classes', 'exports', 'imports', 'comments')
+REPOSITORY_HINT = re.compile(r'repository|findby|save|delete')
+SINGLETON_HINT = re.compile(r'instance|singleton')
+
+def extract_routes(content):
+    """
+    Rutas (MÉTODO, ruta) de un archivo de Express, agrupadas por método en el orden de
+    ROUTE_METHODS y, dentro de cada método, por orden de aparición
+    """
+    routes = ROUTE_DEFINITION.findall(content)
+    routes.sort(key=lambda route: ROUTE_METHODS.index(route[0]))
+    return [(method.upper(), path) for method, path in routes]
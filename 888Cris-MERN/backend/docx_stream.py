@@ -0,0 +1,223 @@
+# Escritura incremental de documentos Word para el generador de documentación 888Cargo
+# Vuelca el cuerpo de un Document de python-docx a un archivo temporal por secciones y
+# ensambla el .docx al final, de modo que el árbol XML en memoria no crece con el backend.
+# Incluye además un emisor de párrafos en bloque para los bucles con muchos párrafos cortos
+
+import re
+import shutil
+import tempfile
+import zipfile
+from copy import deepcopy
+from io import BytesIO
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+# Apertura del cuerpo en word/document.xml (vacío: <w:body/>)
+_BODY_OPEN = re.compile(rb'<w:body\s*>')
+_BODY_EMPTY = re.compile(rb'<w:body\s*/>')
+
+# Tamaño de copia del archivo temporal al .docx
+_COPY_BUFFER = 1024 * 1024
+
+# Caracteres que python-docx traduce a <w:tab/> / <w:br/> en lugar de texto
+_RUN_CONTROL_CHARS = re.compile(r'[\t\r\n]')
+
+class StreamingDocumentWriter:
+    """
+    Backend de escritura en streaming para un Document de python-docx.
+
+    El documento se sigue construyendo con la API normal de python-docx; flush()
+    serializa los elementos ya añadidos al cuerpo (párrafos, tablas...) en un archivo
+    temporal y los elimina del árbol en memoria. save() genera el paquete con el resto
+    de partes (estilos, relaciones, numeración) y escribe word/document.xml intercalando
+    los fragmentos volcados, sin volver a cargarlos en memoria.
+
+    take_body(), collect() y append() permiten renderizar secciones o archivos en
+    documentos independientes (p. ej. en otros procesos, con los mismos estilos) y
+    reutilizar o incorporar su XML en orden.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self.body = document.element.body
+        self._fragments = None
+        self.flushed_elements = 0
+        # Declaraciones de espacios de nombres ya presentes en la raíz de document.xml;
+        # lxml las repite en cada fragmento serializado y se eliminan para no inflar el XML
+        self._root_declarations = [
+            f' xmlns:{prefix}="{uri}"'.encode('utf-8')
+            for prefix, uri in document.element.nsmap.items() if prefix
+        ]
+
+    @property
+    def fragments(self):
+        """Archivo temporal de fragmentos, creado en la primera escritura"""
+        if self._fragments is None:
+            self._fragments = tempfile.TemporaryFile()
+        return self._fragments
+
+    def take_body(self) -> bytes:
+        """Serializa los elementos del cuerpo (salvo sectPr), los elimina del árbol y devuelve el XML"""
+        section_properties = qn('w:sectPr')
+        parts = []
+        for element in list(self.body):
+            if element.tag == section_properties:
+                continue
+            parts.append(self._serialize(element))
+            self.body.remove(element)
+            self.flushed_elements += 1
+        return b''.join(parts)
+
+    def flush(self):
+        """Vuelca al archivo temporal los elementos del cuerpo y los libera de la memoria"""
+        body = self.take_body()
+        if body:
+            self.fragments.write(body)
+
+    def append(self, fragment: bytes):
+        """Añade al final un fragmento ya serializado (p. ej. el take_body() de otra sección)"""
+        self.flush()
+        self.fragments.write(fragment)
+
+    def collect(self) -> bytes:
+        """Devuelve todo el XML escrito hasta ahora (volcado y pendiente) y vacía el escritor"""
+        body = self.take_body()
+        if self._fragments is None:
+            return body
+        self._fragments.seek(0)
+        written = self._fragments.read()
+        self.close()
+        return written + body
+
+    def _serialize(self, element) -> bytes:
+        """XML del elemento sin las declaraciones de espacios de nombres heredadas de la raíz"""
+        xml = etree.tostring(element, encoding='UTF-8', xml_declaration=False)
+        start_tag_end = xml.index(b'>')
+        start_tag = xml[:start_tag_end]
+        for declaration in self._root_declarations:
+            start_tag = start_tag.replace(declaration, b'')
+        return start_tag + xml[start_tag_end:]
+
+    def save(self, output_file):
+        """Escribe el .docx completo: partes de python-docx + cuerpo volcado por secciones"""
+        self.flush()
+
+        # Paquete con el cuerpo ya vacío (solo queda sectPr): pequeño en memoria
+        package = BytesIO()
+        self.document.save(package)
+        package.seek(0)
+
+        with zipfile.ZipFile(package) as source, \
+                zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename != 'word/document.xml':
+                    target.writestr(info, source.read(info.filename))
+                    continue
+
+                head, tail = self._split_document_xml(source.read(info.filename))
+                entry = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                entry.compress_type = zipfile.ZIP_DEFLATED
+                large = self.fragments.tell() > 1024 ** 3
+                with target.open(entry, 'w', force_zip64=large) as document_xml:
+                    document_xml.write(head)
+                    self.fragments.seek(0)
+                    shutil.copyfileobj(self.fragments, document_xml, _COPY_BUFFER)
+                    document_xml.write(tail)
+
+        # El archivo temporal se conserva por si se vuelve a guardar; seguir escribiendo al final
+        self.fragments.seek(0, 2)
+        return output_file
+
+    def _split_document_xml(self, xml: bytes):
+        """Divide document.xml en (hasta <w:body> incluido, resto) para insertar los fragmentos"""
+        match = _BODY_OPEN.search(xml)
+        if match:
+            return xml[:match.end()], xml[match.end():]
+        match = _BODY_EMPTY.search(xml)
+        return xml[:match.start()] + b'<w:body>', b'</w:body>' + xml[match.end():]
+
+    def close(self):
+        """Elimina el archivo temporal de fragmentos"""
+        if self._fragments is not None:
+            self._fragments.close()
+            self._fragments = None
+
+class ParagraphEmitter:
+    """
+    Emisión en bloque de párrafos formados por runs con formato predefinido.
+
+    Cada formato de run (p. ej. {'name': 'Consolas', 'size': Pt(10)}) se aplica una sola
+    vez con la API de python-docx sobre un run auxiliar y su <w:rPr> se guarda como
+    plantilla; add_paragraphs() construye los <w:p> copiando esas plantillas y los inserta
+    en el cuerpo con una única operación. El XML resultante es el mismo que el de
+    add_paragraph() + add_run() + font.* por cada run.
+    """
+
+    def __init__(self, document, run_formats):
+        self.document = document
+        self.body = document.element.body
+        self._run_templates = {None: None}
+        self._paragraph_templates = {None: None}
+        for name, run_format in run_formats.items():
+            self._run_templates[name] = self._build_run_template(run_format)
+
+    def _build_run_template(self, run_format):
+        """Aplica el formato a un run auxiliar y devuelve su <w:rPr> (o None si queda vacío)"""
+        paragraph = self.document.add_paragraph()
+        run = paragraph.add_run()
+        for attribute, value in run_format.items():
+            if attribute == 'color':
+                run.font.color.rgb = value
+            elif attribute == 'style':
+                run.style = value
+            else:
+                setattr(run.font, attribute, value)
+        self.body.remove(paragraph._p)
+        return run._r.rPr
+
+    def _paragraph_template(self, style):
+        """<w:pPr> con el estilo de párrafo indicado, resuelto una sola vez por nombre"""
+        if style not in self._paragraph_templates:
+            paragraph = self.document.add_paragraph(style=style)
+            self.body.remove(paragraph._p)
+            self._paragraph_templates[style] = paragraph._p.pPr
+        return self._paragraph_templates[style]
+
+    def add_paragraphs(self, paragraphs, style=None):
+        """
+        Añade al final del cuerpo un párrafo por cada lista de runs [(texto, formato), ...].
+        formato es una clave de run_formats o None (sin formato directo); style es el estilo
+        de párrafo común (None = Normal). Devuelve el número de párrafos añadidos.
+        """
+        paragraph_tag, run_tag, text_tag = qn('w:p'), qn('w:r'), qn('w:t')
+        preserve_space = qn('xml:space')
+        paragraph_properties = self._paragraph_template(style)
+        make_element = self.body.makeelement
+
+        elements = []
+        for runs in paragraphs:
+            p = make_element(paragraph_tag)
+            if paragraph_properties is not None:
+                p.append(deepcopy(paragraph_properties))
+            for text, run_format in runs:
+                r = make_element(run_tag)
+                template = self._run_templates[run_format]
+                if template is not None:
+                    r.append(deepcopy(template))
+                if _RUN_CONTROL_CHARS.search(text):
+                    r.text = text  # Tabulaciones y saltos: traducción estándar de python-docx
+                elif text:
+                    t = make_element(text_tag)
+                    t.text = text
+                    if len(text.strip()) < len(text):
+                        t.set(preserve_space, 'preserve')
+                    r.append(t)
+                p.append(r)
+            elements.append(p)
+
+        # Insertar antes de sectPr, igual que add_paragraph()
+        section_properties = self.body.find(qn('w:sectPr'))
+        position = self.body.index(section_properties) if section_properties is not None else len(self.body)
+        self.body[position:position] = elements
+        return len(elements)
@@ -6,7 +6,6 @@ import sys
 from datetime import datetime
 from pathlib import Path
 import json
-import sqlite3
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
@@ -14,7 +13,131 @@ from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.shared import OxmlElement, qn
 from docx.enum.table import WD_TABLE_ALIGNMENT
 import ast
-import re
+import hashlib
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from analysis_core import (
+    AnalysisEngine, AnalysisManifest, DEFAULT_PROJECT_INFO, MANIFEST_VERSION
+)
+from schema_providers import format_row_count, load_representative_queries, schema_provider_from_env
+from code_patterns import PATTERN_HINT_FIELDS, REPOSITORY_HINT, SINGLETON_HINT
+from docx_stream import StreamingDocumentWriter, ParagraphEmitter
+from source_walker import DEFAULT_MAX_FILE_SIZE
+
+# Estilos de carácter definidos una vez en setup_styles: los runs los referencian por nombre
+# (<w:rStyle>) en lugar de repetir fuente, tamaño y color en cada <w:rPr>
+CHARACTER_STYLES = {
+    'CodeIdentifier': {'name': 'Consolas', 'size': Pt(10)},
+    'MetricLabel': {'bold': True},
+    'TocEntry': {'name': 'Segoe UI', 'size': Pt(11)},
+    'TocLeader': {'name': 'Segoe UI', 'size': Pt(8)},
+    'TocPage': {'name': 'Segoe UI', 'size': Pt(11), 'bold': True},
+    'InfoCell': {'name': 'Segoe UI', 'size': Pt(11)},
+    'ConfidentialNote': {'italic': True, 'size': Pt(10)},
+    'FileIcon': {'size': Pt(14)},
+    'FileHeading': {'bold': True, 'size': Pt(13), 'color': RGBColor(0, 51, 102)},
+    'FeatureTitle': {'bold': True, 'size': Pt(11)},
+    'LayerTitle': {'bold': True, 'size': Pt(12), 'color': RGBColor(0, 51, 102)},
+    'PatternTitle': {'bold': True, 'size': Pt(11), 'color': RGBColor(0, 102, 51)},
+    'SmallText': {'size': Pt(9), 'color': RGBColor(64, 64, 64)},
+    'DetailText': {'size': Pt(10)},
+    'PatternFound': {'size': Pt(10), 'color': RGBColor(0, 102, 51)},
+    'SeparatorLine': {'size': Pt(8), 'color': RGBColor(128, 128, 128)},
+}
+
+# Formatos de run predefinidos para la emisión en bloque de párrafos (ParagraphEmitter)
+RUN_FORMATS = {
+    'bold': {'style': 'MetricLabel'},
+    'code_identifier': {'style': 'CodeIdentifier'},
+    'toc_entry': {'style': 'TocEntry'},
+    'toc_leader': {'style': 'TocLeader'},
+    'toc_page': {'style': 'TocPage'},
+    'small_text': {'style': 'SmallText'},
+    'pattern_found': {'style': 'PatternFound'},
+}
+
+def add_character_styles(document):
+    """Crea en el documento los estilos de carácter de CHARACTER_STYLES"""
+    for style_name, style_format in CHARACTER_STYLES.items():
+        style = document.styles.add_style(style_name, WD_STYLE_TYPE.CHARACTER)
+        for attribute, value in style_format.items():
+            if attribute == 'color':
+                style.font.color.rgb = value
+            else:
+                setattr(style.font, attribute, value)
+
+# Módulos cuyo código determina el documento: análisis, patrones, escritura y esquema
+GENERATOR_MODULES = (
+    'generate_documentation', 'analysis_core', 'js_lexer', 'code_patterns',
+    'docx_stream', 'source_walker', 'schema_providers'
+)
+
+@lru_cache(maxsize=None)
+def renderer_digest():
+    """Hash del código del generador: los fragmentos cacheados se invalidan si cambia el renderizado"""
+    digest = hashlib.sha256()
+    for module in GENERATOR_MODULES:
+        source = Path(__file__).with_name(f"{module}.py")
+        digest.update(f"{module}:".encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+class FragmentCache:
+    """
+    Cache de fragmentos OOXML renderizados por add_file_analysis, direccionado por contenido:
+    la clave combina el análisis del archivo y el código del generador, así que un archivo
+    sin cambios reutiliza su XML sin volver a construir párrafos ni runs con python-docx
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def key_for(self, analysis):
+        """Clave del fragmento de un análisis (serialización JSON canónica + versión del renderizado)"""
+        payload = json.dumps(analysis, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(f"{renderer_digest()}\n{payload}".encode()).hexdigest()
+
+    def path_for(self, key):
+        return self.cache_dir / f"{key}.xml"
+
+    def get(self, key):
+        """Devuelve el fragmento guardado o None"""
+        try:
+            return self.path_for(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, fragment):
+        """Guarda el fragmento de forma atómica (archivo temporal + reemplazo)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        target = self.path_for(key)
+        tmp_path = target.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(fragment)
+        os.replace(tmp_path, target)
+
+    def prune(self, keep_keys):
+        """Elimina los fragmentos que no corresponden a ningún análisis actual"""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for fragment_path in self.cache_dir.glob('*.xml'):
+            if fragment_path.stem not in keep_keys:
+                fragment_path.unlink()
+                removed += 1
+        return removed
+
+def render_section(backend_path, output_path, project_info, method_name, args, fragment_cache_dir=None):
+    """
+    Renderiza una sección en un documento independiente (con los mismos estilos) y devuelve
+    su cuerpo serializado. Es una función de módulo para poder ejecutarse en otro proceso.
+    """
+    generator = BackendDocumentationGenerator(backend_path, output_path)
+    generator.project_info = project_info
+    if fragment_cache_dir:
+        generator.fragment_cache = FragmentCache(fragment_cache_dir)
+    getattr(generator, method_name)(*args)
+    return generator.doc_writer.collect()
 
 class BackendDocumentationGenerator:
     """
@@ -22,29 +145,48 @@ class BackendDocumentationGenerator:
     Produce documentos Word profesionales con estilos personalizados
     """
     
-    def __init__(self, backend_path, output_path):
+    def __init__(self, backend_path, output_path, incremental=False, manifest_path=None, workers=1,
+                 max_file_size=DEFAULT_MAX_FILE_SIZE, exact_row_counts=False, representative_queries=None,
+                 schema_provider=None):
         self.backend_path = Path(backend_path)
         self.output_path = Path(output_path)
         self.doc = Document()
+        # Escritura en streaming: cada sección terminada se vuelca a disco y sale del árbol en memoria
+        self.doc_writer = StreamingDocumentWriter(self.doc)
         self.current_date = datetime.now().strftime("%d de %B de %Y")
         
+        # Modo incremental: reutiliza análisis de archivos sin cambios
+        self.incremental = incremental
+        self.manifest = None
+        self.fragment_cache = None
+        if incremental:
+            self.manifest = AnalysisManifest(
+                manifest_path or self.output_path / '.doc_cache' / 'analysis_manifest.json'
+            )
+            # Fragmentos OOXML ya renderizados de cada archivo, junto al manifiesto
+            self.fragment_cache = FragmentCache(self.manifest.manifest_path.parent / 'fragments')
+            
+        # Análisis paralelo de archivos (1 = secuencial, 0 = un proceso por núcleo)
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        
+        # Motor de análisis compartido con el generador con IA
+        self.engine = AnalysisEngine(
+            self.backend_path, max_file_size=max_file_size, manifest=self.manifest,
+            exact_row_counts=exact_row_counts, representative_queries=representative_queries,
+            schema_provider=schema_provider
+        )
+        
         # Configuración de estilos
         self.setup_styles()
+        # Párrafos repetitivos (índice, listas de funciones) construidos en bloque
+        self.paragraphs = ParagraphEmitter(self.doc, RUN_FORMATS)
         
         # Datos del proyecto
-        self.project_info = {
-            'name': '888Cargo Backend',
-            'version': '1.0.0',
-            'description': 'Sistema de gestión de listas de empaque con códigos QR',
-            'author': 'FiveCGroup',
-            'license': 'MIT'
-        }
+        self.project_info = dict(DEFAULT_PROJECT_INFO)
         
         # Estructura de directorios a analizar
-        self.directories_to_analyze = [
-            'controllers', 'services', 'models', 'repositories',
-            'routes', 'middlewares', 'validators', 'utils', 'config'
-        ]
+        self.directories_to_analyze = self.engine.directories
         
     def setup_styles(self):
         """Configura estilos APA con Times New Roman, tamaño 12 y color negro"""
@@ -144,6 +286,9 @@ class BackendDocumentationGenerator:
         indent_style.paragraph_format.line_spacing = 2.0
         indent_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
         
+        # Estilos de carácter (identificadores de código, etiquetas, índice...)
+        add_character_styles(self.doc)
+        
     def add_page_break(self):
         """Añade un salto de página"""
         self.doc.add_page_break()
@@ -155,11 +300,8 @@ class BackendDocumentationGenerator:
         elif indent:
             paragraph = self.doc.add_paragraph(text, style='CustomIndent')
         else:
+            # El estilo Normal ya tiene el formato APA (setup_styles); solo formato de párrafo local
             paragraph = self.doc.add_paragraph(text)
-            # Aplicar formato APA manualmente si no hay estilo específico
-            paragraph.style.font.name = 'Times New Roman'
-            paragraph.style.font.size = Pt(12)
-            paragraph.style.font.color.rgb = RGBColor(0, 0, 0)
             paragraph.paragraph_format.line_spacing = 2.0
             paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
         return paragraph
@@ -197,8 +339,7 @@ class BackendDocumentationGenerator:
             
             # Estilo para las celdas
             for cell in row.cells:
-                cell.paragraphs[0].runs[0].font.name = 'Segoe UI'
-                cell.paragraphs[0].runs[0].font.size = Pt(11)
+                cell.paragraphs[0].runs[0].style = 'InfoCell'
                 
         # Espacio adicional
         self.doc.add_paragraph('\n\n')
@@ -210,8 +351,7 @@ class BackendDocumentationGenerator:
             'Está destinado únicamente para uso interno del equipo de desarrollo.'
         )
         confidential.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        confidential.runs[0].font.italic = True
-        confidential.runs[0].font.size = Pt(10)
+        confidential.runs[0].style = 'ConfidentialNote'
         
         self.add_page_break()
         
@@ -258,147 +398,25 @@ class BackendDocumentationGenerator:
             ('  C. Ejemplos de uso', 49)
         ]
         
-        for item, page in toc_items:
-            p = self.doc.add_paragraph()
-            run1 = p.add_run(item)
-            run1.font.name = 'Segoe UI'
-            run1.font.size = Pt(11)
-            
-            # Añadir puntos de relleno
-            dots = '.' * (60 - len(item))
-            run2 = p.add_run(f' {dots} ')
-            run2.font.name = 'Segoe UI'
-            run2.font.size = Pt(8)
-            
-            run3 = p.add_run(str(page))
-            run3.font.name = 'Segoe UI'
-            run3.font.size = Pt(11)
-            run3.font.bold = True
+        # Entrada, puntos de relleno y número de página
+        self.paragraphs.add_paragraphs(
+            [(item, 'toc_entry'), (f" {'.' * (60 - len(item))} ", 'toc_leader'), (str(page), 'toc_page')]
+            for item, page in toc_items
+        )
             
         self.add_page_break()
         
     def analyze_package_json(self):
         """Analiza el package.json para extraer información del proyecto"""
-        package_path = self.backend_path.parent / 'package.json'
-        
-        if package_path.exists():
-            with open(package_path, 'r', encoding='utf-8') as f:
-                package_data = json.load(f)
-                
-            self.project_info.update({
-                'name': package_data.get('name', self.project_info['name']),
-                'version': package_data.get('version', self.project_info['version']),
-                'description': package_data.get('description', self.project_info['description']),
-                'dependencies': package_data.get('dependencies', {}),
-                'devDependencies': package_data.get('devDependencies', {}),
-                'scripts': package_data.get('scripts', {})
-            })
+        self.project_info.update(self.engine.analyze_package_json())
             
     def analyze_database_schema(self):
         """Analiza el esquema de la base de datos SQLite"""
-        db_path = self.backend_path / 'packing_list.db'
-        
-        if not db_path.exists():
-            return {}
-            
-        try:
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-            
-            # Obtener todas las tablas
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = [row[0] for row in cursor.fetchall()]
-            
-            schema_info = {}
-            
-            for table in tables:
-                cursor.execute(f"PRAGMA table_info({table});")
-                columns_raw = cursor.fetchall()
-                
-                # Convertir tuplas a diccionarios
-                columns = []
-                for col in columns_raw:
-                    columns.append({
-                        'cid': col[0],
-                        'name': col[1], 
-                        'type': col[2],
-                        'notnull': col[3],
-                        'default': col[4],
-                        'pk': col[5]
-                    })
-                
-                schema_info[table] = {
-                    'columns': columns,
-                    'row_count': 0
-                }
-                
-                # Contar filas
-                try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table};")
-                    schema_info[table]['row_count'] = cursor.fetchone()[0]
-                except:
-                    pass
-                    
-            conn.close()
-            return schema_info
-            
-        except Exception as e:
-            print(f"Error analizando base de datos: {e}")
-            return {}
+        return self.engine.analyze_database_schema()
             
     def analyze_javascript_file(self, file_path):
         """Analiza un archivo JavaScript para extraer información"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            analysis = {
-                'path': str(file_path.relative_to(self.backend_path)),
-                'lines': len(content.split('\n')),
-                'functions': [],
-                'classes': [],
-                'exports': [],
-                'imports': [],
-                'comments': []
-            }
-            
-            # Buscar funciones
-            function_pattern = r'(?:function\s+(\w+)|const\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>))'
-            for match in re.finditer(function_pattern, content):
-                func_name = match.group(1) or match.group(2)
-                if func_name:
-                    analysis['functions'].append(func_name)
-                    
-            # Buscar clases
-            class_pattern = r'class\s+(\w+)'
-            for match in re.finditer(class_pattern, content):
-                analysis['classes'].append(match.group(1))
-                
-            # Buscar exports
-            export_pattern = r'(?:module\.exports|export\s+(?:default\s+)?(?:class\s+|function\s+|const\s+)?(\w+))'
-            for match in re.finditer(export_pattern, content):
-                if match.group(1):
-                    analysis['exports'].append(match.group(1))
-                    
-            # Buscar imports
-            import_pattern = r'(?:require\([\'"]([^\'"]+)[\'"]\)|import.*from\s+[\'"]([^\'"]+)[\'"])'
-            for match in re.finditer(import_pattern, content):
-                module = match.group(1) or match.group(2)
-                if module and not module.startswith('.'):
-                    analysis['imports'].append(module)
-                    
-            # Buscar comentarios importantes
-            comment_pattern = r'//\s*(.+)|/\*\*(.*?)\*/'
-            for match in re.finditer(comment_pattern, content, re.DOTALL):
-                comment = match.group(1) or match.group(2)
-                if comment and len(comment.strip()) > 10:
-                    analysis['comments'].append(comment.strip())
-                    
-            return analysis
-            
-        except Exception as e:
-            print(f"Error analizando archivo {file_path}: {e}")
-            return None
+        return self.engine.analyze_file(file_path)
             
     def generate_introduction_section(self):
         """Genera la sección de introducción expandida y detallada"""
@@ -484,9 +502,7 @@ La digitalización implementada a través de este sistema permite a las empresas
         for feature_title, feature_description in features_detailed:
             # Título de la característica
             feature_paragraph = self.doc.add_paragraph()
-            title_run = feature_paragraph.add_run(feature_title)
-            title_run.font.bold = True
-            title_run.font.size = Pt(11)
+            feature_paragraph.add_run(feature_title, style='FeatureTitle')
             
             # Descripción detallada con formato APA
             self.add_apa_paragraph(feature_description, indent=True)
@@ -512,7 +528,7 @@ La digitalización implementada a través de este sistema permite a las empresas
         for i, header in enumerate(headers):
             cell = tech_table.rows[0].cells[i]
             cell.text = header
-            cell.paragraphs[0].runs[0].font.bold = True
+            cell.paragraphs[0].runs[0].style = 'MetricLabel'
             
         # Datos de tecnologías expandidos con justificaciones
         technologies_detailed = [
@@ -546,10 +562,8 @@ La digitalización implementada a través de este sistema permite a las empresas
         
         for category, tech, version, description in technologies_detailed:
             tech_detail = self.doc.add_paragraph()
-            tech_name = tech_detail.add_run(f"{tech}: ")
-            tech_name.font.bold = True
-            tech_detail.add_run(description)
-            tech_detail.style.font.size = Pt(10)
+            tech_detail.add_run(f"{tech}: ", style='MetricLabel')
+            tech_detail.add_run(description, style='DetailText')
             
     def generate_architecture_section(self):
         """Genera la sección de arquitectura expandida y detallada"""
@@ -601,14 +615,11 @@ La digitalización implementada a través de este sistema permite a las empresas
         for layer_title, layer_description in layers_detailed:
             # Título de la capa
             layer_paragraph = self.doc.add_paragraph()
-            title_run = layer_paragraph.add_run(layer_title)
-            title_run.font.bold = True
-            title_run.font.size = Pt(12)
-            title_run.font.color.rgb = RGBColor(0, 51, 102)
+            layer_paragraph.add_run(layer_title, style='LayerTitle')
             
             # Descripción detallada
-            desc_paragraph = self.doc.add_paragraph(layer_description)
-            desc_paragraph.style.font.size = Pt(10)
+            desc_paragraph = self.doc.add_paragraph()
+            desc_paragraph.add_run(layer_description, style='DetailText')
             
             # Espacio entre capas
             self.doc.add_paragraph()
@@ -654,14 +665,11 @@ La digitalización implementada a través de este sistema permite a las empresas
         for pattern_title, pattern_description in patterns_detailed:
             # Título del patrón
             pattern_paragraph = self.doc.add_paragraph()
-            title_run = pattern_paragraph.add_run(pattern_title)
-            title_run.font.bold = True
-            title_run.font.size = Pt(11)
-            title_run.font.color.rgb = RGBColor(0, 102, 51)
+            pattern_paragraph.add_run(pattern_title, style='PatternTitle')
             
             # Descripción detallada
-            desc_paragraph = self.doc.add_paragraph(pattern_description)
-            desc_paragraph.style.font.size = Pt(10)
+            desc_paragraph = self.doc.add_paragraph()
+            desc_paragraph.add_run(pattern_description, style='DetailText')
             
             # Espacio entre patrones
             self.doc.add_paragraph()
@@ -683,7 +691,7 @@ La digitalización implementada a través de este sistema permite a las empresas
         for i, header in enumerate(headers):
             cell = layers_table.rows[0].cells[i]
             cell.text = header
-            cell.paragraphs[0].runs[0].font.bold = True
+            cell.paragraphs[0].runs[0].style = 'MetricLabel'
             
         # Datos de capas
         layers_data = [
@@ -700,57 +708,135 @@ La digitalización implementada a través de este sistema permite a las empresas
             row.cells[1].text = responsibility
             row.cells[2].text = components
             
-    def generate_complete_documentation(self):
-        """Genera la documentación completa"""
-        print("🚀 Iniciando generación de documentación...")
-        
-        # Analizar proyecto
-        print("📊 Analizando estructura del proyecto...")
-        self.analyze_package_json()
-        
-        # Crear documento
-        print("📄 Creando documento Word...")
-        
-        # Página de título
-        self.add_title_page()
-        
-        # Tabla de contenidos
-        self.add_table_of_contents()
-        
-        # Sección 1: Introducción
-        print("✍️ Generando sección de introducción...")
-        self.generate_introduction_section()
+    def scan_project(self):
+        """
+        Analiza el backend una sola vez (package.json, archivos y base de datos). El resultado
+        puede pasarse a generate_complete_documentation y al generador con IA.
+        """
+        if self._executor is None and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return self._scan_project(executor)
+        return self._scan_project(self._executor)
+        
+    def _scan_project(self, executor):
+        """Recorrido del motor de análisis con el progreso por consola"""
+        print("🔍 Analizando archivos del backend y esquema de base de datos...")
+        return self.engine.scan(
+            executor, self.project_info, on_directory=lambda directory: print(f"  📂 Analizando {directory}/")
+        )
         
-        # Sección 2: Arquitectura
-        print("🏗️ Generando sección de arquitectura...")
-        self.generate_architecture_section()
+    def generate_complete_documentation(self, scan=None):
+        """Genera la documentación completa (a partir de un ProjectScan ya calculado si se recibe)"""
+        print("🚀 Iniciando generación de documentación...")
         
-        # Analizar archivos del proyecto
-        print("🔍 Analizando archivos del backend...")
+        # Modo incremental: si ninguna fuente cambió se reutiliza el documento anterior
+        if self.incremental:
+            fingerprint = self._compute_source_fingerprint()
+            previous_output = self.manifest.output_file
+            if (fingerprint is not None and fingerprint == self.manifest.fingerprint
+                    and previous_output and Path(previous_output).exists()):
+                print("♻️ Sin cambios desde la última generación, reutilizando documento existente")
+                return Path(previous_output)
         
-        for directory in self.directories_to_analyze:
-            dir_path = self.backend_path / directory
-            if dir_path.exists():
-                print(f"  📂 Analizando {directory}/")
-                self.analyze_directory(directory, dir_path)
-                
-        # Analizar base de datos
-        print("🗄️ Analizando esquema de base de datos...")
-        db_schema = self.analyze_database_schema()
-        if db_schema:
-            self.generate_database_section(db_schema)
+        if self.workers > 1:
+            print(f"  ⚡ Análisis y renderizado paralelo con {self.workers} procesos")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
             
+        try:
+            # Analizar proyecto
+            print("📊 Analizando estructura del proyecto...")
+            if scan is None:
+                scan = self.scan_project()
+            self.project_info = scan.project_info
+            
+            # Crear documento
+            print("📄 Creando documento Word...")
+            
+            # Página de título
+            self.add_title_page()
+            
+            # Tabla de contenidos
+            self.add_table_of_contents()
+            self.doc_writer.flush()
+            
+            # Secciones del cuerpo en orden de aparición: (método, argumentos)
+            # Sección 1: Introducción y Sección 2: Arquitectura
+            sections = [
+                ('generate_introduction_section', ()),
+                ('generate_architecture_section', ())
+            ]
+            
+            # Un análisis por directorio y la base de datos
+            for directory in scan.directories:
+                sections.append(('analyze_directory', (directory.name, directory.path, directory.analyses)))
+            if scan.database_schema:
+                sections.append(('generate_database_section', (scan.database_schema, scan.database_performance)))
+                
+            # Fragmentos renderizados reutilizables (modo incremental)
+            fragment_keys = set()
+            if self.fragment_cache:
+                fragment_keys = {
+                    self.fragment_cache.key_for(analysis)
+                    for method_name, args in sections if method_name == 'analyze_directory'
+                    for analysis in args[2] if analysis
+                }
+                reused_fragments = sum(self.fragment_cache.path_for(key).exists() for key in fragment_keys)
+                
+            print("✍️ Generando secciones del documento...")
+            self._render_sections(sections)
+        finally:
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+                
         # Guardar documento
         output_file = self.output_path / f"888Cargo_Backend_Documentation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        self.doc.save(output_file)
+        self.doc_writer.save(output_file)
+        self.doc_writer.close()
+        
+        # Actualizar manifiesto incremental
+        if self.incremental:
+            self.manifest.prune()
+            self.manifest.fingerprint = fingerprint
+            self.manifest.output_file = str(output_file)
+            self.manifest.save()
+            removed_fragments = self.fragment_cache.prune(fragment_keys)
+            stats = self.manifest.stats
+            print(f"♻️ Incremental: {stats['analyzed']} analizados, {stats['reused']} reutilizados, {stats['removed']} eliminados")
+            print(f"♻️ Fragmentos: {reused_fragments} reutilizados, {len(fragment_keys) - reused_fragments} renderizados, {removed_fragments} eliminados")
         
         print(f"✅ Documentación generada exitosamente: {output_file}")
         print(f"📊 Tamaño del archivo: {output_file.stat().st_size / 1024:.2f} KB")
         
         return output_file
         
-    def analyze_directory(self, dir_name, dir_path):
-        """Analiza un directorio específico con información detallada"""
+    def _render_sections(self, sections):
+        """
+        Renderiza las secciones en orden. Con varios procesos cada sección se genera en un
+        documento independiente y los fragmentos se incorporan en el orden original.
+        """
+        if self._executor and len(sections) > 1:
+            method_names = [method_name for method_name, _ in sections]
+            arguments = [args for _, args in sections]
+            # Executor.map conserva el orden de entrada: fusión determinista
+            fragment_cache_dir = self.fragment_cache.cache_dir if self.fragment_cache else None
+            fragments = self._executor.map(
+                render_section,
+                repeat(self.backend_path), repeat(self.output_path), repeat(self.project_info),
+                method_names, arguments, repeat(fragment_cache_dir)
+            )
+            for fragment in fragments:
+                self.doc_writer.append(fragment)
+        else:
+            for method_name, args in sections:
+                getattr(self, method_name)(*args)
+                self.doc_writer.flush()
+                
+    def analyze_directory(self, dir_name, dir_path, analyses=None):
+        """
+        Analiza un directorio específico con información detallada.
+        Si se reciben los análisis de sus archivos (en orden) solo se renderizan.
+        """
         self.add_page_break()
         self.doc.add_paragraph(f'3.{self.directories_to_analyze.index(dir_name) + 1} ANÁLISIS DETALLADO: {dir_name.upper()}', style='CustomH1')
         
@@ -896,38 +982,81 @@ La digitalización implementada a través de este sistema permite a las empresas
         
         # Responsabilidades específicas
         self.doc.add_paragraph('Responsabilidades Específicas:', style='CustomH2')
-        for responsibility in dir_info['responsibilities']:
-            resp_para = self.doc.add_paragraph()
-            bullet_run = resp_para.add_run('• ')
-            bullet_run.font.bold = True
-            resp_para.add_run(responsibility)
+        self.paragraphs.add_paragraphs(
+            [('• ', 'bold'), (responsibility, None)] for responsibility in dir_info['responsibilities']
+        )
             
         # Mejores prácticas
         self.doc.add_paragraph('Mejores Prácticas Implementadas:', style='CustomH2')
         self.doc.add_paragraph(dir_info['best_practices'])
         
-        # Analizar archivos JavaScript en el directorio
-        js_files = list(dir_path.glob('*.js'))
+        # Analizar archivos JavaScript en el directorio (si no vienen ya analizados en el recorrido)
+        if analyses is None:
+            analyses = self.engine.analyze_files(self.engine.directory_js_files(dir_path), self._executor)
         
-        if js_files:
-            self.doc.add_paragraph(f'Archivos encontrados: {len(js_files)}', style='CustomH3')
+        if analyses:
+            self.doc.add_paragraph(f'Archivos encontrados: {len(analyses)}', style='CustomH3')
             
-            for js_file in js_files:
-                analysis = self.analyze_javascript_file(js_file)
+            # El análisis puede ejecutarse en paralelo; el renderizado sigue el orden de archivos
+            for analysis in analyses:
                 if analysis:
-                    self.add_file_analysis(analysis)
+                    self._add_file_analysis_cached(analysis)
+                    
+    def _add_file_analysis_cached(self, analysis):
+        """Añade el análisis de un archivo reutilizando su fragmento renderizado si está en cache"""
+        if not self.fragment_cache:
+            self.add_file_analysis(analysis)
+            return
+            
+        key = self.fragment_cache.key_for(analysis)
+        fragment = self.fragment_cache.get(key)
+        if fragment is None:
+            # Con el cuerpo ya volcado, take_body() devuelve exactamente el XML de este archivo
+            self.doc_writer.flush()
+            self.add_file_analysis(analysis)
+            fragment = self.doc_writer.take_body()
+            self.fragment_cache.put(key, fragment)
+        self.doc_writer.append(fragment)
                     
+    def _compute_source_fingerprint(self):
+        """Calcula una huella de todas las fuentes que influyen en el documento (None si no es posible)"""
+        digest = hashlib.sha256(f"manifest-v{MANIFEST_VERSION}\nmax-file-size:{self.engine.max_file_size}\n".encode())
+        # Opciones del análisis de base de datos: conteo exacto y consultas de DOC_QUERY_PLAN_FILE
+        # (None = consultas por defecto, ya cubiertas por el hash de schema_providers)
+        queries = json.dumps(self.engine.representative_queries, ensure_ascii=False)
+        digest.update(f"exact-row-counts:{self.engine.exact_row_counts}\nquery-plans:{queries}\n".encode())
+        
+        for directory in self.directories_to_analyze:
+            dir_path = self.backend_path / directory
+            if not dir_path.exists():
+                continue
+            for js_file, stat in self.engine.walk_js_files(dir_path):
+                rel_path = str(js_file.relative_to(self.backend_path))
+                digest.update(f"{rel_path}:{self.manifest.hash_file(rel_path, js_file, stat)}\n".encode())
+                
+        # package.json, base de datos y el código del generador también afectan al resultado
+        package_json = self.backend_path.parent / 'package.json'
+        if package_json.exists():
+            stat = package_json.stat()
+            digest.update(f"{package_json.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        digest.update(f"generator:{renderer_digest()}\n".encode())
+        
+        # La base de datos que resuelve el proveedor (SQLite local o servidor); sin huella
+        # no se puede garantizar que no haya cambiado y se regenera siempre
+        database = self.engine.database_fingerprint()
+        if database is None:
+            return None
+        digest.update(f"database:{database}\n".encode())
+                
+        return digest.hexdigest()
+        
     def add_file_analysis(self, analysis):
         """Añade el análisis detallado y completo de un archivo al documento"""
         
         # Encabezado del archivo con estilo mejorado
         file_paragraph = self.doc.add_paragraph()
-        file_icon = file_paragraph.add_run("📄 ")
-        file_icon.font.size = Pt(14)
-        file_name = file_paragraph.add_run(f"ANÁLISIS: {analysis['path']}")
-        file_name.font.bold = True
-        file_name.font.size = Pt(13)
-        file_name.font.color.rgb = RGBColor(0, 51, 102)
+        file_paragraph.add_run("📄 ", style='FileIcon')
+        file_paragraph.add_run(f"ANÁLISIS: {analysis['path']}", style='FileHeading')
         
         # Métricas detalladas del archivo
         metrics_paragraph = self.doc.add_paragraph('Métricas del Archivo:', style='CustomH3')
@@ -954,20 +1083,15 @@ La digitalización implementada a través de este sistema permite a las empresas
             # Limitar a las primeras 15 funciones para evitar documentos excesivamente largos
             functions_to_show = analysis['functions'][:15]
             
+            function_paragraphs = []
             for i, func in enumerate(functions_to_show, 1):
-                func_paragraph = self.doc.add_paragraph()
-                func_number = func_paragraph.add_run(f"{i}. ")
-                func_number.font.bold = True
-                func_name = func_paragraph.add_run(func)
-                func_name.font.name = 'Consolas'
-                func_name.font.size = Pt(10)
+                function_paragraphs.append([(f"{i}. ", 'bold'), (func, 'code_identifier')])
                 
                 # Análisis básico de la función
                 func_analysis = self._analyze_function_purpose(func)
                 if func_analysis:
-                    analysis_para = self.doc.add_paragraph(f"   → {func_analysis}")
-                    analysis_para.style.font.size = Pt(9)
-                    analysis_para.style.font.color.rgb = RGBColor(64, 64, 64)
+                    function_paragraphs.append([(f"   → {func_analysis}", 'small_text')])
+            self.paragraphs.add_paragraphs(function_paragraphs)
             
             if len(analysis['functions']) > 15:
                 self.doc.add_paragraph(f"... y {len(analysis['functions']) - 15} funciones adicionales.")
@@ -989,32 +1113,21 @@ La digitalización implementada a través de este sistema permite a las empresas
                 else:
                     external_modules.append(imp)
             
-            if core_modules:
-                self.doc.add_paragraph('Módulos Core de Node.js:', style='CustomH4')
-                for module in core_modules:
-                    mod_para = self.doc.add_paragraph(f"  • {module}")
-                    mod_para.style.font.size = Pt(9)
-            
-            if external_modules:
-                self.doc.add_paragraph('Dependencias Externas:', style='CustomH4')
-                for module in external_modules:
-                    mod_para = self.doc.add_paragraph(f"  • {module}")
-                    mod_para.style.font.size = Pt(9)
-                    
-            if local_modules:
-                self.doc.add_paragraph('Módulos Internos:', style='CustomH4')
-                for module in local_modules:
-                    mod_para = self.doc.add_paragraph(f"  • {module}")
-                    mod_para.style.font.size = Pt(9)
+            module_groups = [
+                ('Módulos Core de Node.js:', core_modules),
+                ('Dependencias Externas:', external_modules),
+                ('Módulos Internos:', local_modules)
+            ]
+            for group_title, modules in module_groups:
+                if modules:
+                    self.doc.add_paragraph(group_title, style='CustomH4')
+                    self.paragraphs.add_paragraphs([(f"  • {module}", 'small_text')] for module in modules)
         
         # Análisis de patrones implementados
         patterns_found = self._detect_patterns_in_file(analysis)
         if patterns_found:
             self.doc.add_paragraph('Patrones de Diseño Detectados:', style='CustomH3')
-            for pattern in patterns_found:
-                pattern_para = self.doc.add_paragraph(f"✓ {pattern}")
-                pattern_para.style.font.size = Pt(10)
-                pattern_para.style.font.color.rgb = RGBColor(0, 102, 51)
+            self.paragraphs.add_paragraphs([(f"✓ {pattern}", 'pattern_found')] for pattern in patterns_found)
         
         # Evaluación de calidad del código
         quality_assessment = self._assess_code_quality(analysis)
@@ -1023,9 +1136,8 @@ La digitalización implementada a través de este sistema permite a las empresas
         
         # Separador entre archivos
         self.doc.add_paragraph()
-        separator = self.doc.add_paragraph("─" * 80)
-        separator.style.font.size = Pt(8)
-        separator.style.font.color.rgb = RGBColor(128, 128, 128)
+        separator = self.doc.add_paragraph()
+        separator.add_run("─" * 80, style='SeparatorLine')
         self.doc.add_paragraph()
     
     def _determine_file_category(self, analysis):
@@ -1108,10 +1220,10 @@ La digitalización implementada a través de este sistema permite a las empresas
         """Detecta patrones de diseño implementados en el archivo"""
         patterns = []
         functions = [f.lower() for f in analysis.get('functions', [])]
-        file_content = str(analysis).lower()
+        file_content = str({field: analysis.get(field) for field in PATTERN_HINT_FIELDS}).lower()
         
         # Detectar Repository Pattern
-        if any(keyword in file_content for keyword in ['repository', 'findby', 'save', 'delete']):
+        if REPOSITORY_HINT.search(file_content):
             patterns.append("Repository Pattern - Abstracción de acceso a datos")
             
         # Detectar Service Pattern
@@ -1127,7 +1239,7 @@ La digitalización implementada a través de este sistema permite a las empresas
             patterns.append("Middleware Pattern - Procesamiento en pipeline")
             
         # Detectar Singleton Pattern
-        if any(keyword in file_content for keyword in ['instance', 'getinstance', 'singleton']):
+        if SINGLETON_HINT.search(file_content):
             patterns.append("Singleton Pattern - Instancia única global")
             
         return patterns
@@ -1161,8 +1273,11 @@ La digitalización implementada a través de este sistema permite a las empresas
         
         return f"{size_assessment}. {complexity}. Recomendación: Mantener principios SOLID y documentación actualizada."
         
-    def generate_database_section(self, schema_info):
-        """Genera la sección de base de datos expandida y detallada"""
+    def generate_database_section(self, schema_info, performance=None):
+        """
+        Genera la sección de base de datos expandida y detallada
+        (con el apéndice de rendimiento si se recibe el perfil de analyze_database_performance)
+        """
         self.add_page_break()
         self.doc.add_paragraph('4. ARQUITECTURA DE BASE DE DATOS', style='CustomH1')
         
@@ -1217,8 +1332,7 @@ La digitalización implementada a través de este sistema permite a las empresas
         
         for advantage_title, advantage_desc in advantages:
             advantage_paragraph = self.doc.add_paragraph()
-            title_run = advantage_paragraph.add_run(f"• {advantage_title}: ")
-            title_run.font.bold = True
+            advantage_paragraph.add_run(f"• {advantage_title}: ", style='MetricLabel')
             advantage_paragraph.add_run(advantage_desc)
         
         self.doc.add_paragraph()
@@ -1247,7 +1361,7 @@ La digitalización implementada a través de este sistema permite a las empresas
             for i, header in enumerate(headers):
                 cell = tables_table.rows[0].cells[i]
                 cell.text = header
-                cell.paragraphs[0].runs[0].font.bold = True
+                cell.paragraphs[0].runs[0].style = 'MetricLabel'
                 
             # Descripciones detalladas de tablas
             table_descriptions = {
@@ -1289,7 +1403,7 @@ La digitalización implementada a través de este sistema permite a las empresas
                 row = tables_table.add_row()
                 row.cells[0].text = table_name
                 row.cells[1].text = str(len(table_info.get('columns', [])))
-                row.cells[2].text = str(table_info.get('row_count', 'N/A'))
+                row.cells[2].text = format_row_count(table_info)
                 
                 table_desc = table_descriptions.get(table_name, {
                     'purpose': 'Tabla del sistema con funcionalidad específica',
@@ -1359,6 +1473,122 @@ La digitalización implementada a través de este sistema permite a las empresas
         • Escalation procedures para disaster recovery situations
         """
         self.doc.add_paragraph(backup_text)
+        
+        if performance:
+            self._generate_performance_appendix(schema_info, performance)
+    
+    def _generate_performance_appendix(self, schema_info, performance):
+        """Apéndice con el perfil de rendimiento medido por el proveedor del esquema"""
+        self.doc.add_paragraph('4.7 Apéndice: Perfil de Rendimiento de la Base de Datos', style='CustomH2')
+        self.doc.add_paragraph(
+            'Datos obtenidos directamente de la base de datos: índices y claves foráneas del esquema y, '
+            'en SQLite, almacenamiento por página y planes de ejecución de las consultas '
+            'representativas del backend.'
+        )
+        
+        # Almacenamiento: páginas y freelist (solo los proveedores que lo miden, como SQLite)
+        if 'page_size' in performance:
+            self._add_storage_statistics(performance)
+            
+        # Índices del esquema
+        self.doc.add_paragraph('Índices', style='CustomH3')
+        index_origins = {'pk': 'Clave primaria', 'u': 'UNIQUE', 'c': 'CREATE INDEX'}
+        indexed_tables = [(name, info) for name, info in schema_info.items() if info.get('indexes')]
+        if indexed_tables:
+            indexes_table = self.doc.add_table(rows=1, cols=4)
+            indexes_table.style = 'Light Grid Accent 1'
+            for cell, header in zip(indexes_table.rows[0].cells, ['Tabla', 'Índice', 'Columnas', 'Tipo']):
+                cell.text = header
+                cell.paragraphs[0].runs[0].style = 'MetricLabel'
+            for table_name, table_info in indexed_tables:
+                for index in table_info['indexes']:
+                    row = indexes_table.add_row()
+                    row.cells[0].text = table_name
+                    row.cells[1].text = index['name']
+                    row.cells[2].text = ', '.join(column or '(expresión)' for column in index['columns'])
+                    kind = index_origins.get(index['origin'], index['origin'])
+                    row.cells[3].text = f"{kind} (parcial)" if index['partial'] else kind
+        else:
+            self.doc.add_paragraph('El esquema no define índices secundarios.')
+            
+        # Claves foráneas sin índice
+        self.doc.add_paragraph('Claves Foráneas sin Índice', style='CustomH3')
+        missing = performance.get('unindexed_foreign_keys', [])
+        if missing:
+            self.doc.add_paragraph(
+                'Estas claves foráneas no encabezan ningún índice: los JOIN por la clave y cada borrado '
+                'o actualización en la tabla referenciada recorren la tabla completa.'
+            )
+            for foreign_key in missing:
+                columns = ', '.join(foreign_key['columns'])
+                paragraph = self.doc.add_paragraph(f"• {foreign_key['table']}({columns}) → {foreign_key['references']}: ")
+                paragraph.add_run(
+                    f"CREATE INDEX idx_{foreign_key['table']}_{'_'.join(foreign_key['columns'])} "
+                    f"ON {foreign_key['table']}({columns});",
+                    style='CodeIdentifier'
+                )
+        else:
+            self.doc.add_paragraph('Todas las claves foráneas están cubiertas por un índice.')
+            
+        # Planes de ejecución de las consultas representativas
+        query_plans = performance.get('query_plans', [])
+        if not query_plans:
+            return
+        self.doc.add_paragraph('Planes de Ejecución', style='CustomH3')
+        full_scan_count = sum(1 for query_plan in query_plans if query_plan['full_scans'])
+        automatic_count = sum(1 for query_plan in query_plans if query_plan['automatic_indexes'])
+        self.doc.add_paragraph(
+            f"{len(query_plans)} consultas analizadas con EXPLAIN QUERY PLAN; "
+            f"{full_scan_count} recorren alguna tabla completa y {automatic_count} necesitan "
+            f"un índice automático (construido en cada ejecución)."
+        )
+        for query_plan in query_plans:
+            self.doc.add_paragraph().add_run(query_plan['query'], style='CodeIdentifier')
+            if query_plan['error']:
+                self.doc.add_paragraph().add_run(f"  No se pudo analizar: {query_plan['error']}", style='SmallText')
+                continue
+            for detail in query_plan['plan']:
+                self.doc.add_paragraph().add_run(f"  {detail}", style='SmallText')
+            if query_plan['full_scans']:
+                self.doc.add_paragraph(
+                    f"  ⚠️ Recorrido completo de: {', '.join(query_plan['full_scans'])}"
+                ).runs[0].style = 'MetricLabel'
+            if query_plan['automatic_indexes']:
+                self.doc.add_paragraph(
+                    f"  ⚠️ Índice automático (falta un índice) en: {', '.join(query_plan['automatic_indexes'])}"
+                ).runs[0].style = 'MetricLabel'
+    
+    def _add_storage_statistics(self, performance):
+        """Páginas, freelist y desglose por tabla/índice (dbstat) del apéndice de rendimiento"""
+        self.doc.add_paragraph('Almacenamiento', style='CustomH3')
+        page_size = performance['page_size']
+        page_count = performance['page_count']
+        freelist_count = performance['freelist_count']
+        freelist_ratio = freelist_count / page_count * 100 if page_count else 0
+        self.doc.add_paragraph(
+            f"Tamaño de página: {page_size} bytes · Páginas: {page_count} "
+            f"({page_size * page_count / 1024 ** 2:.2f} MB) · Páginas libres: {freelist_count} ({freelist_ratio:.1f}%)"
+        )
+        if freelist_ratio > 10:
+            self.doc.add_paragraph(
+                'Más del 10% de las páginas están libres: un VACUUM reduciría el archivo y su fragmentación.'
+            )
+            
+        objects = performance.get('objects')
+        if objects:
+            objects_table = self.doc.add_table(rows=1, cols=4)
+            objects_table.style = 'Light Grid Accent 1'
+            for cell, header in zip(objects_table.rows[0].cells, ['Tabla / Índice', 'Páginas', 'Tamaño (KB)', 'Sin usar']):
+                cell.text = header
+                cell.paragraphs[0].runs[0].style = 'MetricLabel'
+            for db_object in objects[:15]:
+                row = objects_table.add_row()
+                row.cells[0].text = db_object['name']
+                row.cells[1].text = str(db_object['pages'])
+                row.cells[2].text = f"{db_object['bytes'] / 1024:.1f}"
+                row.cells[3].text = f"{db_object['unused'] / db_object['bytes'] * 100:.1f}%" if db_object['bytes'] else '0%'
+        elif objects is None:
+            self.doc.add_paragraph('Desglose por tabla no disponible: SQLite sin la tabla virtual dbstat.')
     
     def _generate_detailed_table_analysis(self, table_name, table_info, descriptions):
         """Genera análisis detallado para una tabla específica"""
@@ -1403,7 +1633,7 @@ La digitalización implementada a través de este sistema permite a las empresas
             else:
                 status = "Volumen alto - Monitorear performance"
                 
-            self.doc.add_paragraph(f"Registros actuales: {row_count} ({status})")
+            self.doc.add_paragraph(f"Registros actuales: {format_row_count(table_info)} ({status})")
         
         # Separador entre tablas
         self.doc.add_paragraph()
@@ -1421,8 +1651,30 @@ def main():
     output_path.mkdir(exist_ok=True)
     
     try:
+        # Modo incremental (recomendado en CI): DOC_INCREMENTAL=true
+        incremental = os.getenv('DOC_INCREMENTAL', 'false').lower() == 'true'
+        
+        # Procesos para el análisis de archivos y el renderizado de secciones: DOC_WORKERS=0 usa todos los núcleos
+        workers = int(os.getenv('DOC_WORKERS', '1'))
+        
+        # Tamaño máximo de archivo a analizar en KB: DOC_MAX_FILE_KB=0 desactiva el límite
+        max_file_kb = int(os.getenv('DOC_MAX_FILE_KB', str(DEFAULT_MAX_FILE_SIZE // 1024)))
+        
+        # Conteo exacto de filas (COUNT(*)) en lugar de sqlite_stat1 o la estimación: DOC_EXACT_ROW_COUNTS=true
+        exact_row_counts = os.getenv('DOC_EXACT_ROW_COUNTS', 'false').lower() == 'true'
+        
+        # Consultas para EXPLAIN QUERY PLAN (archivo .sql separado por ';'): DOC_QUERY_PLAN_FILE
+        query_plan_file = os.getenv('DOC_QUERY_PLAN_FILE')
+        representative_queries = load_representative_queries(query_plan_file) if query_plan_file else None
+        
         # Crear generador
-        generator = BackendDocumentationGenerator(backend_path, output_path)
+        generator = BackendDocumentationGenerator(
+            backend_path, output_path, incremental=incremental, workers=workers,
+            max_file_size=max_file_kb * 1024 or None, exact_row_counts=exact_row_counts,
+            representative_queries=representative_queries,
+            # Servidor MySQL/PostgreSQL si se configura DOC_DB_DRIVER; si no, SQLite local
+            schema_provider=schema_provider_from_env(exact_row_counts)
+        )
         
         # Generar documentación
         output_file = generator.generate_complete_documentation()
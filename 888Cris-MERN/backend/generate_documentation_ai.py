@@ -9,6 +9,7 @@ from pathlib import Path
 import json
 import sqlite3
 import asyncio
+import itertools
 import aiohttp
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
@@ -17,14 +18,37 @@ from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.shared import OxmlElement, qn
 from docx.enum.table import WD_TABLE_ALIGNMENT
 import ast
-import re
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any, AsyncIterator
 import hashlib
 from dataclasses import dataclass
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import print as rprint
 import tiktoken
+from js_lexer import scan_javascript
+from code_patterns import BATCH_SECTION, extract_routes
+from ai_cache import AIResponseCache
+from ai_rate_limit import RateLimiter, parse_retry_after, backoff_delay
+from docx_stream import StreamingDocumentWriter
+from source_walker import map_source, DEFAULT_MAX_FILE_SIZE
+from analysis_core import AnalysisEngine, ProjectScan, DEFAULT_PROJECT_INFO, analyze_javascript_content
+from schema_providers import format_row_count, load_representative_queries, schema_provider_from_env
+
+# Versión de las plantillas de prompt (mensaje de sistema y _get_prompt_for_content_type).
+# Incrementarla al modificarlas invalida solo las respuestas cacheadas con la versión anterior.
+PROMPT_TEMPLATE_VERSION = 1
+
+# Códigos HTTP que se reintentan (límite de cuota y errores transitorios del servidor)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class AIAPIError(Exception):
+    """Respuesta de error de la API de IA, con el Retry-After indicado por el servidor"""
+    
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"API Error {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
 
 # Configuración de IA
 @dataclass
@@ -33,11 +57,31 @@ class AIConfig:
     provider: str = "openai"  # "openai", "anthropic", "gemini"
     model: str = "gpt-4"
     api_key: str = ""
+    api_base_url: str = "https://api.openai.com/v1"  # Permite apuntar a un proxy o servidor local
     max_tokens: int = 4000
+    max_input_tokens: int = 3000  # Tokens de código por petición (los archivos mayores se dividen)
+    batch_small_files: bool = True  # Agrupar archivos pequeños en una sola petición
+    small_file_tokens: int = 600  # Tamaño máximo (tokens) de un archivo agrupable
+    batch_max_files: int = 6  # Archivos máximos por petición agrupada
     temperature: float = 0.3
     timeout: int = 30
     cache_enabled: bool = True
     cache_duration_hours: int = 24
+    cache_file: str = "ai_cache.db"  # Base de datos SQLite del cache de respuestas
+    cache_max_entries: int = 5000  # Máximo de respuestas guardadas (0 = sin límite)
+    cache_max_mb: float = 50.0  # Tamaño máximo del contenido cacheado en MB (0 = sin límite)
+    max_concurrent_requests: int = 5  # Máximo de peticiones simultáneas a la API
+    requests_per_minute: int = 0  # Cuota de peticiones por minuto (0 = sin límite)
+    tokens_per_minute: int = 0  # Cuota de tokens (entrada + salida máxima) por minuto (0 = sin límite)
+    retry_attempts: int = 3  # Reintentos ante 429, errores 5xx o fallos de conexión
+    retry_base_delay: float = 1.0  # Segundos base del backoff exponencial
+    retry_max_delay: float = 60.0  # Espera máxima entre reintentos
+    streaming: bool = True  # Recibir las secciones largas en streaming (SSE) y escribirlas según llegan
+    connections_per_host: int = 5  # Conexiones keep-alive por host en la sesión HTTP
+    keepalive_timeout: float = 30.0  # Segundos que una conexión inactiva sigue abierta
+    dns_cache_ttl: int = 300  # Segundos que se cachea la resolución DNS
+    max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE  # Bytes; archivos mayores no se analizan (None = sin límite)
+    exact_row_counts: bool = False  # COUNT(*) por tabla en lugar de sqlite_stat1 o una estimación rápida
 
 class AIDocumentationEnhancer:
     """
@@ -49,35 +93,252 @@ class AIDocumentationEnhancer:
         self.config = config
         self.console = Console()
         self.encoding = tiktoken.encoding_for_model("gpt-4")
-        self.cache = {}
-        self.cache_file = Path("ai_cache.json")
-        self.load_cache()
+        self.cache_file = Path(self.config.cache_file)
+        self.cache = AIResponseCache(
+            self.cache_file,
+            max_entries=self.config.cache_max_entries,
+            max_bytes=int(self.config.cache_max_mb * 1024 * 1024),
+            ttl_hours=self.config.cache_duration_hours
+        )
+        self._request_semaphore = None
+        self.rate_limiter = RateLimiter(self.config.requests_per_minute, self.config.tokens_per_minute)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.token_usage: List[Dict] = []  # Tokens de cada petición: {label, prompt_tokens, completion_tokens}
+        
+    async def __aenter__(self):
+        await self.open()
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        self.cache.close()
+        
+    async def open(self) -> aiohttp.ClientSession:
+        """Abre (si no lo está) la sesión HTTP compartida por todas las peticiones"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=max(1, self.config.connections_per_host),
+                keepalive_timeout=self.config.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.config.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+            )
+        return self._session
         
-    def load_cache(self):
-        """Carga cache de respuestas de IA"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-            except Exception as e:
-                self.console.print(f"⚠️ Error cargando cache: {e}", style="yellow")
-                self.cache = {}
-                
-    def save_cache(self):
-        """Guarda cache de respuestas de IA"""
+    async def close(self):
+        """Cierra la sesión HTTP compartida y sus conexiones"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            
+    def get_cached(self, cache_key: str) -> Optional[Dict]:
+        """Lee una entrada vigente del cache de respuestas de IA (None si no existe, caducó o hay error)"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            return self.cache.get(cache_key)
+        except Exception as e:
+            self.console.print(f"⚠️ Error leyendo cache: {e}", style="yellow")
+            return None
+            
+    def save_cache(self, cache_key: str, entry: Dict):
+        """Guarda una respuesta de IA en el cache (inserción atómica e individual)"""
+        try:
+            self.cache.set(cache_key, entry)
         except Exception as e:
             self.console.print(f"⚠️ Error guardando cache: {e}", style="yellow")
             
-    def get_cache_key(self, prompt: str, context: str = "") -> str:
-        """Genera clave única para cache"""
-        content = f"{prompt}|||{context}"
-        return hashlib.md5(content.encode()).hexdigest()
-        
-    async def call_openai_api(self, messages: List[Dict], **kwargs) -> str:
-        """Llama a la API de OpenAI"""
+    def get_cache_key(self, content_type: str, raw_data: Dict, context: str = "") -> str:
+        """
+        Genera la clave de cache a partir de una serialización JSON canónica de todo lo que
+        determina la respuesta: modelo, parámetros, tipo de contenido, versión de plantilla y datos
+        """
+        key_data = {
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+            "content_type": content_type,
+            "prompt_version": PROMPT_TEMPLATE_VERSION,
+            "raw_data": raw_data,
+            "context": context
+        }
+        canonical = json.dumps(key_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+        
+    @property
+    def request_semaphore(self) -> asyncio.Semaphore:
+        """Semáforo que limita las peticiones simultáneas (se crea dentro del event loop)"""
+        if self._request_semaphore is None:
+            self._request_semaphore = asyncio.Semaphore(max(1, self.config.max_concurrent_requests))
+        return self._request_semaphore
+        
+    def count_tokens(self, text: str) -> int:
+        """Número de tokens del texto según el encoder del modelo"""
+        return len(self.encoding.encode(text))
+        
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Recorta el texto a como máximo max_tokens tokens"""
+        tokens = self.encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+        
+    def split_code_into_chunks(self, content: str, max_tokens: int) -> List[str]:
+        """
+        Divide el código en fragmentos de como máximo max_tokens tokens cortando al inicio de
+        funciones y clases (junto con sus comentarios previos). Los bloques que por sí solos
+        superan el presupuesto se cortan por líneas.
+        """
+        boundaries = {0}
+        for offset in scan_javascript(content)['declaration_offsets']:
+            line_start = content.rfind('\n', 0, offset) + 1
+            # Incluir en el bloque los comentarios inmediatamente anteriores (JSDoc, //)
+            while line_start > 0:
+                previous_start = content.rfind('\n', 0, line_start - 1) + 1
+                if not content[previous_start:line_start].strip().startswith(('//', '/*', '*')):
+                    break
+                line_start = previous_start
+            boundaries.add(line_start)
+            
+        starts = sorted(boundaries)
+        segments = [content[start:end] for start, end in zip(starts, starts[1:] + [len(content)])]
+        
+        chunks, current, current_tokens = [], [], 0
+        for segment in segments:
+            for piece, tokens in self._split_segment(segment, max_tokens):
+                if current and current_tokens + tokens > max_tokens:
+                    chunks.append(''.join(current))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += tokens
+        if current:
+            chunks.append(''.join(current))
+        return chunks
+        
+    def _split_segment(self, segment: str, max_tokens: int) -> List:
+        """Devuelve (texto, tokens) del bloque, dividido por líneas si excede el presupuesto"""
+        tokens = self.count_tokens(segment)
+        if tokens <= max_tokens:
+            return [(segment, tokens)]
+        pieces = []
+        for line in segment.splitlines(keepends=True):
+            line = self.truncate_to_tokens(line, max_tokens)
+            pieces.append((line, self.count_tokens(line)))
+        return pieces
+        
+    @asynccontextmanager
+    async def _chat_completion_response(self, messages: List[Dict], label: str, reserved_tokens: int, **kwargs):
+        """
+        Abre una respuesta de chat completion respetando la cuota por minuto y el límite de
+        peticiones simultáneas (el hueco se mantiene mientras se consume la respuesta).
+        Los 429, errores 5xx y fallos de conexión se reintentan con backoff exponencial con
+        jitter, o esperando el Retry-After indicado por el servidor (como mucho retry_max_delay);
+        los tokens reservados para un intento fallido se devuelven a la cuota.
+        """
+        for attempt in range(self.config.retry_attempts + 1):
+            await self.rate_limiter.acquire(reserved_tokens)
+            async with self.request_semaphore:
+                try:
+                    response = await self._open_chat_completion(messages, **kwargs)
+                except (AIAPIError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    error = e
+                else:
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+                    
+            # La API no atendió la petición: sus tokens reservados vuelven al bucket
+            self.rate_limiter.refund_tokens(reserved_tokens)
+            
+            # El reintento se espera fuera del semáforo para no ocupar un hueco
+            retryable = not isinstance(error, AIAPIError) or error.status in RETRYABLE_STATUS_CODES
+            if not retryable or attempt == self.config.retry_attempts:
+                raise error
+                
+            # El Retry-After del servidor también se limita a retry_max_delay
+            retry_after = getattr(error, 'retry_after', None)
+            delay = min(retry_after, self.config.retry_max_delay) if retry_after is not None else backoff_delay(
+                attempt, self.config.retry_base_delay, self.config.retry_max_delay
+            )
+            if getattr(error, 'status', None) == 429:
+                # Cuota agotada: pausar también el resto de peticiones concurrentes
+                self.rate_limiter.defer(delay)
+            self.console.print(
+                f"⏳ {label or 'Petición'}: {error} - reintento {attempt + 1}/{self.config.retry_attempts} en {delay:.1f}s",
+                style="yellow"
+            )
+            await asyncio.sleep(delay)
+            
+    async def call_openai_api(self, messages: List[Dict], label: str = "", **kwargs) -> str:
+        """Llama a la API de OpenAI y devuelve la respuesta completa"""
+        prompt_tokens = sum(self.count_tokens(m['content']) for m in messages)
+        reserved_tokens = prompt_tokens + kwargs.get('max_tokens', self.config.max_tokens)
+        
+        async with self._chat_completion_response(messages, label, reserved_tokens, **kwargs) as response:
+            result = await response.json()
+            
+        content = result["choices"][0]["message"]["content"]
+        usage = result.get("usage") or {}
+        self._record_usage(label, reserved_tokens, prompt_tokens, usage, content)
+        return content
+        
+    async def stream_openai_api(self, messages: List[Dict], label: str = "", **kwargs) -> AsyncIterator[str]:
+        """Llama a la API de OpenAI en modo streaming (SSE) y produce el texto según llega"""
+        prompt_tokens = sum(self.count_tokens(m['content']) for m in messages)
+        reserved_tokens = prompt_tokens + kwargs.get('max_tokens', self.config.max_tokens)
+        
+        usage = {}
+        completion_tokens = 0
+        async with self._chat_completion_response(
+            messages, label, reserved_tokens,
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        ) as response:
+            async for raw_line in response.content:
+                line = raw_line.decode('utf-8').strip()
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                    
+                event = json.loads(data)
+                usage = event.get("usage") or usage
+                for choice in event.get("choices", []):
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        completion_tokens += self.count_tokens(delta)
+                        yield delta
+                        
+        usage.setdefault('completion_tokens', completion_tokens)
+        self._record_usage(label, reserved_tokens, prompt_tokens, usage, "")
+        
+    def _record_usage(self, label: str, reserved_tokens: int, prompt_tokens: int, usage: Dict, content: str):
+        """Registra los tokens de una petición y devuelve al bucket los reservados y no usados"""
+        completion_tokens = usage.get('completion_tokens') or self.count_tokens(content)
+        self.rate_limiter.refund_tokens(reserved_tokens - prompt_tokens - completion_tokens)
+        
+        # Tokens de la petición (los de la API o, si no los devuelve, estimados)
+        self.token_usage.append({
+            'label': label,
+            'prompt_tokens': usage.get('prompt_tokens') or prompt_tokens,
+            'completion_tokens': completion_tokens
+        })
+        
+    def token_summary(self) -> Dict[str, Dict]:
+        """Peticiones y tokens de entrada/salida acumulados por tipo de contenido"""
+        summary = {}
+        for usage in self.token_usage:
+            totals = summary.setdefault(usage['label'] or 'otros', {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+            totals['requests'] += 1
+            totals['prompt_tokens'] += usage['prompt_tokens']
+            totals['completion_tokens'] += usage['completion_tokens']
+        return summary
+        
+    async def _open_chat_completion(self, messages: List[Dict], **kwargs) -> aiohttp.ClientResponse:
+        """Envía una petición de chat completion a la API de OpenAI y devuelve la respuesta abierta"""
         headers = {
             "Authorization": f"Bearer {self.config.api_key}",
             "Content-Type": "application/json"
@@ -91,19 +352,54 @@ class AIDocumentationEnhancer:
             **kwargs
         }
         
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.timeout)) as session:
-            async with session.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"API Error {response.status}: {error_text}")
-                    
+        # Reutiliza la sesión abierta con 'async with enhancer' (conexiones keep-alive)
+        session = await self.open()
+        request_options = {}
+        if kwargs.get('stream'):
+            # En streaming el timeout total cortaría respuestas largas: se limita la espera entre fragmentos
+            request_options['timeout'] = aiohttp.ClientTimeout(
+                total=None, sock_connect=self.config.timeout, sock_read=self.config.timeout
+            )
+        response = await session.post(
+            f"{self.config.api_base_url.rstrip('/')}/chat/completions",
+            headers=headers,
+            json=payload,
+            **request_options
+        )
+        if response.status != 200:
+            error_text = await response.text()
+            response.release()
+            raise AIAPIError(response.status, error_text, parse_retry_after(response.headers))
+        return response
+        
+    def _build_messages(self, prompt: str) -> List[Dict]:
+        """Mensajes de chat: instrucciones de sistema comunes + prompt del usuario"""
+        return [
+            {
+                "role": "system",
+                "content": """Eres un experto en documentación técnica de software. Tu trabajo es analizar código fuente y generar documentación detallada, clara y profesional en español. 
+
+Características de tu escritura:
+- Técnicamente precisa pero accesible
+- Incluye ejemplos prácticos cuando sea relevante
+- Explica el "por qué" además del "qué"
+- Identifica patrones de diseño y buenas prácticas
+- Señala posibles mejoras o consideraciones
+- Usa un tono profesional pero no demasiado formal
+- Incluye emojis apropiados para mejorar la legibilidad
+
+Formato de respuesta:
+- Usa markdown para estructurar el contenido
+- Incluye código cuando sea necesario
+- Organiza la información de manera lógica
+- No repitas información obvia"""
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        
     async def enhance_content(self, content_type: str, raw_data: Dict, context: str = "") -> str:
         """
         Mejora contenido usando IA
@@ -115,52 +411,27 @@ class AIDocumentationEnhancer:
         """
         
         # Verificar cache
-        cache_key = self.get_cache_key(str(raw_data), context)
-        if self.config.cache_enabled and cache_key in self.cache:
-            cache_entry = self.cache[cache_key]
-            if self._is_cache_valid(cache_entry):
+        cache_key = self.get_cache_key(content_type, raw_data, context)
+        if self.config.cache_enabled:
+            cache_entry = self.get_cached(cache_key)
+            if cache_entry:
                 return cache_entry["content"]
                 
         # Preparar prompt según el tipo de contenido
         prompt = self._get_prompt_for_content_type(content_type, raw_data, context)
         
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": """Eres un experto en documentación técnica de software. Tu trabajo es analizar código fuente y generar documentación detallada, clara y profesional en español. 
-
-Características de tu escritura:
-- Técnicamente precisa pero accesible
-- Incluye ejemplos prácticos cuando sea relevante
-- Explica el "por qué" además del "qué"
-- Identifica patrones de diseño y buenas prácticas
-- Señala posibles mejoras o consideraciones
-- Usa un tono profesional pero no demasiado formal
-- Incluye emojis apropiados para mejorar la legibilidad
-
-Formato de respuesta:
-- Usa markdown para estructurar el contenido
-- Incluye código cuando sea necesario
-- Organiza la información de manera lógica
-- No repitas información obvia"""
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
+            messages = self._build_messages(prompt)
             
-            enhanced_content = await self.call_openai_api(messages)
+            enhanced_content = await self.call_openai_api(messages, label=content_type)
             
             # Guardar en cache
             if self.config.cache_enabled:
-                self.cache[cache_key] = {
+                self.save_cache(cache_key, {
                     "content": enhanced_content,
                     "timestamp": datetime.now().isoformat(),
                     "content_type": content_type
-                }
-                self.save_cache()
+                })
                 
             return enhanced_content
             
@@ -168,15 +439,131 @@ Formato de respuesta:
             self.console.print(f"❌ Error en IA para {content_type}: {e}", style="red")
             return self._get_fallback_content(content_type, raw_data)
             
-    def _is_cache_valid(self, cache_entry: Dict) -> bool:
-        """Verifica si una entrada de cache sigue siendo válida"""
-        try:
-            timestamp = datetime.fromisoformat(cache_entry["timestamp"])
-            age_hours = (datetime.now() - timestamp).total_seconds() / 3600
-            return age_hours < self.config.cache_duration_hours
-        except:
-            return False
+    async def enhance_batch(self, content_type: str, items: List[Dict], context: str = "") -> List[str]:
+        """
+        Mejora varios contenidos pequeños con una sola petición a la IA.
+        Las secciones obtenidas en lote se cachean bajo su propio tipo ("batch_analysis:<tipo>"),
+        distinto del de enhance_content, porque proceden de otro prompt; se reutiliza cualquiera
+        de las dos respuestas cacheadas y solo se envían los elementos sin ninguna. La respuesta
+        se divide por archivo y los que falten en ella se piden de forma individual.
+        """
+        batch_type = f"batch_analysis:{content_type}"
+        cache_keys = [self.get_cache_key(batch_type, item, context) for item in items]
+        results: List[Optional[str]] = [None] * len(items)
+        
+        pending = []
+        for index, cache_key in enumerate(cache_keys):
+            cache_entry = None
+            if self.config.cache_enabled:
+                cache_entry = (self.get_cached(cache_key)
+                               or self.get_cached(self.get_cache_key(content_type, items[index], context)))
+            if cache_entry:
+                results[index] = cache_entry["content"]
+            else:
+                pending.append(index)
+                
+        if len(pending) > 1:
+            prompt = self._get_prompt_for_content_type(
+                "batch_analysis", {'files': [items[index] for index in pending]}, context
+            )
+            try:
+                response = await self.call_openai_api(self._build_messages(prompt), label="batch_analysis")
+                sections = self._split_batch_response(response)
+            except Exception as e:
+                self.console.print(f"❌ Error en IA para lote de {len(pending)} archivos: {e}", style="red")
+                sections = {}
+                
+            missing = []
+            for index in pending:
+                section = sections.get(items[index].get('file_path'))
+                if not section:
+                    missing.append(index)
+                    continue
+                results[index] = section
+                if self.config.cache_enabled:
+                    self.save_cache(cache_keys[index], {
+                        "content": section,
+                        "timestamp": datetime.now().isoformat(),
+                        "content_type": batch_type
+                    })
+            pending = missing
+            
+        # Elementos sin respuesta en el lote (o lote de uno): petición individual
+        individual = await asyncio.gather(*(
+            self.enhance_content(content_type, items[index], context) for index in pending
+        ))
+        for index, content in zip(pending, individual):
+            results[index] = content
             
+        return results
+        
+    async def stream_prompt(self, prompt: str, label: str) -> AsyncIterator[str]:
+        """
+        Texto generado por la IA para un prompt libre, producido a medida que llega.
+        Con streaming desactivado se produce la respuesta completa de una vez; si está
+        en cache, se reproduce la respuesta guardada sin llamar a la API.
+        """
+        if not self.config.streaming:
+            yield await self.complete_prompt(prompt, label)
+            return
+            
+        cache_key = self.get_cache_key(label, {'prompt': prompt})
+        if self.config.cache_enabled:
+            cache_entry = self.get_cached(cache_key)
+            if cache_entry:
+                yield cache_entry["content"]
+                return
+                
+        parts = []
+        async for delta in self.stream_openai_api(self._build_messages(prompt), label=label):
+            parts.append(delta)
+            yield delta
+        self._save_prompt_response(cache_key, label, "".join(parts))
+        
+    async def complete_prompt(self, prompt: str, label: str) -> str:
+        """Respuesta completa (sin streaming) de la IA para un prompt libre, usando el cache"""
+        cache_key = self.get_cache_key(label, {'prompt': prompt})
+        if self.config.cache_enabled:
+            cache_entry = self.get_cached(cache_key)
+            if cache_entry:
+                return cache_entry["content"]
+                
+        content = await self.call_openai_api(self._build_messages(prompt), label=label)
+        self._save_prompt_response(cache_key, label, content)
+        return content
+        
+    def _save_prompt_response(self, cache_key: str, label: str, content: str):
+        """Guarda en cache la respuesta completa a un prompt libre"""
+        if self.config.cache_enabled and content:
+            self.save_cache(cache_key, {
+                "content": content,
+                "timestamp": datetime.now().isoformat(),
+                "content_type": label
+            })
+            
+    def _split_batch_response(self, response: str) -> Dict[str, str]:
+        """Divide la respuesta de un lote en secciones por archivo según sus marcadores"""
+        sections = {}
+        markers = list(BATCH_SECTION.finditer(response))
+        for marker, next_marker in zip(markers, markers[1:] + [None]):
+            end = next_marker.start() if next_marker else len(response)
+            sections[marker.group(1).strip()] = response[marker.end():end].strip()
+        return sections
+        
+    def _format_batch_files(self, files: List[Dict]) -> str:
+        """Bloque de datos y código de cada archivo de un lote para el prompt"""
+        blocks = []
+        for item in files:
+            blocks.append(
+                f"--- {item.get('file_path', 'N/A')} ---\n"
+                f"**Funciones encontradas:** {item.get('functions', [])}\n"
+                f"**Líneas de código:** {item.get('lines', 0)}\n"
+                f"**Imports:** {item.get('imports', [])}\n"
+                f"**Exports:** {item.get('exports', [])}\n"
+                f"```javascript\n{item.get('code_sample', 'No disponible')}\n```\n"
+            )
+        return "\n".join(blocks)
+        
     def _get_prompt_for_content_type(self, content_type: str, raw_data: Dict, context: str) -> str:
         """Genera prompt específico según el tipo de contenido"""
         
@@ -206,6 +593,68 @@ Por favor, proporciona:
 6. **Ejemplos de uso** si es relevante
 
 Responde en español, con formato markdown y enfoque en la utilidad para desarrolladores.
+""",
+
+            "chunk_analysis": f"""
+Analiza este fragmento ({raw_data.get('chunk_index', 1)} de {raw_data.get('chunk_count', 1)}) de un archivo JavaScript/Node.js:
+
+**Archivo:** {raw_data.get('file_path', 'N/A')}
+**Funciones en el fragmento:** {raw_data.get('functions', [])}
+
+**Código fuente del fragmento:**
+```javascript
+{raw_data.get('code_sample', 'No disponible')}
+```
+
+**Contexto del proyecto:** {context}
+
+Describe de forma concisa qué hace cada función del fragmento (parámetros, retorno,
+efectos secundarios) y los patrones o problemas que observes. Este análisis se combinará
+después con el de los demás fragmentos, así que no hagas introducción ni conclusiones.
+Responde en español, con formato markdown.
+""",
+
+            "chunk_summary": f"""
+Estos son los análisis parciales de un archivo JavaScript/Node.js que se dividió en fragmentos.
+Combínalos en una documentación única y coherente del archivo completo:
+
+**Archivo:** {raw_data.get('file_path', 'N/A')}
+**Funciones encontradas:** {raw_data.get('functions', [])}
+**Líneas de código:** {raw_data.get('lines', 0)}
+**Imports:** {raw_data.get('imports', [])}
+**Exports:** {raw_data.get('exports', [])}
+
+**Análisis por fragmento:**
+{chr(10).join(f"--- Fragmento {i} ---{chr(10)}{partial}" for i, partial in enumerate(raw_data.get('chunk_analyses', []), 1))}
+
+**Contexto del proyecto:** {context}
+
+Por favor, proporciona:
+1. **Propósito y responsabilidad** del archivo
+2. **Análisis de las funciones principales** (qué hacen, parámetros, retorno)
+3. **Patrones de diseño** utilizados
+4. **Dependencias** y su propósito
+5. **Posibles mejoras** o consideraciones
+6. **Ejemplos de uso** si es relevante
+
+Responde en español, con formato markdown y enfoque en la utilidad para desarrolladores.
+""",
+
+            "batch_analysis": f"""
+Analiza estos {len(raw_data.get('files', []))} archivos JavaScript/Node.js pequeños y documenta cada uno por separado:
+
+{self._format_batch_files(raw_data.get('files', []))}
+**Contexto del proyecto:** {context}
+
+Para cada archivo, proporciona de forma concisa:
+1. **Propósito y responsabilidad** del archivo
+2. **Análisis de las funciones principales** (qué hacen, parámetros, retorno)
+3. **Dependencias** y su propósito
+4. **Posibles mejoras** o consideraciones
+
+IMPORTANTE: empieza la sección de cada archivo con una línea exactamente así (con su ruta):
+=== ARCHIVO: ruta/del/archivo.js ===
+No escribas nada antes de la primera línea de ese tipo. Responde en español, con formato markdown.
 """,
 
             "architecture_overview": f"""
@@ -318,6 +767,9 @@ Enfócate en aspectos prácticos de seguridad web.
         
     def _get_fallback_content(self, content_type: str, raw_data: Dict) -> str:
         """Contenido de respaldo cuando la IA no está disponible"""
+        if content_type == "chunk_summary":
+            content_type = "function_analysis"  # Mismos datos del archivo completo
+            
         fallbacks = {
             "function_analysis": f"""
 ## Análisis de Archivo
@@ -331,6 +783,10 @@ Enfócate en aspectos prácticos de seguridad web.
 
 ### Dependencias
 {chr(10).join([f"- {imp}" for imp in raw_data.get('imports', [])])}
+""",
+            "chunk_analysis": f"""
+### Fragmento {raw_data.get('chunk_index', 1)} de {raw_data.get('chunk_count', 1)}
+{chr(10).join([f"- {func}" for func in raw_data.get('functions', [])])}
 """,
             "architecture_overview": """
 ## Visión General de la Arquitectura
@@ -356,37 +812,54 @@ Todas las respuestas siguen el formato JSON estándar con códigos de estado HTT
         
         return fallbacks.get(content_type, "## Contenido no disponible\n\nNo se pudo generar contenido mejorado para esta sección.")
 
+def split_paragraphs(text: str) -> List[str]:
+    """Párrafos no vacíos de un texto completo, con el mismo criterio que iter_paragraphs"""
+    return [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+
+async def iter_paragraphs(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Agrupa texto recibido en streaming en párrafos completos (separados por una línea en blanco)"""
+    buffer = ""
+    async for delta in deltas:
+        buffer += delta
+        while "\n\n" in buffer:
+            paragraph, buffer = buffer.split("\n\n", 1)
+            if paragraph.strip():
+                yield paragraph.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
 class EnhancedBackendDocumentationGenerator:
     """
     Generador mejorado de documentación con IA
     Versión 2.0 con análisis inteligente y contenido mejorado
     """
     
-    def __init__(self, backend_path, output_path, ai_config: AIConfig):
+    def __init__(self, backend_path, output_path, ai_config: AIConfig, schema_provider=None):
         self.backend_path = Path(backend_path)
         self.output_path = Path(output_path)
         self.ai_enhancer = AIDocumentationEnhancer(ai_config)
         self.console = Console()
         self.doc = Document()
+        # Escritura en streaming: cada sección terminada se vuelca a disco y sale del árbol en memoria
+        self.doc_writer = StreamingDocumentWriter(self.doc)
         self.current_date = datetime.now().strftime("%d de %B de %Y")
         
         # Configuración de estilos
         self.setup_styles()
         
+        # Motor de análisis compartido con el generador básico
+        self.engine = AnalysisEngine(
+            self.backend_path, max_file_size=ai_config.max_file_size, exact_row_counts=ai_config.exact_row_counts,
+            schema_provider=schema_provider
+        )
+        # Recorrido del backend en curso (generate_enhanced_documentation)
+        self.project_scan: Optional[ProjectScan] = None
+        
         # Datos del proyecto
-        self.project_info = {
-            'name': '888Cargo Backend',
-            'version': '1.0.0', 
-            'description': 'Sistema de gestión de listas de empaque con códigos QR',
-            'author': 'FiveCGroup',
-            'license': 'MIT'
-        }
+        self.project_info = dict(DEFAULT_PROJECT_INFO)
         
         # Estructura de directorios a analizar
-        self.directories_to_analyze = [
-            'controllers', 'services', 'models', 'repositories',
-            'routes', 'middlewares', 'validators', 'utils', 'config'
-        ]
+        self.directories_to_analyze = self.engine.directories
         
         # Datos recopilados para análisis de IA
         self.collected_data = {
@@ -445,120 +918,173 @@ class EnhancedBackendDocumentationGenerator:
         
     async def analyze_file_with_ai(self, file_path: Path) -> Dict:
         """Analiza un archivo usando IA para obtener insights detallados"""
+        prepared = self._prepare_file_for_ai(file_path)
+        if not prepared:
+            return {}
+        return await self._analyze_prepared_file(prepared)
         
+    def _project_context(self) -> str:
+        """Contexto del proyecto incluido en los prompts"""
+        return f"Proyecto: {self.project_info['name']} - {self.project_info['description']}"
+        
+    def _prepare_file_for_ai(self, file_path: Path, analysis: Optional[Dict] = None) -> Dict:
+        """
+        Lee un archivo y calcula su análisis básico, los datos para IA y su tamaño en tokens.
+        Si se recibe el análisis del recorrido compartido no se vuelve a escanear el código.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
+            with map_source(file_path) as buffer:
+                # Análisis básico del código sobre los bytes del archivo (mmap si es grande)
+                if analysis:
+                    basic_analysis = self._basic_from_analysis(analysis)
+                else:
+                    basic_analysis = self._basic_code_analysis(buffer, file_path)
+                # El código completo solo se decodifica una vez, para el prompt
+                content = str(buffer, 'utf-8')
+        except (OSError, UnicodeDecodeError) as e:
             self.console.print(f"⚠️ Error leyendo {file_path}: {e}", style="yellow")
             return {}
-            
-        # Análisis básico del código
-        basic_analysis = self._basic_code_analysis(content, file_path)
-        
-        # Preparar datos para IA
-        ai_data = {
-            'file_path': str(file_path.relative_to(self.backend_path)),
-            'code_sample': content[:2000] if len(content) > 2000 else content,  # Limitar para tokens
-            **basic_analysis
-        }
-        
-        # Contexto del proyecto
-        context = f"Proyecto: {self.project_info['name']} - {self.project_info['description']}"
-        
-        # Obtener análisis mejorado de IA
-        enhanced_analysis = await self.ai_enhancer.enhance_content(
-            "function_analysis", 
-            ai_data, 
-            context
-        )
         
         return {
+            'file_path': file_path,
+            'content': content,
             'basic': basic_analysis,
-            'enhanced': enhanced_analysis,
-            'file_path': file_path
+            'ai_data': {
+                'file_path': str(file_path.relative_to(self.backend_path)),
+                'code_sample': content,
+                **basic_analysis
+            },
+            'tokens': self.ai_enhancer.count_tokens(content)
         }
         
-    def _basic_code_analysis(self, content: str, file_path: Path) -> Dict:
-        """Análisis básico del código sin IA"""
-        
-        analysis = {
-            'lines': len(content.split('\n')),
-            'functions': [],
-            'classes': [],
-            'exports': [],
-            'imports': [],
-            'comments': [],
-            'complexity_score': 0
+    async def _analyze_prepared_file(self, prepared: Dict) -> Dict:
+        """Análisis con IA de un archivo ya leído (completo o por fragmentos según su tamaño)"""
+        context = self._project_context()
+        
+        # Los archivos que caben en el presupuesto de tokens se envían completos
+        token_budget = self.ai_enhancer.config.max_input_tokens
+        if prepared['tokens'] <= token_budget:
+            # Obtener análisis mejorado de IA
+            enhanced_analysis = await self.ai_enhancer.enhance_content(
+                "function_analysis", 
+                prepared['ai_data'], 
+                context
+            )
+        else:
+            enhanced_analysis = await self._analyze_large_file_with_ai(
+                prepared['ai_data']['file_path'], prepared['content'], prepared['basic'], context, token_budget
+            )
+            
+        return {
+            'basic': prepared['basic'],
+            'enhanced': enhanced_analysis,
+            'file_path': prepared['file_path']
         }
         
-        # Buscar funciones con mejor regex
-        function_patterns = [
-            r'(?:async\s+)?function\s+(\w+)',  # function declarations
-            r'const\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>)',  # arrow functions
-            r'(\w+)\s*:\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>)',  # object methods
-            r'static\s+(?:async\s+)?(\w+)\s*\(',  # static methods
+    def _plan_file_batches(self, prepared_files: List[Dict]) -> List[List[Dict]]:
+        """
+        Agrupa los archivos pequeños en lotes que caben en el presupuesto de tokens;
+        los demás forman un lote propio de un solo archivo
+        """
+        config = self.ai_enhancer.config
+        batches, current, current_tokens = [], [], 0
+        for prepared in prepared_files:
+            if not config.batch_small_files or prepared['tokens'] > config.small_file_tokens:
+                batches.append([prepared])
+                continue
+            if current and (current_tokens + prepared['tokens'] > config.max_input_tokens
+                            or len(current) >= config.batch_max_files):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(prepared)
+            current_tokens += prepared['tokens']
+        if current:
+            batches.append(current)
+        return batches
+        
+    async def _analyze_file_batch(self, batch: List[Dict]) -> List[Dict]:
+        """Analiza un lote de archivos; los de varios archivos usan una única petición"""
+        if len(batch) == 1:
+            return [await self._analyze_prepared_file(batch[0])]
+            
+        enhanced = await self.ai_enhancer.enhance_batch(
+            "function_analysis",
+            [prepared['ai_data'] for prepared in batch],
+            self._project_context()
+        )
+        return [
+            {'basic': prepared['basic'], 'enhanced': enhanced_analysis, 'file_path': prepared['file_path']}
+            for prepared, enhanced_analysis in zip(batch, enhanced)
         ]
         
-        for pattern in function_patterns:
-            for match in re.finditer(pattern, content):
-                func_name = match.group(1)
-                if func_name and func_name not in analysis['functions']:
-                    analysis['functions'].append(func_name)
-                    
-        # Buscar clases
-        class_pattern = r'class\s+(\w+)(?:\s+extends\s+\w+)?'
-        for match in re.finditer(class_pattern, content):
-            analysis['classes'].append(match.group(1))
-            
-        # Buscar exports más completos
-        export_patterns = [
-            r'module\.exports\s*=\s*(\w+)',
-            r'export\s+(?:default\s+)?(?:class\s+|function\s+|const\s+)?(\w+)',
-            r'exports\.(\w+)\s*='
-        ]
+    async def _analyze_large_file_with_ai(self, relative_path: str, content: str, basic_analysis: Dict,
+                                          context: str, token_budget: int) -> str:
+        """
+        Map-reduce para archivos que exceden el presupuesto de tokens: cada fragmento (cortado en
+        límites de función) se analiza en paralelo y después se resume en un único análisis
+        """
+        chunks = self.ai_enhancer.split_code_into_chunks(content, token_budget)
+        
+        partial_analyses = await asyncio.gather(*(
+            self.ai_enhancer.enhance_content("chunk_analysis", {
+                'file_path': relative_path,
+                'chunk_index': index,
+                'chunk_count': len(chunks),
+                'functions': self._chunk_functions(chunk),
+                'code_sample': chunk
+            }, context)
+            for index, chunk in enumerate(chunks, 1)
+        ))
+        
+        # Repartir el presupuesto entre los análisis parciales para que el resumen quepa
+        partial_budget = max(1, token_budget // len(partial_analyses))
+        summary_data = {
+            'file_path': relative_path,
+            **basic_analysis,
+            'chunk_analyses': [
+                self.ai_enhancer.truncate_to_tokens(partial, partial_budget) for partial in partial_analyses
+            ]
+        }
+        return await self.ai_enhancer.enhance_content("chunk_summary", summary_data, context)
         
-        for pattern in export_patterns:
-            for match in re.finditer(pattern, content):
-                if match.group(1):
-                    analysis['exports'].append(match.group(1))
-                    
-        # Buscar imports mejorados
-        import_patterns = [
-            r'require\([\'"]([^\'"]+)[\'"]\)',
-            r'import.*from\s+[\'"]([^\'"]+)[\'"]',
-            r'import\s+[\'"]([^\'"]+)[\'"]'
-        ]
+    def _chunk_functions(self, chunk: str) -> List[str]:
+        """Funciones y métodos de clase declarados en un fragmento de código"""
+        scan = scan_javascript(chunk)
+        return list(dict.fromkeys(scan['functions'] + scan['methods'] + scan['static_methods'] + scan['object_methods']))
         
-        for pattern in import_patterns:
-            for match in re.finditer(pattern, content):
-                module = match.group(1)
-                if module and not module.startswith('.'):
-                    analysis['imports'].append(module)
-                    
-        # Calcular complejidad ciclomática básica
-        complexity_keywords = ['if', 'else', 'while', 'for', 'switch', 'case', 'catch', '&&', '||', '?']
-        for keyword in complexity_keywords:
-            analysis['complexity_score'] += len(re.findall(rf'\b{keyword}\b', content))
-            
-        # Buscar comentarios importantes
-        comment_patterns = [
-            r'//\s*(.{20,})',  # Comentarios de línea largos
-            r'/\*\*(.*?)\*/',  # JSDoc comments
-            r'//\s*TODO:?\s*(.+)',  # TODOs
-            r'//\s*FIXME:?\s*(.+)',  # FIXMEs
-        ]
+    def _basic_code_analysis(self, content, file_path: Path) -> Dict:
+        """Análisis básico del código sin IA (content: str o buffer de bytes UTF-8)"""
+        rel_path = str(file_path.relative_to(self.backend_path))
+        return self._basic_from_analysis(analyze_javascript_content(content, rel_path))
         
-        for pattern in comment_patterns:
-            for match in re.finditer(pattern, content, re.DOTALL):
-                comment = match.group(1).strip()
-                if len(comment) > 10:
-                    analysis['comments'].append(comment[:100])  # Limitar longitud
-                    
-        return analysis
+    def _basic_from_analysis(self, analysis: Dict) -> Dict:
+        """Datos del análisis compartido que se envían a la IA (mismas claves que usa el cache)"""
+        return {
+            'lines': analysis['lines'],
+            # Funciones, métodos de objeto y estáticos, sin duplicados
+            'functions': list(dict.fromkeys(
+                analysis['functions'] + analysis['object_methods'] + analysis['static_methods']
+            )),
+            'classes': analysis['classes'],
+            'exports': analysis['exports'],
+            'imports': analysis['imports'],
+            # Comentarios importantes: líneas largas, TODO/FIXME y JSDoc
+            'comments': analysis['key_comments'],
+            'complexity_score': analysis['complexity_score']
+        }
         
-    async def generate_enhanced_documentation(self):
-        """Genera documentación completa mejorada con IA"""
+    async def generate_enhanced_documentation(self, scan: Optional[ProjectScan] = None):
+        """
+        Genera documentación completa mejorada con IA.
+        scan: recorrido del backend ya hecho (p. ej. por el generador básico); si no se
+        recibe se realiza uno propio con el motor de análisis compartido.
+        """
+        # Una única sesión HTTP para todas las peticiones a la API durante la generación
+        async with self.ai_enhancer:
+            return await self._generate_enhanced_documentation(scan)
+            
+    async def _generate_enhanced_documentation(self, scan: Optional[ProjectScan] = None):
+        """Construye el documento completo (la sesión HTTP ya está abierta)"""
         
         with Progress(
             SpinnerColumn(),
@@ -573,44 +1099,63 @@ class EnhancedBackendDocumentationGenerator:
             progress.update(main_task, advance=5, description="📊 Analizando estructura del proyecto...")
             await asyncio.sleep(0.1)  # Para mostrar progreso
             
-            self.analyze_package_json()
-            self.analyze_project_structure()
+            if scan is None:
+                scan = self.engine.scan(project_info=self.project_info)
+            self.project_scan = scan
+            self.project_info = scan.project_info
             
             # Crear documento base
             progress.update(main_task, advance=10, description="📄 Creando documento base...")
             self.add_enhanced_title_page()
             self.add_enhanced_table_of_contents()
+            self.doc_writer.flush()
+            
+            # Análisis de archivos con IA: todas las peticiones se lanzan a la vez
+            # (limitadas por max_concurrent_requests) y se insertan después en orden estable
+            directory_files = self._collect_directory_files()
+            all_files = [js_file for _, _, js_files, _ in directory_files for js_file in js_files]
+            all_file_analyses = [analysis for _, _, _, analyses in directory_files for analysis in analyses]
+            
+            progress.update(
+                main_task, advance=5,
+                description=f"🤖 Analizando {len(all_files)} archivos con IA "
+                            f"(máx. {self.ai_enhancer.config.max_concurrent_requests} simultáneos)..."
+            )
+            all_analyses = await self.analyze_files_with_ai(all_files, all_file_analyses)
             
-            # Análisis de archivos con IA
-            progress.update(main_task, advance=5, description="🤖 Analizando archivos con IA...")
-            
-            for i, directory in enumerate(self.directories_to_analyze):
-                dir_path = self.backend_path / directory
-                if dir_path.exists():
-                    task_desc = f"🔍 Analizando {directory}/ con IA..."
-                    progress.update(main_task, description=task_desc)
-                    
-                    await self.analyze_directory_with_ai(directory, dir_path)
-                    
-                    # Calcular progreso (20-70% para análisis de directorios)
-                    dir_progress = 20 + (i + 1) * (50 / len(self.directories_to_analyze))
-                    progress.update(main_task, completed=dir_progress)
+            offset = 0
+            for i, (directory, dir_path, js_files, _) in enumerate(directory_files):
+                task_desc = f"🔍 Documentando {directory}/..."
+                progress.update(main_task, description=task_desc)
+                
+                analyses = all_analyses[offset:offset + len(js_files)]
+                offset += len(js_files)
+                await self.analyze_directory_with_ai(directory, dir_path, analyses)
+                self.doc_writer.flush()
+                
+                # Calcular progreso (20-70% para análisis de directorios)
+                dir_progress = 20 + (i + 1) * (50 / len(directory_files))
+                progress.update(main_task, completed=dir_progress)
                     
             # Análisis de base de datos
             progress.update(main_task, advance=10, description="🗄️ Analizando base de datos...")
-            db_schema = self.analyze_database_schema()
+            db_schema = scan.database_schema
             if db_schema:
-                await self.generate_enhanced_database_section(db_schema)
+                self.generate_enhanced_database_section(db_schema, scan.database_description)
+                self.doc_writer.flush()
                 
             # Generar secciones con IA
             progress.update(main_task, advance=5, description="🏗️ Generando arquitectura con IA...")
             await self.generate_enhanced_architecture_section()
+            self.doc_writer.flush()
             
             progress.update(main_task, advance=5, description="🔒 Analizando seguridad con IA...")
             await self.generate_enhanced_security_section()
+            self.doc_writer.flush()
             
             progress.update(main_task, advance=5, description="📡 Documentando API con IA...")
             await self.generate_enhanced_api_section()
+            self.doc_writer.flush()
             
             # Finalizar documento
             progress.update(main_task, advance=5, description="✨ Finalizando documento...")
@@ -618,7 +1163,8 @@ class EnhancedBackendDocumentationGenerator:
             
             # Guardar
             output_file = self.output_path / f"888Cargo_Backend_Documentation_AI_Enhanced_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-            self.doc.save(output_file)
+            self.doc_writer.save(output_file)
+            self.doc_writer.close()
             
             progress.update(main_task, completed=100, description="✅ ¡Documentación completada!")
             
@@ -688,8 +1234,63 @@ class EnhancedBackendDocumentationGenerator:
         
         self.add_page_break()
         
-    async def analyze_directory_with_ai(self, dir_name: str, dir_path: Path):
-        """Analiza un directorio completo usando IA"""
+    def _all_js_files(self, dir_path: Path) -> List[Path]:
+        """Todos los archivos JavaScript de un directorio y sus subdirectorios, en orden estable"""
+        directory = self.project_scan.directory(dir_path.name) if self.project_scan else None
+        if directory and directory.path == dir_path:
+            return directory.files
+        return self.engine.directory_js_files(dir_path)
+        
+    def _directory_js_files(self, dir_path: Path) -> List[Path]:
+        """Archivos JavaScript de un directorio a analizar con IA, en orden estable"""
+        # Limitar a 5 archivos por directorio para tokens
+        return self._all_js_files(dir_path)[:5]
+        
+    def _collect_directory_files(self) -> List:
+        """
+        Lista (directorio, ruta, archivos, análisis) de los directorios del recorrido a
+        analizar con IA (los 5 primeros archivos de cada uno, con su análisis básico)
+        """
+        return [
+            (directory.name, directory.path, directory.files[:5], directory.analyses[:5])
+            for directory in self.project_scan.directories
+        ]
+        
+    async def analyze_files_with_ai(self, js_files: List[Path], file_analyses: Optional[List] = None) -> List:
+        """
+        Lanza el análisis con IA de todos los archivos de forma concurrente.
+        Los archivos pequeños se agrupan en lotes de una sola petición; el número de peticiones
+        en vuelo lo limita el semáforo del AIDocumentationEnhancer. Los resultados (o la
+        excepción de cada archivo) se devuelven en el orden de entrada.
+        file_analyses: análisis básicos ya calculados, en el mismo orden que js_files.
+        """
+        results = {}
+        prepared_files = []
+        for js_file, analysis in zip(js_files, file_analyses or itertools.repeat(None)):
+            try:
+                prepared = self._prepare_file_for_ai(js_file, analysis)
+            except Exception as e:
+                results[js_file] = e
+                continue
+            if prepared:
+                prepared_files.append(prepared)
+                
+        batches = self._plan_file_batches(prepared_files)
+        outcomes = await asyncio.gather(
+            *(self._analyze_file_batch(batch) for batch in batches),
+            return_exceptions=True
+        )
+        for batch, outcome in zip(batches, outcomes):
+            for index, prepared in enumerate(batch):
+                results[prepared['file_path']] = outcome if isinstance(outcome, Exception) else outcome[index]
+                
+        return [results.get(js_file, {}) for js_file in js_files]
+        
+    async def analyze_directory_with_ai(self, dir_name: str, dir_path: Path, analyses: Optional[List] = None):
+        """
+        Analiza un directorio completo usando IA.
+        Si se reciben los análisis ya calculados (en el orden de _directory_js_files) solo se insertan.
+        """
         
         self.add_page_break()
         
@@ -726,17 +1327,23 @@ class EnhancedBackendDocumentationGenerator:
         self.doc.add_paragraph(descriptions.get(dir_name, f'Componentes del directorio {dir_name}.'))
         
         # Analizar archivos JavaScript en el directorio
-        js_files = list(dir_path.glob('*.js'))
+        js_files = self._all_js_files(dir_path)
         
         if js_files:
             # Información general
             summary_para = self.doc.add_paragraph(f'📊 **Resumen:** {len(js_files)} archivos encontrados')
             summary_para.runs[0].font.bold = True
             
-            # Analizar cada archivo con IA
-            for js_file in js_files[:5]:  # Limitar a 5 archivos por directorio para tokens
+            # Analizar los archivos con IA de forma concurrente si no vienen calculados
+            selected_files = self._directory_js_files(dir_path)
+            if analyses is None:
+                analyses = await self.analyze_files_with_ai(selected_files)
+                
+            # Insertar los resultados en orden estable
+            for js_file, analysis in zip(selected_files, analyses):
                 try:
-                    analysis = await self.analyze_file_with_ai(js_file)
+                    if isinstance(analysis, Exception):
+                        raise analysis
                     if analysis:
                         await self.add_enhanced_file_analysis(analysis)
                         
@@ -823,30 +1430,39 @@ class EnhancedBackendDocumentationGenerator:
         
     # Métodos adicionales necesarios...
     def analyze_package_json(self):
-        """Analiza package.json (implementación básica)"""
-        package_path = self.backend_path.parent / 'package.json'
-        if package_path.exists():
-            try:
-                with open(package_path, 'r', encoding='utf-8') as f:
-                    package_data = json.load(f)
-                    self.project_info.update({
-                        'name': package_data.get('name', self.project_info['name']),
-                        'version': package_data.get('version', self.project_info['version']),
-                        'dependencies': package_data.get('dependencies', {}),
-                        'scripts': package_data.get('scripts', {})
-                    })
-            except Exception as e:
-                self.console.print(f"⚠️ Error analizando package.json: {e}", style="yellow")
-                
-    def analyze_project_structure(self):
-        """Analiza estructura general del proyecto"""
-        # Implementación básica
-        pass
+        """Analiza package.json"""
+        self.project_info.update(self.engine.analyze_package_json())
         
     def analyze_database_schema(self):
         """Analiza esquema de base de datos"""
-        # Implementación básica (reutilizar del generador anterior)
-        return {}
+        return self.engine.analyze_database_schema()
+        
+    def generate_enhanced_database_section(self, db_schema: Dict, description: str = ''):
+        """Sección de base de datos: tablas, columnas y número de registros"""
+        self.add_page_break()
+        self.doc.add_paragraph('🗄️ BASE DE DATOS', style='EnhancedH1')
+        source = f' ({description})' if description else ''
+        self.doc.add_paragraph(
+            f'La base de datos del backend{source} contiene {len(db_schema)} tablas.'
+        )
+        
+        summary_table = self.doc.add_table(rows=1, cols=3)
+        summary_table.style = 'Light Grid Accent 1'
+        for cell, header in zip(summary_table.rows[0].cells, ['📋 Tabla', '🧱 Columnas', '📊 Registros']):
+            cell.text = header
+            
+        for table_name, table_info in db_schema.items():
+            row = summary_table.add_row().cells
+            row[0].text = table_name
+            row[1].text = str(len(table_info['columns']))
+            row[2].text = format_row_count(table_info)
+            
+        for table_name, table_info in db_schema.items():
+            self.doc.add_paragraph(f'📋 {table_name}', style='Highlight')
+            for column in table_info['columns']:
+                flags = ' 🔑' if column['pk'] else ''
+                flags += ' (NOT NULL)' if column['notnull'] else ''
+                self.doc.add_paragraph(f"  • {column['name']}: {column['type'] or 'ANY'}{flags}")
         
     async def generate_enhanced_architecture_section(self):
         """Genera sección de arquitectura mejorada"""
@@ -874,20 +1490,45 @@ class EnhancedBackendDocumentationGenerator:
             Formato: Análisis técnico profesional en español.
             """
             
-            response = await self._make_ai_request(
-                architecture_prompt,
-                cache_key="architecture_analysis"
+            # Añadir sección al documento (los párrafos se escriben según llegan de la IA)
+            await self._write_streamed_section(
+                '🏗️ ANÁLISIS DE ARQUITECTURA', architecture_prompt, "architecture_analysis", self._get_fallback_architecture_content
             )
             
-            # Añadir sección al documento
-            self.doc.add_paragraph('🏗️ ANÁLISIS DE ARQUITECTURA', style='EnhancedH1')
-            self.doc.add_paragraph(response or self._get_fallback_architecture_content())
-            
         except Exception as e:
             self.console.print(f"[red]Error generando sección de arquitectura: {e}")
             self.doc.add_paragraph('🏗️ ANÁLISIS DE ARQUITECTURA', style='EnhancedH1')
             self.doc.add_paragraph(self._get_fallback_architecture_content())
     
+    async def _write_streamed_section(self, title: str, prompt: str, label: str, fallback):
+        """
+        Añade una sección cuyo contenido generado por IA se escribe párrafo a párrafo
+        a medida que llega. Si el streaming se corta a mitad, los párrafos ya escritos se
+        descartan y la sección se pide de nuevo sin streaming; si tampoco se obtiene
+        respuesta se usa el contenido de respaldo
+        """
+        self.doc.add_paragraph(title, style='EnhancedH1')
+        
+        written = []
+        try:
+            async for paragraph in iter_paragraphs(self.ai_enhancer.stream_prompt(prompt, label)):
+                written.append(self.doc.add_paragraph(paragraph))
+        except Exception as e:
+            self.console.print(f"⚠️ Error en IA para {label}: {e}", style="yellow")
+            # Sección incompleta: se retira del documento antes de reintentar
+            for paragraph in written:
+                paragraph._element.getparent().remove(paragraph._element)
+            written = []
+            if self.ai_enhancer.config.streaming:
+                try:
+                    content = await self.ai_enhancer.complete_prompt(prompt, label)
+                    written = [self.doc.add_paragraph(paragraph) for paragraph in split_paragraphs(content)]
+                except Exception as e:
+                    self.console.print(f"⚠️ Error en IA para {label} sin streaming: {e}", style="yellow")
+            
+        if not written:
+            self.doc.add_paragraph(fallback())
+            
     def _get_fallback_architecture_content(self):
         """Contenido de arquitectura de respaldo"""
         return """
@@ -945,15 +1586,11 @@ class EnhancedBackendDocumentationGenerator:
             Formato: Texto estructurado en español, profesional y técnico.
             """
             
-            response = await self._make_ai_request(
-                security_prompt,
-                cache_key="security_analysis"
+            # Añadir sección al documento (los párrafos se escriben según llegan de la IA)
+            await self._write_streamed_section(
+                '🔒 ANÁLISIS DE SEGURIDAD', security_prompt, "security_analysis", self._get_fallback_security_content
             )
             
-            # Añadir sección al documento
-            self.doc.add_paragraph('🔒 ANÁLISIS DE SEGURIDAD', style='EnhancedH1')
-            self.doc.add_paragraph(response or self._get_fallback_security_content())
-            
         except Exception as e:
             self.console.print(f"[red]Error generando sección de seguridad: {e}")
             self.doc.add_paragraph('🔒 ANÁLISIS DE SEGURIDAD', style='EnhancedH1')
@@ -1012,15 +1649,11 @@ class EnhancedBackendDocumentationGenerator:
             Formato: Documentación técnica profesional en español.
             """
             
-            response = await self._make_ai_request(
-                api_prompt,
-                cache_key="api_documentation"
+            # Añadir sección al documento (los párrafos se escriben según llegan de la IA)
+            await self._write_streamed_section(
+                '📡 DOCUMENTACIÓN DE API', api_prompt, "api_documentation", self._get_fallback_api_content
             )
             
-            # Añadir sección al documento
-            self.doc.add_paragraph('📡 DOCUMENTACIÓN DE API', style='EnhancedH1')
-            self.doc.add_paragraph(response or self._get_fallback_api_content())
-            
         except Exception as e:
             self.console.print(f"[red]Error generando sección de API: {e}")
             self.doc.add_paragraph('📡 DOCUMENTACIÓN DE API', style='EnhancedH1')
@@ -1066,28 +1699,19 @@ class EnhancedBackendDocumentationGenerator:
         """Extrae información de endpoints para análisis de seguridad"""
         endpoints = []
         try:
-            routes_dir = Path("routes")
+            routes_dir = self.backend_path / "routes"
             if routes_dir.exists():
-                for route_file in routes_dir.glob("*.js"):
+                for route_file in self._all_js_files(routes_dir):
                     with open(route_file, 'r', encoding='utf-8') as f:
                         content = f.read()
                         
-                        # Buscar definiciones de rutas
-                        route_patterns = [
-                            r'router\.get\([\'"]([^\'"]+)[\'"]',
-                            r'router\.post\([\'"]([^\'"]+)[\'"]',
-                            r'router\.put\([\'"]([^\'"]+)[\'"]',
-                            r'router\.delete\([\'"]([^\'"]+)[\'"]'
-                        ]
-                        
-                        for pattern in route_patterns:
-                            matches = re.findall(pattern, content)
-                            for match in matches:
-                                endpoints.append({
-                                    'file': route_file.name,
-                                    'method': pattern.split('\\')[1].replace('.', '').upper(),
-                                    'path': match
-                                })
+                    # Buscar definiciones de rutas (todos los métodos en una sola pasada)
+                    for method, path in extract_routes(content):
+                        endpoints.append({
+                            'file': route_file.name,
+                            'method': method,
+                            'path': path
+                        })
         except Exception as e:
             self.console.print(f"[yellow]Warning: Error extrayendo endpoints: {e}")
         
@@ -1104,19 +1728,19 @@ class EnhancedBackendDocumentationGenerator:
         
         try:
             # Analizar middlewares
-            middleware_dir = Path("middlewares")
+            middleware_dir = self.backend_path / "middlewares"
             if middleware_dir.exists():
-                api_info['middlewares'] = [f.name for f in middleware_dir.glob("*.js")]
+                api_info['middlewares'] = [f.name for f in self._all_js_files(middleware_dir)]
             
             # Analizar modelos
-            models_dir = Path("models")
+            models_dir = self.backend_path / "models"
             if models_dir.exists():
-                api_info['models'] = [f.name for f in models_dir.glob("*.js")]
+                api_info['models'] = [f.name for f in self._all_js_files(models_dir)]
             
             # Analizar controladores
-            controllers_dir = Path("controllers")
+            controllers_dir = self.backend_path / "controllers"
             if controllers_dir.exists():
-                api_info['controllers'] = [f.name for f in controllers_dir.glob("*.js")]
+                api_info['controllers'] = [f.name for f in self._all_js_files(controllers_dir)]
                 
         except Exception as e:
             self.console.print(f"[yellow]Warning: Error analizando API: {e}")
@@ -1132,19 +1756,18 @@ class EnhancedBackendDocumentationGenerator:
             main_dirs = ['controllers', 'models', 'routes', 'services', 'middlewares', 'utils', 'config']
             
             for dir_name in main_dirs:
-                dir_path = Path(dir_name)
+                dir_path = self.backend_path / dir_name
                 if dir_path.exists():
-                    files = list(dir_path.glob("*.js"))
+                    # Solo se conservan 10 nombres; el resto del recorrido únicamente se cuenta
+                    js_files = self._all_js_files(dir_path)
                     structure[dir_name] = {
-                        'files_count': len(files),
-                        'files': [f.name for f in files[:10]]  # Limitar a 10 archivos
+                        'files_count': len(js_files),
+                        'files': [str(js_file.relative_to(dir_path)) for js_file in js_files[:10]]  # Limitar a 10 archivos
                     }
             
-            # Analizar package.json
-            if Path("package.json").exists():
-                with open("package.json", 'r', encoding='utf-8') as f:
-                    package_data = json.load(f)
-                    structure['dependencies'] = list(package_data.get('dependencies', {}).keys())[:15]
+            # Dependencias de package.json (ya leídas en el recorrido del proyecto)
+            if 'dependencies' in self.project_info:
+                structure['dependencies'] = list(self.project_info['dependencies'].keys())[:15]
                     
         except Exception as e:
             self.console.print(f"[yellow]Warning: Error analizando estructura: {e}")
@@ -1237,17 +1860,57 @@ async def main():
         provider="openai",
         model="gpt-4",
         api_key=api_key,
+        api_base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
         max_tokens=3000,
+        max_input_tokens=int(os.getenv('AI_MAX_INPUT_TOKENS', '3000')),
+        batch_small_files=os.getenv('AI_BATCH_SMALL_FILES', 'true').lower() == 'true',
+        small_file_tokens=int(os.getenv('AI_SMALL_FILE_TOKENS', '600')),
+        batch_max_files=int(os.getenv('AI_BATCH_MAX_FILES', '6')),
         temperature=0.3,
-        cache_enabled=True
+        cache_enabled=True,
+        cache_duration_hours=int(os.getenv('AI_CACHE_DURATION_HOURS', '24')),
+        cache_file=os.getenv('AI_CACHE_FILE', 'ai_cache.db'),
+        cache_max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', '5000')),
+        cache_max_mb=float(os.getenv('AI_CACHE_MAX_MB', '50')),
+        max_concurrent_requests=int(os.getenv('AI_MAX_CONCURRENT_REQUESTS', '5')),
+        requests_per_minute=int(os.getenv('API_REQUESTS_PER_MINUTE', '20')),
+        tokens_per_minute=int(os.getenv('API_TOKENS_PER_MINUTE', '0')),
+        retry_attempts=int(os.getenv('API_RETRY_ATTEMPTS', '3')),
+        streaming=os.getenv('AI_STREAMING', 'true').lower() == 'true',
+        max_file_size=int(os.getenv('DOC_MAX_FILE_KB', str(DEFAULT_MAX_FILE_SIZE // 1024))) * 1024 or None,
+        exact_row_counts=os.getenv('DOC_EXACT_ROW_COUNTS', 'false').lower() == 'true'
     )
     
     try:
-        # Crear generador mejorado
-        generator = EnhancedBackendDocumentationGenerator(backend_path, output_path, ai_config)
+        # Servidor MySQL/PostgreSQL si se configura DOC_DB_DRIVER; si no, SQLite local
+        schema_provider = schema_provider_from_env(ai_config.exact_row_counts)
         
+        # Crear generador mejorado
+        generator = EnhancedBackendDocumentationGenerator(backend_path, output_path, ai_config, schema_provider)
+        
+        # DOC_WITH_BASIC=true genera también el documento básico a partir del mismo recorrido
+        scan = None
+        if os.getenv('DOC_WITH_BASIC', 'false').lower() == 'true':
+            from generate_documentation import BackendDocumentationGenerator
+            
+            basic_generator = BackendDocumentationGenerator(
+                backend_path, output_path,
+                incremental=os.getenv('DOC_INCREMENTAL', 'false').lower() == 'true',
+                workers=int(os.getenv('DOC_WORKERS', '1')),
+                max_file_size=ai_config.max_file_size,
+                exact_row_counts=ai_config.exact_row_counts,
+                representative_queries=(
+                    load_representative_queries(os.environ['DOC_QUERY_PLAN_FILE'])
+                    if os.getenv('DOC_QUERY_PLAN_FILE') else None
+                ),
+                schema_provider=schema_provider
+            )
+            scan = basic_generator.scan_project()
+            basic_file = basic_generator.generate_complete_documentation(scan)
+            console.print(f"📄 Documento básico: {basic_file}", style="cyan")
+            
         # Generar documentación
-        output_file = await generator.generate_enhanced_documentation()
+        output_file = await generator.generate_enhanced_documentation(scan)
         
         console.print("\n" + "=" * 60, style="blue")
         console.print("✅ ¡Documentación con IA generada exitosamente!", style="bold green")
@@ -1255,6 +1918,21 @@ async def main():
         console.print(f"💾 Tamaño: {output_file.stat().st_size / 1024:.2f} KB", style="cyan")
         console.print("🤖 Mejorada con análisis de IA", style="magenta")
         
+        for label, usage in generator.ai_enhancer.token_summary().items():
+            console.print(
+                f"🔢 {label}: {usage['requests']} peticiones, "
+                f"{usage['prompt_tokens']} tokens de entrada, {usage['completion_tokens']} de salida",
+                style="cyan"
+            )
+            
+        cache_stats = generator.ai_enhancer.cache.summary()
+        console.print(
+            f"🗄️ Cache IA: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos, "
+            f"{cache_stats['evictions']} expulsadas, {cache_stats['expired']} caducadas "
+            f"({cache_stats['entries']} entradas, {cache_stats['bytes'] / 1024:.1f} KB)",
+            style="cyan"
+        )
+        
         # Abrir archivo automáticamente
         if os.name == 'nt':
             os.startfile(output_file)
@@ -0,0 +1,246 @@
+# Analizador léxico de JavaScript para el generador de documentación 888Cargo
+# Extrae funciones, clases, exports, imports, comentarios y complejidad en una sola pasada
+
+import re
+
+# Identificador JavaScript (incluye $ y _)
+_IDENT = r'[A-Za-z_$][\w$]*'
+
+# Palabras clave que abren alguna de las construcciones reconocidas por el escáner
+_KEYWORDS = (
+    'function', 'async', 'const', 'let', 'var', 'class', 'export', 'import', 'require',
+    'module', 'exports', 'static', 'if', 'else', 'while', 'for', 'switch', 'case', 'catch'
+)
+
+# Patrón maestro: cada alternativa reconoce una construcción completa en la posición actual.
+# La primera alternativa ('skip') consume de golpe tramos de código sin interés (identificadores
+# que no son palabras clave, espacios y puntuación) para que el bucle de Python solo itere sobre
+# tokens relevantes. Comentarios, strings, templates y regex literales se consumen enteros, por
+# lo que su contenido nunca se interpreta como código. El orden de las alternativas es significativo.
+_MASTER_PATTERN = (
+    r'(?P<skip>(?:'
+    r'[^\w$/\'"`?&|]+'
+    rf'|(?<![\w$])(?!(?:{"|".join(_KEYWORDS)})(?![\w$]))[\w$]+(?![\w$])'
+    r'(?!\s*:\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>))'
+    r'(?!\s*\([^)]*\)\s*\{)'
+    r')+)'
+    r'|(?P<line_comment>//[^\n]*)'
+    r'|(?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))'
+    r'|(?P<string>\'(?:[^\'\\\n]|\\[\s\S])*\'|"(?:[^"\\\n]|\\[\s\S])*")'
+    r'|(?P<simple_template>`(?:[^`\\$]|\\[\s\S]|\$(?!\{)|\$\{[^{}`]*\})*`)'
+    r'|(?P<template>`)'
+    r'|(?P<slash>/)'
+    rf'|(?P<require>\b(?:require|import)\(\s*[\'"]([^\'"\n]+)[\'"]\s*\))'
+    rf'|(?P<import_from>\bimport\b[^;\'"`]*?\bfrom\s*[\'"]([^\'"\n]+)[\'"])'
+    rf'|(?P<import_bare>\bimport\s*[\'"]([^\'"\n]+)[\'"])'
+    rf'|(?P<export>\bexport\s+(?:default\s+)?(?=(?:(?:async\s+)?function\s*\*?\s*|class\s+|const\s+|let\s+|var\s+)?({_IDENT})))'
+    rf'|(?P<module_exports>\bmodule\.exports\s*=(?![=>])\s*(?:(?!function\b|class\b|async\b)({_IDENT}))?)'
+    rf'|(?P<exports_member>\bexports\.({_IDENT})\s*=(?![=>]))'
+    rf'|(?P<class>\bclass\s+({_IDENT}))'
+    rf'|(?P<function>\b(?:async\s+)?function\s*\*?\s*({_IDENT}))'
+    rf'|(?P<variable_function>\bconst\s+({_IDENT})\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>))'
+    rf'|(?P<static_method>\bstatic\s+(?:async\s+)?({_IDENT})\s*\()'
+    rf'|(?P<object_method>(?<![\w$.?])({_IDENT})\s*:\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>))'
+    rf'|(?P<class_method>(?<![\w$.])(?!(?:{"|".join(_KEYWORDS)})(?![\w$]))({_IDENT})\s*\([^)]*\)\s*\{{)'
+    r'|(?P<nullish>\?\?=?|\?\.)'
+    r'|(?P<branch>(?<![\w$])(?:if|else|while|for|switch|case|catch)(?![\w$])|&&|\|\||\?)'
+    r'|(?P<other>[\w$]+|[&|])'
+)
+
+# Cuerpo de un regex literal (tras la barra inicial): clases [...] y escapes incluidos
+_REGEX_BODY = r'(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*'
+
+# Caracteres tras los cuales una barra inicia un regex literal en lugar de una división
+_REGEX_PRECEDERS = '=(,:!&|?{}[;+-*%<>~^'
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'in', 'of', 'void', 'throw')
+
+# Tokens relevantes dentro de una expresión ${...} de un template literal
+_TEMPLATE_BODY = r'[`\\]|\$\{'
+_TEMPLATE_EXPRESSION = (
+    r'//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)'
+    r'|\'(?:[^\'\\\n]|\\[\s\S])*\'|"(?:[^"\\\n]|\\[\s\S])*"'
+    r'|[{}`]'
+)
+
+# Identificador al final del texto previo a una barra
+_TRAILING_WORD = r'[\w$]+$'
+
+# Bloque de lectura para contar líneas en buffers sin método count() (mmap)
+_LINE_COUNT_BLOCK = 1024 * 1024
+
+class _Syntax:
+    """
+    Patrones compilados y tokens del escáner para un tipo de contenido: str o bytes.
+    La variante bytes permite escanear directamente un mmap del archivo (ASCII para los
+    identificadores); solo se decodifican los fragmentos que pasan al resultado.
+    """
+
+    def __init__(self, encode):
+        self.encode = encode
+        self.master = re.compile(encode(_MASTER_PATTERN))
+        self.regex_body = re.compile(encode(_REGEX_BODY))
+        self.template_body = re.compile(encode(_TEMPLATE_BODY))
+        self.template_expression = re.compile(encode(_TEMPLATE_EXPRESSION))
+        self.trailing_word = re.compile(encode(_TRAILING_WORD))
+        self.regex_preceders = {encode(char)[-1:] for char in _REGEX_PRECEDERS}
+        self.regex_keywords = {encode(keyword) for keyword in _REGEX_KEYWORDS}
+        self.backtick = encode('`')
+        self.backslash = encode('\\')
+        self.open_brace = encode('{')
+        self.close_brace = encode('}')
+
+    def text(self, value):
+        """Convierte un fragmento del contenido escaneado en str"""
+        if isinstance(value, str):
+            return value
+        return value.decode('utf-8', errors='replace')
+
+_TEXT_SYNTAX = _Syntax(lambda value: value)
+_BYTES_SYNTAX = _Syntax(lambda value: value.encode('ascii'))
+
+def count_lines(content):
+    """Número de líneas de un str, bytes o buffer mapeado en memoria (sin crear la lista de líneas)"""
+    if isinstance(content, (str, bytes, bytearray)):
+        newline = '\n' if isinstance(content, str) else b'\n'
+        return content.count(newline) + 1
+    lines = 1
+    for start in range(0, len(content), _LINE_COUNT_BLOCK):
+        lines += content[start:start + _LINE_COUNT_BLOCK].count(b'\n')
+    return lines
+
+def _skip_template(syntax, content, pos):
+    """Devuelve la posición siguiente al cierre del template literal que empieza en pos - 1"""
+    length = len(content)
+    while pos < length:
+        match = syntax.template_body.search(content, pos)
+        if not match:
+            return length
+        token = match.group()
+        if token == syntax.backtick:
+            return match.end()
+        if token == syntax.backslash:
+            pos = match.end() + 1
+            continue
+
+        # Expresión ${...}: seguir llaves anidadas, strings, comentarios y templates internos
+        depth = 1
+        pos = match.end()
+        while depth and pos < length:
+            inner = syntax.template_expression.search(content, pos)
+            if not inner:
+                return length
+            token = inner.group()
+            pos = inner.end()
+            if token == syntax.open_brace:
+                depth += 1
+            elif token == syntax.close_brace:
+                depth -= 1
+            elif token == syntax.backtick:
+                pos = _skip_template(syntax, content, pos)
+    return length
+
+def _starts_regex(syntax, content, slash_pos):
+    """Decide si la barra en slash_pos abre un regex literal según el token anterior"""
+    prefix = content[max(0, slash_pos - 16):slash_pos].rstrip()
+    if not prefix:
+        return True
+    if prefix[-1:] in syntax.regex_preceders:
+        return True
+    word = syntax.trailing_word.search(prefix)
+    return bool(word) and word.group() in syntax.regex_keywords
+
+def scan_javascript(content):
+    """
+    Recorre el código JavaScript una única vez y devuelve sus elementos estructurales.
+
+    content puede ser str o un buffer de bytes UTF-8 (bytes o mmap del archivo); en el
+    segundo caso las posiciones de 'declaration_offsets' son posiciones en bytes.
+
+    El resultado contiene funciones (function name y const name = function/(...) =>, en
+    orden de aparición, con posibles repeticiones), clases, exports, módulos importados
+    (incluidos los relativos), comentarios como tuplas (tipo, texto) con tipo 'line',
+    'block' o 'jsdoc', la complejidad ciclomática básica (ramas y operadores
+    lógicos/ternarios), los métodos abreviados de clase (name() {...}, en 'methods'), los
+    métodos estáticos ('static_methods'), las propiedades de objeto con función como valor
+    (name: function/(...) =>, en 'object_methods') y las posiciones donde empiezan las
+    declaraciones de funciones, métodos y clases ('declaration_offsets').
+    """
+    result = {
+        'lines': count_lines(content),
+        'functions': [],
+        'classes': [],
+        'exports': [],
+        'imports': [],
+        'comments': [],
+        'complexity_score': 0,
+        'methods': [],
+        'static_methods': [],
+        'object_methods': [],
+        'declaration_offsets': []
+    }
+
+    functions = result['functions']
+    imports = result['imports']
+    exports = result['exports']
+    comments = result['comments']
+    declarations = result['declaration_offsets']
+    complexity = 0
+
+    syntax = _TEXT_SYNTAX if isinstance(content, str) else _BYTES_SYNTAX
+    text = syntax.text
+    search = syntax.master.search
+    pos = 0
+    length = len(content)
+
+    while pos < length:
+        match = search(content, pos)
+        if not match:
+            break
+        pos = match.end()
+        kind = match.lastgroup
+
+        if kind == 'skip':
+            continue
+        elif kind == 'branch':
+            complexity += 1
+        elif kind in ('string', 'simple_template', 'nullish', 'other'):
+            continue
+        elif kind == 'slash':
+            if _starts_regex(syntax, content, match.start()):
+                body = syntax.regex_body.match(content, pos)
+                if body:
+                    pos = body.end()
+        elif kind == 'line_comment':
+            comments.append(('line', text(match.group()[2:]).strip()))
+        elif kind == 'block_comment':
+            comment = text(match.group())
+            if comment.startswith('/**') and len(comment) > 4:
+                comments.append(('jsdoc', comment[3:].rstrip('/').rstrip('*').strip()))
+            else:
+                comments.append(('block', comment[2:].rstrip('/').rstrip('*').strip()))
+        elif kind == 'template':
+            pos = _skip_template(syntax, content, pos)
+        elif kind in ('function', 'variable_function'):
+            functions.append(text(match.group(match.lastindex + 1)))
+            declarations.append(match.start())
+        elif kind == 'static_method':
+            result['static_methods'].append(text(match.group(match.lastindex + 1)))
+            declarations.append(match.start())
+        elif kind == 'object_method':
+            result['object_methods'].append(text(match.group(match.lastindex + 1)))
+            declarations.append(match.start())
+        elif kind == 'class_method':
+            result['methods'].append(text(match.group(match.lastindex + 1)))
+            declarations.append(match.start())
+        elif kind == 'class':
+            result['classes'].append(text(match.group(match.lastindex + 1)))
+            declarations.append(match.start())
+        elif kind in ('require', 'import_from', 'import_bare'):
+            imports.append(text(match.group(match.lastindex + 1)))
+        elif kind in ('export', 'module_exports', 'exports_member'):
+            name = match.group(match.lastindex + 1)
+            if name:
+                exports.append(text(name))
+
+    result['complexity_score'] = complexity
+    return result
@@ -145,8 +145,8 @@ try {
             }
             
             # Mostrar estadísticas de cache
-            if (Test-Path "ai_cache.json") {
-                $cacheSize = (Get-Item "ai_cache.json").Length
+            if (Test-Path "ai_cache.db") {
+                $cacheSize = (Get-Item "ai_cache.db").Length
                 Write-Host "💾 Cache generado: $([math]::Round($cacheSize / 1024, 2)) KB" -ForegroundColor Cyan
             }
             
@@ -0,0 +1,623 @@
+# Proveedores de esquema de base de datos para el generador de documentación 888Cargo
+# Interfaz común (SchemaProvider) con dos implementaciones: SQLite (packing_list.db en solo
+# lectura, con planes de consulta y estadísticas de páginas) y servidores MySQL/PostgreSQL a
+# través de information_schema con cualquier driver DB-API, un pool de conexiones y una consulta
+# por catálogo. Todas devuelven el mismo formato por tabla:
+# {'columns', 'indexes', 'foreign_keys', 'row_count', 'row_count_exact'}
+
+import hashlib
+import importlib
+import json
+import os
+import queue
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+# Columnas de todas las tablas en una sola consulta (pragma_table_info como función de tabla)
+SCHEMA_COLUMNS_QUERY = """
+    SELECT m.name, p.cid, p.name, p.type, p."notnull", p.dflt_value, p.pk
+    FROM sqlite_master AS m
+    JOIN pragma_table_info(m.name) AS p
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.rowid, p.cid
+"""
+
+# Índices de todas las tablas con sus columnas (pragma_index_list + pragma_index_info)
+SCHEMA_INDEXES_QUERY = """
+    SELECT m.name, il.name, il."unique", il.origin, il.partial, ii.name
+    FROM sqlite_master AS m
+    JOIN pragma_index_list(m.name) AS il
+    JOIN pragma_index_info(il.name) AS ii
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.rowid, il.seq, ii.seqno
+"""
+
+# Claves foráneas de todas las tablas (pragma_foreign_key_list); id agrupa las compuestas
+SCHEMA_FOREIGN_KEYS_QUERY = """
+    SELECT m.name, fk.id, fk."table", fk."from", fk."to", fk.on_update, fk.on_delete
+    FROM sqlite_master AS m
+    JOIN pragma_foreign_key_list(m.name) AS fk
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.rowid, fk.id, fk.seq
+"""
+
+# Páginas, bytes y espacio libre por tabla o índice (tabla virtual dbstat, si SQLite la incluye)
+DBSTAT_QUERY = """
+    SELECT name, COUNT(*), SUM(pgsize), SUM(unused)
+    FROM dbstat
+    GROUP BY name
+    ORDER BY SUM(pgsize) DESC
+"""
+
+# Consultas representativas de los accesos del backend para EXPLAIN QUERY PLAN
+# (con valores literales: EXPLAIN no admite parámetros sin enlazar)
+DEFAULT_REPRESENTATIVE_QUERIES = [
+    "SELECT * FROM carga WHERE codigo_carga = '888CGS-ITEM-1'",
+    "SELECT * FROM carga WHERE id_cliente = 1 ORDER BY created_at DESC",
+    "SELECT * FROM articulo_packing_list WHERE id_carga = 1",
+    "SELECT * FROM caja WHERE id_articulo = 1 ORDER BY numero_caja",
+    "SELECT * FROM qr WHERE codigo_qr = 'QR-1'",
+    "SELECT * FROM qr WHERE id_caja = 1",
+    "SELECT c.codigo_carga, COUNT(q.id_qr) FROM carga AS c "
+    "JOIN articulo_packing_list AS a ON a.id_carga = c.id_carga "
+    "JOIN caja AS b ON b.id_articulo = a.id_articulo "
+    "LEFT JOIN qr AS q ON q.id_caja = b.id_caja "
+    "WHERE c.id_cliente = 1 GROUP BY c.id_carga",
+]
+
+# Número de filas registrado por ANALYZE: la primera cifra de stat es el número de filas del
+# índice (o de la tabla si no tiene índices); el máximo por tabla es su número de filas
+STAT1_ROW_COUNTS_QUERY = "SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl"
+
+# Consultas de catálogo de los servidores: {s} es el marcador del único parámetro (el esquema).
+# Columnas y claves primarias son SQL estándar; índices, claves foráneas y estimación de filas
+# dependen del motor. Cada consulta devuelve las filas con la misma forma que las de SQLite.
+INFORMATION_SCHEMA_COLUMNS_QUERY = """
+    SELECT c.table_name, c.ordinal_position, c.column_name, c.data_type, c.is_nullable, c.column_default
+    FROM information_schema.columns AS c
+    JOIN information_schema.tables AS t
+        ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+    WHERE c.table_schema = {s} AND t.table_type = 'BASE TABLE'
+    ORDER BY c.table_name, c.ordinal_position
+"""
+
+INFORMATION_SCHEMA_PRIMARY_KEYS_QUERY = """
+    SELECT k.table_name, k.column_name
+    FROM information_schema.table_constraints AS tc
+    JOIN information_schema.key_column_usage AS k
+        ON k.constraint_schema = tc.constraint_schema AND k.constraint_name = tc.constraint_name
+        AND k.table_name = tc.table_name
+    WHERE tc.table_schema = {s} AND tc.constraint_type = 'PRIMARY KEY'
+    ORDER BY k.table_name, k.ordinal_position
+"""
+
+SERVER_DIALECTS = {
+    'mysql': {
+        'quote': '`',
+        'indexes': """
+            SELECT table_name, index_name, non_unique = 0,
+                CASE WHEN index_name = 'PRIMARY' THEN 'pk' WHEN non_unique = 0 THEN 'u' ELSE 'c' END,
+                0, column_name
+            FROM information_schema.statistics
+            WHERE table_schema = {s}
+            ORDER BY table_name, index_name, seq_in_index
+        """,
+        'foreign_keys': """
+            SELECT k.table_name, k.constraint_name, k.referenced_table_name, k.column_name,
+                k.referenced_column_name, rc.update_rule, rc.delete_rule
+            FROM information_schema.key_column_usage AS k
+            JOIN information_schema.referential_constraints AS rc
+                ON rc.constraint_schema = k.constraint_schema AND rc.constraint_name = k.constraint_name
+                AND rc.table_name = k.table_name
+            WHERE k.table_schema = {s} AND k.referenced_table_name IS NOT NULL
+            ORDER BY k.table_name, k.constraint_name, k.ordinal_position
+        """,
+        # table_rows lo mantiene InnoDB a partir de sus estadísticas (aproximado)
+        'row_estimates': """
+            SELECT table_name, table_rows
+            FROM information_schema.tables
+            WHERE table_schema = {s} AND table_type = 'BASE TABLE'
+        """,
+    },
+    'postgresql': {
+        'quote': '"',
+        'indexes': """
+            SELECT t.relname, i.relname, ix.indisunique,
+                CASE WHEN ix.indisprimary THEN 'pk' WHEN ix.indisunique THEN 'u' ELSE 'c' END,
+                ix.indpred IS NOT NULL, a.attname
+            FROM pg_index AS ix
+            JOIN pg_class AS i ON i.oid = ix.indexrelid
+            JOIN pg_class AS t ON t.oid = ix.indrelid
+            JOIN pg_namespace AS n ON n.oid = t.relnamespace
+            CROSS JOIN LATERAL unnest(ix.indkey) WITH ORDINALITY AS k(attnum, position)
+            LEFT JOIN pg_attribute AS a ON a.attrelid = t.oid AND a.attnum = k.attnum
+            WHERE n.nspname = {s}
+            ORDER BY t.relname, i.relname, k.position
+        """,
+        'foreign_keys': """
+            SELECT k.table_name, k.constraint_name, r.table_name, k.column_name,
+                r.column_name, rc.update_rule, rc.delete_rule
+            FROM information_schema.key_column_usage AS k
+            JOIN information_schema.referential_constraints AS rc
+                ON rc.constraint_schema = k.constraint_schema AND rc.constraint_name = k.constraint_name
+            JOIN information_schema.key_column_usage AS r
+                ON r.constraint_schema = rc.unique_constraint_schema
+                AND r.constraint_name = rc.unique_constraint_name
+                AND r.ordinal_position = k.position_in_unique_constraint
+            WHERE k.table_schema = {s}
+            ORDER BY k.table_name, k.constraint_name, k.ordinal_position
+        """,
+        # reltuples se actualiza con VACUUM/ANALYZE (-1 si la tabla nunca se analizó)
+        'row_estimates': """
+            SELECT c.relname, c.reltuples::bigint
+            FROM pg_class AS c
+            JOIN pg_namespace AS n ON n.oid = c.relnamespace
+            WHERE n.nspname = {s} AND c.relkind IN ('r', 'p')
+        """,
+    },
+}
+
+# Motor por defecto según el módulo DB-API
+DRIVER_DIALECTS = {
+    'pymysql': 'mysql', 'MySQLdb': 'mysql', 'mysql.connector': 'mysql',
+    'psycopg2': 'postgresql', 'psycopg': 'postgresql', 'pg8000': 'postgresql',
+}
+
+# Marcador del parámetro del esquema según el paramstyle del driver (PEP 249)
+PARAMSTYLE_MARKERS = {
+    'qmark': '?', 'numeric': ':1', 'named': ':schema', 'format': '%s', 'pyformat': '%(schema)s'
+}
+
+def quote_identifier(name, quote='"'):
+    """Nombre de tabla o columna entre comillas para SQL"""
+    return quote + name.replace(quote, quote * 2) + quote
+
+def open_database_readonly(db_path):
+    """Conexión SQLite de solo lectura (URI mode=ro): no crea el archivo ni toma bloqueos de escritura"""
+    return sqlite3.connect(f'{Path(db_path).resolve().as_uri()}?mode=ro', uri=True)
+
+def load_representative_queries(queries_path):
+    """Consultas de un archivo .sql separadas por ';' (se ignoran las líneas de comentario '--')"""
+    with open(queries_path, 'r', encoding='utf-8') as f:
+        sql = ''.join(line for line in f if not line.lstrip().startswith('--'))
+    return [query.strip() for query in sql.split(';') if query.strip()]
+
+def format_row_count(table_info):
+    """Número de filas para mostrar: las estimaciones se marcan con '≈'"""
+    row_count = table_info.get('row_count')
+    if row_count is None:
+        return 'N/A'
+    return str(row_count) if table_info.get('row_count_exact', True) else f'≈{row_count}'
+
+def _new_table_info():
+    """Entrada vacía de una tabla en el esquema"""
+    return {'columns': [], 'indexes': [], 'foreign_keys': [], 'row_count': 0}
+
+def _collect_indexes(rows, schema_info):
+    """
+    Añade a cada tabla sus índices a partir de filas
+    (tabla, índice, único, origen c/u/pk, parcial, columna) ordenadas por índice y posición
+    """
+    for table, index_name, unique, origin, partial, column in rows:
+        if table not in schema_info:
+            continue
+        indexes = schema_info[table]['indexes']
+        if not indexes or indexes[-1]['name'] != index_name:
+            indexes.append({
+                'name': index_name,
+                'unique': bool(unique),
+                'origin': origin,
+                'partial': bool(partial),
+                'columns': []
+            })
+        indexes[-1]['columns'].append(column)  # None para columnas de expresión
+
+def _collect_foreign_keys(rows, schema_info):
+    """
+    Añade a cada tabla sus claves foráneas (las compuestas con todas sus columnas) a partir de
+    filas (tabla, id, tabla referenciada, columna, columna referenciada, on_update, on_delete)
+    """
+    for table, fk_id, referenced_table, column, referenced_column, on_update, on_delete in rows:
+        if table not in schema_info:
+            continue
+        foreign_keys = schema_info[table]['foreign_keys']
+        if not foreign_keys or foreign_keys[-1]['id'] != fk_id:
+            foreign_keys.append({
+                'id': fk_id,
+                'columns': [],
+                'references': referenced_table,
+                'referenced_columns': [],
+                'on_update': on_update,
+                'on_delete': on_delete
+            })
+        foreign_keys[-1]['columns'].append(column)
+        foreign_keys[-1]['referenced_columns'].append(referenced_column)
+
+def _is_indexed(table_info, columns):
+    """True si las columnas son el prefijo de algún índice (o la clave entera que es el rowid)"""
+    pk_columns = [column for column in table_info['columns'] if column['pk']]
+    if (len(columns) == 1 and len(pk_columns) == 1 and pk_columns[0]['name'] == columns[0]
+            and (pk_columns[0]['type'] or '').upper() == 'INTEGER'):
+        return True
+    return any(
+        set(index['columns'][:len(columns)]) == set(columns) and not index['partial']
+        for index in table_info.get('indexes', [])
+    )
+
+def unindexed_foreign_keys(schema_info):
+    """
+    Claves foráneas cuyas columnas no encabezan ningún índice: cada borrado o actualización
+    en la tabla referenciada (y los JOIN por esa clave) recorre la tabla entera
+    """
+    return [
+        {'table': table, 'columns': foreign_key['columns'], 'references': foreign_key['references']}
+        for table, table_info in schema_info.items()
+        for foreign_key in table_info.get('foreign_keys', [])
+        if not _is_indexed(table_info, foreign_key['columns'])
+    ]
+
+def _query_plan(cursor, query):
+    """
+    Plan de EXPLAIN QUERY PLAN de una consulta, las tablas que recorre completas y aquellas para
+    las que SQLite construye un índice automático en cada ejecución (falta un índice)
+    """
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}")
+        plan = [detail for _, _, _, detail in cursor.fetchall()]
+    except sqlite3.Error as e:
+        return {'query': query, 'plan': [], 'full_scans': [], 'automatic_indexes': [], 'error': str(e)}
+
+    # 'SCAN t' (o 'SCAN TABLE t' en versiones antiguas) sin índice es un recorrido completo
+    full_scans, automatic_indexes = [], []
+    for detail in plan:
+        words = detail.split()
+        table = words[2] if len(words) > 2 and words[1] == 'TABLE' else words[1] if len(words) > 1 else ''
+        if words[0] == 'SCAN' and 'USING' not in detail and 'CONSTANT ROW' not in detail:
+            full_scans.append(table)
+        elif 'AUTOMATIC' in words:
+            automatic_indexes.append(table)
+    return {
+        'query': query, 'plan': plan, 'full_scans': full_scans,
+        'automatic_indexes': automatic_indexes, 'error': None
+    }
+
+def _page_statistics(cursor):
+    """Tamaño de página, páginas totales y libres, y el desglose de dbstat si está disponible"""
+    cursor.execute("PRAGMA page_size")
+    page_size = cursor.fetchone()[0]
+    cursor.execute("PRAGMA page_count")
+    page_count = cursor.fetchone()[0]
+    cursor.execute("PRAGMA freelist_count")
+    freelist_count = cursor.fetchone()[0]
+
+    try:
+        cursor.execute(DBSTAT_QUERY)
+        objects = [
+            {'name': name, 'pages': pages, 'bytes': size, 'unused': unused}
+            for name, pages, size, unused in cursor.fetchall()
+        ]
+    except sqlite3.OperationalError:
+        # SQLite compilado sin SQLITE_ENABLE_DBSTAT_VTAB
+        objects = None
+
+    return {
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': freelist_count,
+        'objects': objects
+    }
+
+class SchemaProvider(ABC):
+    """
+    Interfaz de los proveedores de esquema usados por el motor de análisis.
+    analyze_schema() devuelve {tabla: info}; analyze_performance() el perfil de rendimiento
+    que el proveedor pueda medir (vacío si ninguno). Los errores se propagan al motor.
+    """
+
+    # Descripción corta para los mensajes de consola
+    description = 'base de datos'
+
+    @abstractmethod
+    def analyze_schema(self):
+        """Esquema de la base de datos: {tabla: columnas, índices, claves foráneas y filas}"""
+
+    def analyze_performance(self, schema_info):
+        return {}
+
+    def fingerprint(self):
+        """
+        Huella del origen de datos para el modo incremental: por defecto la descripción más un
+        hash del esquema leído (los proveedores con un archivo local pueden usar su stat)
+        """
+        schema = json.dumps(self.analyze_schema(), sort_keys=True, ensure_ascii=False, default=str)
+        return f"{self.description}:{hashlib.sha256(schema.encode()).hexdigest()}"
+
+    def close(self):
+        """Libera las conexiones abiertas (el proveedor puede volver a usarse después)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+class SQLiteSchemaProvider(SchemaProvider):
+    """
+    Esquema de una base de datos SQLite abierta en solo lectura. Columnas, índices y claves
+    foráneas se obtienen con una consulta cada uno; el número de filas sale de sqlite_stat1 o
+    de una estimación rápida salvo que se pidan conteos exactos ('row_count_exact').
+    """
+
+    def __init__(self, db_path, exact_row_counts=False, representative_queries=None):
+        self.db_path = Path(db_path)
+        self.description = f'SQLite {self.db_path.name}'
+        # COUNT(*) recorre la tabla entera: por defecto se usan sqlite_stat1 o una estimación
+        self.exact_row_counts = exact_row_counts
+        # Consultas analizadas con EXPLAIN QUERY PLAN en el apéndice de rendimiento
+        self.representative_queries = list(
+            DEFAULT_REPRESENTATIVE_QUERIES if representative_queries is None else representative_queries
+        )
+
+    def fingerprint(self):
+        """Ruta resuelta, tamaño y fecha de la base de datos y de sus archivos -wal/-shm, y opciones"""
+        parts = [str(self.db_path.resolve()), f"exact:{self.exact_row_counts}", json.dumps(self.representative_queries)]
+        for source in (self.db_path, Path(f"{self.db_path}-wal"), Path(f"{self.db_path}-shm")):
+            if source.exists():
+                stat = source.stat()
+                parts.append(f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}")
+        return '\n'.join(parts)
+
+    def analyze_schema(self):
+        with closing(open_database_readonly(self.db_path)) as conn:
+            cursor = conn.cursor()
+
+            schema_info = {}
+            cursor.execute(SCHEMA_COLUMNS_QUERY)
+            for table, cid, name, col_type, notnull, default, pk in cursor.fetchall():
+                schema_info.setdefault(table, _new_table_info())['columns'].append({
+                    'cid': cid,
+                    'name': name,
+                    'type': col_type,
+                    'notnull': notnull,
+                    'default': default,
+                    'pk': pk
+                })
+
+            _collect_indexes(cursor.execute(SCHEMA_INDEXES_QUERY).fetchall(), schema_info)
+            _collect_foreign_keys(cursor.execute(SCHEMA_FOREIGN_KEYS_QUERY).fetchall(), schema_info)
+
+            stat1_counts = {} if self.exact_row_counts else self._stat1_row_counts(cursor)
+            for table, table_info in schema_info.items():
+                try:
+                    if self.exact_row_counts:
+                        cursor.execute(f"SELECT COUNT(*) FROM {quote_identifier(table)}")
+                        row_count, exact = cursor.fetchone()[0], True
+                    elif table in stat1_counts:
+                        row_count, exact = stat1_counts[table], False
+                    else:
+                        row_count, exact = self._estimate_row_count(cursor, table)
+                except sqlite3.Error:
+                    continue
+                table_info['row_count'] = row_count
+                table_info['row_count_exact'] = exact
+
+        return schema_info
+
+    def analyze_performance(self, schema_info):
+        """
+        Planes de las consultas representativas (con sus recorridos completos de tabla), claves
+        foráneas sin índice y estadísticas de páginas (dbstat y freelist)
+        """
+        with closing(open_database_readonly(self.db_path)) as conn:
+            cursor = conn.cursor()
+            return {
+                'query_plans': [_query_plan(cursor, query) for query in self.representative_queries],
+                'unindexed_foreign_keys': unindexed_foreign_keys(schema_info),
+                **_page_statistics(cursor)
+            }
+
+    @staticmethod
+    def _stat1_row_counts(cursor):
+        """Número de filas por tabla según sqlite_stat1 (vacío si nunca se ejecutó ANALYZE)"""
+        try:
+            cursor.execute(STAT1_ROW_COUNTS_QUERY)
+        except sqlite3.OperationalError:
+            return {}
+        return {table: count for table, count in cursor.fetchall() if count is not None}
+
+    @staticmethod
+    def _estimate_row_count(cursor, table):
+        """
+        Estimación rápida del número de filas: MAX(rowid) se resuelve bajando por el B-tree sin
+        recorrer la tabla (cota superior si se borraron filas). Devuelve (filas, exacto).
+        """
+        try:
+            cursor.execute(f"SELECT MAX(rowid) FROM {quote_identifier(table)}")
+            return cursor.fetchone()[0] or 0, False
+        except sqlite3.OperationalError:
+            # Tablas WITHOUT ROWID: no hay estimación barata, se cuentan
+            cursor.execute(f"SELECT COUNT(*) FROM {quote_identifier(table)}")
+            return cursor.fetchone()[0], True
+
+class ConnectionPool:
+    """
+    Pool de conexiones DB-API: conserva hasta size conexiones abiertas para reutilizarlas entre
+    consultas. Las conexiones se crean bajo demanda; una conexión que falla se descarta.
+    """
+
+    def __init__(self, connect, size=4):
+        self.connect = connect
+        self.size = size
+        self._idle = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self.connect()
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class InformationSchemaProvider(SchemaProvider):
+    """
+    Esquema de un servidor MySQL o PostgreSQL a través de information_schema (y pg_catalog
+    donde el estándar no llega) con cualquier driver DB-API. Cada catálogo (columnas, claves
+    primarias, índices, claves foráneas, filas estimadas) se lee con una única consulta para
+    todo el esquema, en paralelo sobre las conexiones del pool.
+    """
+
+    def __init__(self, connect, schema, dialect='mysql', paramstyle='format', pool_size=4, exact_row_counts=False):
+        if dialect not in SERVER_DIALECTS:
+            raise ValueError(f"Motor no soportado: {dialect} (disponibles: {', '.join(SERVER_DIALECTS)})")
+        if paramstyle not in PARAMSTYLE_MARKERS:
+            raise ValueError(f"paramstyle no soportado: {paramstyle}")
+        self.schema = schema
+        self.dialect = SERVER_DIALECTS[dialect]
+        self.description = f'{dialect} {schema}'
+        self.marker = PARAMSTYLE_MARKERS[paramstyle]
+        self.params = {'schema': schema} if paramstyle in ('named', 'pyformat') else (schema,)
+        self.pool = ConnectionPool(connect, pool_size)
+        self.exact_row_counts = exact_row_counts
+
+    @classmethod
+    def from_driver(cls, driver, schema, dialect=None, pool_size=4, exact_row_counts=False, **connect_kwargs):
+        """Proveedor a partir del nombre del módulo DB-API (p. ej. 'pymysql' o 'psycopg2')"""
+        module = importlib.import_module(driver)
+        return cls(
+            lambda: module.connect(**connect_kwargs), schema,
+            dialect=dialect or DRIVER_DIALECTS.get(driver, 'mysql'),
+            paramstyle=module.paramstyle, pool_size=pool_size, exact_row_counts=exact_row_counts
+        )
+
+    def _fetch(self, query, params=None):
+        """Ejecuta una consulta con una conexión del pool y devuelve todas las filas"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, self.params if params is None else params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def _fetch_catalog(self, query):
+        """Consulta de catálogo con el marcador del esquema del driver"""
+        return self._fetch(query.format(s=self.marker))
+
+    def _count_rows(self, table):
+        """COUNT(*) exacto de una tabla"""
+        return self._fetch(f"SELECT COUNT(*) FROM {quote_identifier(table, self.dialect['quote'])}", ())[0][0]
+
+    def analyze_schema(self):
+        catalogs = {
+            'columns': INFORMATION_SCHEMA_COLUMNS_QUERY,
+            'primary_keys': INFORMATION_SCHEMA_PRIMARY_KEYS_QUERY,
+            'indexes': self.dialect['indexes'],
+            'foreign_keys': self.dialect['foreign_keys'],
+        }
+        if not self.exact_row_counts:
+            catalogs['row_estimates'] = self.dialect['row_estimates']
+
+        with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+            futures = {name: executor.submit(self._fetch_catalog, query) for name, query in catalogs.items()}
+            rows = {name: future.result() for name, future in futures.items()}
+
+            # Posición de cada columna en la clave primaria (1..n), como pk de SQLite
+            pk_positions = {}
+            for table, column in rows['primary_keys']:
+                table_pk = pk_positions.setdefault(table, {})
+                table_pk[column] = len(table_pk) + 1
+
+            schema_info = {}
+            for table, position, name, data_type, is_nullable, default in rows['columns']:
+                schema_info.setdefault(table, _new_table_info())['columns'].append({
+                    'cid': position - 1,
+                    'name': name,
+                    'type': data_type.upper(),
+                    'notnull': int(is_nullable == 'NO'),
+                    'default': default,
+                    'pk': pk_positions.get(table, {}).get(name, 0)
+                })
+
+            _collect_indexes(rows['indexes'], schema_info)
+            _collect_foreign_keys(rows['foreign_keys'], schema_info)
+
+            if self.exact_row_counts:
+                counts = executor.map(self._count_rows, schema_info)
+                for table_info, row_count in zip(schema_info.values(), counts):
+                    table_info['row_count'] = row_count
+                    table_info['row_count_exact'] = True
+            else:
+                estimates = dict(rows['row_estimates'])
+                for table, table_info in schema_info.items():
+                    estimate = estimates.get(table)
+                    table_info['row_count'] = int(estimate) if estimate is not None and estimate >= 0 else None
+                    table_info['row_count_exact'] = False
+
+        return schema_info
+
+    def analyze_performance(self, schema_info):
+        """Claves foráneas sin índice (los planes y las páginas dependen del motor)"""
+        return {'query_plans': [], 'unindexed_foreign_keys': unindexed_foreign_keys(schema_info)}
+
+    def close(self):
+        self.pool.close()
+
+def find_sqlite_database(backend_path):
+    """
+    Ruta de packing_list.db: DATABASE_PATH (relativa a la raíz del proyecto, como en
+    config/environments.js), db/packing_list.db en la raíz (db.js) o el propio backend
+    """
+    backend_path = Path(backend_path)
+    candidates = [backend_path.parent / 'db' / 'packing_list.db', backend_path / 'packing_list.db']
+    if os.getenv('DATABASE_PATH'):
+        candidates.insert(0, backend_path.parent / os.environ['DATABASE_PATH'])
+    return next((candidate for candidate in candidates if candidate.is_file()), None)
+
+def schema_provider_from_env(exact_row_counts=False):
+    """
+    Proveedor de un servidor configurado con DOC_DB_DRIVER (módulo DB-API), DOC_DB_HOST,
+    DOC_DB_PORT, DOC_DB_USER, DOC_DB_PASSWORD, DOC_DB_NAME y opcionalmente DOC_DB_DIALECT y
+    DOC_DB_SCHEMA. None si no hay servidor configurado o su driver no está instalado.
+    """
+    driver = os.getenv('DOC_DB_DRIVER')
+    if not driver:
+        return None
+
+    dialect = os.getenv('DOC_DB_DIALECT') or DRIVER_DIALECTS.get(driver, 'mysql')
+    database = os.getenv('DOC_DB_NAME', '')
+    connect_kwargs = {
+        'host': os.getenv('DOC_DB_HOST', 'localhost'),
+        'user': os.getenv('DOC_DB_USER', ''),
+        'password': os.getenv('DOC_DB_PASSWORD', ''),
+        'database': database
+    }
+    if os.getenv('DOC_DB_PORT'):
+        connect_kwargs['port'] = int(os.environ['DOC_DB_PORT'])
+
+    # En MySQL el esquema es la base de datos; en PostgreSQL, public por defecto
+    schema = os.getenv('DOC_DB_SCHEMA') or (database if dialect == 'mysql' else 'public')
+    try:
+        return InformationSchemaProvider.from_driver(
+            driver, schema, dialect=dialect, exact_row_counts=exact_row_counts, **connect_kwargs
+        )
+    except ImportError:
+        print(f"⚠️ Driver {driver} no instalado: se usará la base de datos SQLite local")
+        return None
@@ -250,7 +250,7 @@ Write-Host ""
 Write-Host "📁 UBICACIÓN DE ARCHIVOS:" -ForegroundColor Yellow
 Write-Host "   � Documentos: ./docs/888Cargo_Backend_Documentation_*.docx" -ForegroundColor White
 Write-Host "   🔧 Configuración: ./.env.documentation" -ForegroundColor White
-Write-Host "   💾 Cache de IA: ./ai_cache.json" -ForegroundColor White
+Write-Host "   💾 Cache de IA: ./ai_cache.db" -ForegroundColor White
 Write-Host ""
 Write-Host "⚙️ CONFIGURACIÓN AVANZADA:" -ForegroundColor Yellow
 Write-Host "   📝 Editar: .env.documentation" -ForegroundColor White
@@ -0,0 +1,214 @@
+# Recorrido de archivos fuente para el generador de documentación 888Cargo
+# Recorre el backend de forma recursiva con os.scandir respetando .gitignore, los directorios
+# excluidos (node_modules, uploads...) y un tamaño máximo por archivo. Los archivos se devuelven
+# de forma perezosa como (ruta, stat) para poder procesar árboles grandes sin listarlos enteros.
+# map_source() expone el contenido de un archivo como buffer de bytes (mmap para los grandes)
+
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+# Directorios que nunca se recorren (dependencias, archivos subidos por usuarios, VCS)
+DEFAULT_EXCLUDED_DIRS = frozenset({'node_modules', 'uploads', '.git', 'docs', '__pycache__'})
+
+# Tamaño máximo de archivo a analizar: los bundles o archivos generados se omiten
+DEFAULT_MAX_FILE_SIZE = 1024 * 1024
+
+# A partir de este tamaño el contenido se mapea en memoria en lugar de leerse en un bytes
+MMAP_THRESHOLD = 64 * 1024
+
+def _translate_pattern(pattern):
+    """Convierte un patrón glob de .gitignore (sin '/' inicial ni final) en una expresión regular"""
+    parts = []
+    i, length = 0, len(pattern)
+    while i < length:
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == length:
+            parts.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            char_class = pattern[i + 1:end]
+            if char_class.startswith('!'):
+                char_class = '^' + char_class[1:]
+            parts.append(f'[{char_class}]')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < length:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts)
+
+class GitignoreRules:
+    """
+    Reglas de un archivo .gitignore, relativas al directorio que lo contiene.
+    Soporta comodines (*, ?, **, clases), negación (!), patrones anclados (/) y
+    patrones solo de directorio (/ final).
+    """
+
+    def __init__(self, lines):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ')
+
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+
+            directory_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+
+            # Con '/' al inicio o en medio el patrón es relativo al .gitignore; si no, a cualquier nivel
+            anchored = '/' in line
+            line = line.lstrip('/')
+            prefix = '' if anchored else '(?:.*/)?'
+            regex = re.compile(f'{prefix}{_translate_pattern(line)}$')
+            self.rules.append((regex, negated, directory_only))
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Reglas del .gitignore del directorio, o None si no tiene"""
+        try:
+            with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path, is_dir):
+        """True si la ruta queda ignorada, False si se re-incluye con '!', None si ninguna regla aplica"""
+        result = None
+        for regex, negated, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+def _is_ignored(rule_stack, path, is_dir):
+    """Aplica las reglas de los .gitignore de fuera hacia dentro: gana la última coincidencia"""
+    ignored = False
+    for base, rules in rule_stack:
+        result = rules.match(path[len(base):].lstrip('/'), is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+def find_ignore_root(path):
+    """
+    Directorio desde el que se aplican los .gitignore de path: la raíz del repositorio git
+    (el primer ascendiente con .git) o, fuera de un repositorio, el directorio padre de path
+    """
+    path = Path(path).resolve()
+    for directory in (path,) + tuple(path.parents):
+        if (directory / '.git').exists():
+            return directory
+    return path.parent
+
+def _initial_rule_stack(root, ignore_root):
+    """Reglas de los .gitignore desde ignore_root hasta root (incluidos) y ruta relativa de root"""
+    ignore_root = Path(ignore_root or root).resolve()
+    try:
+        rel_root = root.resolve().relative_to(ignore_root)
+    except ValueError:
+        ignore_root, rel_root = root, Path()
+
+    rule_stack = []
+    directory, rel_dir = ignore_root, ''
+    for part in ('',) + rel_root.parts:
+        if part:
+            directory = directory / part
+            rel_dir = f'{rel_dir}/{part}' if rel_dir else part
+        rules = GitignoreRules.from_directory(directory)
+        if rules:
+            rule_stack.append((rel_dir, rules))
+    return rel_dir, rule_stack
+
+def walk_source_files(root, extensions=('.js',), max_file_size=DEFAULT_MAX_FILE_SIZE,
+                      excluded_dirs=DEFAULT_EXCLUDED_DIRS, use_gitignore=True, ignore_root=None):
+    """
+    Genera (Path, os.stat_result) de los archivos con alguna de las extensiones bajo root.
+
+    Recorrido en profundidad con os.scandir y orden estable: en cada directorio primero sus
+    archivos y después sus subdirectorios, ambos por nombre. Se omiten los directorios de
+    excluded_dirs, lo ignorado por los .gitignore encontrados (desde ignore_root, p. ej. la raíz
+    del repositorio, hasta cada subdirectorio), los enlaces simbólicos a directorios y los archivos
+    mayores que max_file_size (None = sin límite).
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return
+
+    # Pila de directorios pendientes: (ruta, ruta relativa a ignore_root, reglas .gitignore vigentes)
+    rel_root, rule_stack = _initial_rule_stack(root, ignore_root) if use_gitignore else ('', [])
+    pending = [(root, rel_root, rule_stack)]
+
+    while pending:
+        directory, rel_dir, rule_stack = pending.pop()
+        try:
+            with os.scandir(directory) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir:
+                    if entry.name not in excluded_dirs and not _is_ignored(rule_stack, rel_path, True):
+                        subdirectories.append((entry, rel_path))
+                    continue
+                if not entry.name.endswith(extensions) or not entry.is_file():
+                    continue
+                if rule_stack and _is_ignored(rule_stack, rel_path, False):
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            if max_file_size is not None and stat.st_size > max_file_size:
+                continue
+            yield Path(entry.path), stat
+
+        # En orden inverso para que la pila los visite por nombre
+        for entry, rel_path in reversed(subdirectories):
+            child_rules = GitignoreRules.from_directory(entry.path) if use_gitignore else None
+            child_stack = rule_stack + [(rel_path, child_rules)] if child_rules else rule_stack
+            pending.append((Path(entry.path), rel_path, child_stack))
+
+@contextmanager
+def map_source(file_path):
+    """
+    Contenido de un archivo como buffer de bytes de solo lectura: mmap si supera
+    MMAP_THRESHOLD (las páginas las gestiona el sistema operativo y no ocupan memoria
+    de Python), bytes si es pequeño. El buffer solo es válido dentro del bloque with.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
@@ -0,0 +1,78 @@
+# Utilidades comunes de las pruebas del generador de documentación 888Cargo
+# Las pruebas del cliente de IA se ejecutan sin red: un servidor aiohttp local hace de API y
+# el encoder de tiktoken (que se descarga la primera vez) se sustituye por uno por palabras
+
+import json
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+BACKEND_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_PATH))
+
+import tiktoken
+from aiohttp import web
+
+
+class WordEncoding:
+    """Encoder mínimo compatible con tiktoken: un token por palabra"""
+
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+@asynccontextmanager
+async def stub_server(handler):
+    """Servidor HTTP local que atiende POST /v1/chat/completions; produce la URL base de la API"""
+    app = web.Application()
+    app.router.add_post('/v1/chat/completions', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        await runner.cleanup()
+
+
+def completion_response(content):
+    """Respuesta JSON de chat completion sin streaming"""
+    return web.json_response({
+        'choices': [{'message': {'content': content}}],
+        'usage': {'prompt_tokens': 10, 'completion_tokens': len(content.split())}
+    })
+
+
+async def sse_response(request, deltas):
+    """Respuesta en streaming (SSE) que envía cada fragmento como un evento y termina con [DONE]"""
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+    await response.prepare(request)
+    for delta in deltas:
+        event = {'choices': [{'delta': {'content': delta}}]}
+        await response.write(f"data: {json.dumps(event)}\n\n".encode())
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+@pytest.fixture
+def make_enhancer(monkeypatch, tmp_path):
+    """Crea un AIDocumentationEnhancer apuntando a la URL indicada, con cache en tmp_path"""
+    monkeypatch.setattr(tiktoken, 'encoding_for_model', lambda model: WordEncoding())
+    from generate_documentation_ai import AIConfig, AIDocumentationEnhancer
+
+    def factory(api_base_url, **options):
+        config = AIConfig(
+            api_key='test', api_base_url=api_base_url,
+            cache_file=str(tmp_path / 'ai_cache.db'), **options
+        )
+        return AIDocumentationEnhancer(config)
+
+    return factory
@@ -0,0 +1,171 @@
+# Cache SQLite de respuestas de IA: límites LRU, caducidad, actualización del esquema y
+# recuperación tras una interrupción del proceso
+
+import itertools
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import ai_cache
+from ai_cache import AIResponseCache
+from conftest import BACKEND_PATH
+
+
+def entry(content, age_hours=0):
+    timestamp = (datetime.now() - timedelta(hours=age_hours)).isoformat()
+    return {'content': content, 'content_type': 'function_analysis', 'timestamp': timestamp}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj de last_access estrictamente creciente para que el orden LRU sea determinista"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(ai_cache.time, 'time', lambda: float(next(ticks)))
+
+
+def test_entries_persist_across_connections(tmp_path):
+    cache = AIResponseCache(tmp_path / 'cache.db')
+    cache.set('a', entry('respuesta a'))
+    cache.close()
+
+    reopened = AIResponseCache(tmp_path / 'cache.db')
+    assert reopened.get('a')['content'] == 'respuesta a'
+    assert reopened.get('b') is None
+    assert reopened.summary() == {
+        'hits': 1, 'misses': 1, 'evictions': 0, 'expired': 0, 'entries': 1, 'bytes': len('respuesta a')
+    }
+    reopened.close()
+
+
+def test_max_entries_evicts_least_recently_used(tmp_path, clock):
+    cache = AIResponseCache(tmp_path / 'cache.db', max_entries=3)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, entry(key))
+    cache.get('a')  # 'b' pasa a ser la menos usada
+    cache.set('d', entry('d'))
+
+    assert 'b' not in cache
+    assert all(key in cache for key in ('a', 'c', 'd'))
+    assert cache.summary()['evictions'] == 1
+    assert len(cache) == 3
+    cache.close()
+
+
+def test_max_bytes_evicts_until_under_limit(tmp_path, clock):
+    cache = AIResponseCache(tmp_path / 'cache.db', max_bytes=10)
+    cache.set('a', entry('1234'))
+    cache.set('b', entry('5678'))
+    cache.set('c', entry('abcdefgh'))
+
+    assert 'a' not in cache and 'b' not in cache
+    assert 'c' in cache
+    summary = cache.summary()
+    assert summary['evictions'] == 2
+    assert summary['bytes'] == 8
+
+    # Reemplazar una entrada actualiza el total de bytes sin duplicarla
+    cache.set('c', entry('xy'))
+    assert cache.summary()['bytes'] == 2
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_limits_are_applied_when_opening_an_existing_cache(tmp_path, clock):
+    cache = AIResponseCache(tmp_path / 'cache.db')
+    for key in 'abcde':
+        cache.set(key, entry(key))
+    cache.close()
+
+    limited = AIResponseCache(tmp_path / 'cache.db', max_entries=2)
+    assert len(limited) == 2
+    assert 'd' in limited and 'e' in limited
+    assert limited.summary()['evictions'] == 3
+    limited.close()
+
+
+def test_expired_entries_are_swept_on_set_and_on_open(tmp_path):
+    cache = AIResponseCache(tmp_path / 'cache.db', ttl_hours=1)
+    cache.set('vieja', entry('caducada', age_hours=2))
+    assert 'vieja' not in cache
+    assert cache.summary()['expired'] == 1
+    cache.close()
+
+    permissive = AIResponseCache(tmp_path / 'cache.db')
+    permissive.set('antigua', entry('caducada', age_hours=2))
+    permissive.set('reciente', entry('vigente'))
+    permissive.close()
+
+    cache = AIResponseCache(tmp_path / 'cache.db', ttl_hours=1)
+    assert cache.summary()['expired'] == 1
+    assert 'antigua' not in cache and 'reciente' in cache
+    cache.close()
+
+
+def test_entry_that_expires_while_stored_is_a_miss(tmp_path):
+    cache = AIResponseCache(tmp_path / 'cache.db', ttl_hours=1)
+    cache.set('clave', entry('vigente'))
+    assert cache.get('clave')['content'] == 'vigente'
+
+    cache.conn.execute("UPDATE ai_cache SET timestamp = ? WHERE cache_key = 'clave'",
+                       ((datetime.now() - timedelta(hours=2)).isoformat(),))
+    cache.conn.commit()
+    assert cache.get('clave') is None
+    summary = cache.summary()
+    assert (summary['hits'], summary['misses'], summary['expired']) == (1, 1, 1)
+    assert summary['entries'] == 0 and summary['bytes'] == 0
+    cache.close()
+
+
+def test_upgrades_cache_created_without_size_columns(tmp_path):
+    db_path = tmp_path / 'cache.db'
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE ai_cache (cache_key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+        "content_type TEXT, timestamp TEXT NOT NULL)"
+    )
+    conn.executemany("INSERT INTO ai_cache VALUES (?, ?, ?, ?)", [
+        ('a', 'ñandú', 'function_analysis', datetime.now().isoformat()),
+        ('b', 'texto', 'function_analysis', datetime.now().isoformat()),
+    ])
+    conn.commit()
+    conn.close()
+
+    cache = AIResponseCache(db_path)
+    columns = {row[1] for row in cache.conn.execute("PRAGMA table_info(ai_cache)")}
+    assert {'size', 'last_access'} <= columns
+    assert cache.summary()['entries'] == 2
+    assert cache.summary()['bytes'] == len('ñandú'.encode('utf-8')) + len('texto')
+    assert cache.get('a')['content'] == 'ñandú'
+    cache.close()
+
+
+CRASHING_WRITER = """
+import os, sys
+sys.path.insert(0, sys.argv[1])
+from ai_cache import AIResponseCache
+cache = AIResponseCache(sys.argv[2])
+for index in range(20):
+    cache.set(f'clave{index}', {'content': 'x' * 100, 'timestamp': '2026-01-01T00:00:00'})
+# Transacción a medio escribir cuando el proceso muere
+cache.conn.execute("BEGIN")
+cache.conn.execute("INSERT INTO ai_cache (cache_key, content, timestamp) VALUES ('a_medias', 'y', 'z')")
+os._exit(1)
+"""
+
+
+def test_committed_entries_survive_a_crash(tmp_path):
+    db_path = tmp_path / 'cache.db'
+    process = subprocess.run(
+        [sys.executable, '-c', CRASHING_WRITER, str(BACKEND_PATH), str(db_path)], capture_output=True
+    )
+    assert process.returncode == 1
+
+    cache = AIResponseCache(db_path)
+    assert cache.conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+    assert len(cache) == 20
+    assert 'a_medias' not in cache
+    assert cache.get('clave19')['content'] == 'x' * 100
+    cache.close()
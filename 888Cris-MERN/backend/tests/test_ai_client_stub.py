@@ -0,0 +1,80 @@
+# Cliente HTTP de AIDocumentationEnhancer contra un servidor local: sesión compartida
+# con conexiones keep-alive, respuestas completas y en streaming
+
+import asyncio
+
+from conftest import completion_response, sse_response, stub_server
+
+
+def test_requests_reuse_one_session_and_connection(make_enhancer):
+    peers = []
+
+    async def handler(request):
+        peers.append(request.transport.get_extra_info('peername'))
+        body = await request.json()
+        return completion_response(f"respuesta {body['messages'][-1]['content']}")
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=0) as enhancer:
+                session = enhancer._session
+                answers = [
+                    await enhancer.call_openai_api(enhancer._build_messages(f"p{index}"), label="prueba")
+                    for index in range(3)
+                ]
+                assert enhancer._session is session
+            assert enhancer._session is None
+            assert session.closed
+        return answers
+
+    answers = asyncio.run(scenario())
+
+    assert answers == ["respuesta p0", "respuesta p1", "respuesta p2"]
+    # Las tres peticiones secuenciales viajan por la misma conexión keep-alive
+    assert len(peers) == 3
+    assert len(set(peers)) == 1
+
+
+def test_stream_openai_api_yields_deltas_as_they_arrive(make_enhancer):
+    payloads = []
+
+    async def handler(request):
+        payloads.append(await request.json())
+        return await sse_response(request, ["Primer ", "párrafo.\n\n", "Segundo ", "párrafo."])
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=0) as enhancer:
+                deltas = [
+                    delta async for delta in
+                    enhancer.stream_openai_api(enhancer._build_messages("resumen"), label="resumen")
+                ]
+                return deltas, enhancer.token_summary()
+
+    deltas, summary = asyncio.run(scenario())
+
+    assert payloads[0]['stream'] is True
+    assert deltas == ["Primer ", "párrafo.\n\n", "Segundo ", "párrafo."]
+    assert summary['resumen']['requests'] == 1
+    assert summary['resumen']['completion_tokens'] == 4
+
+
+def test_streamed_prompt_is_cached_and_replayed(make_enhancer):
+    requests = []
+
+    async def handler(request):
+        requests.append(await request.json())
+        return await sse_response(request, ["Uno.\n\n", "Dos."])
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=0) as enhancer:
+                first = [delta async for delta in enhancer.stream_prompt("arquitectura", "architecture_analysis")]
+                second = [delta async for delta in enhancer.stream_prompt("arquitectura", "architecture_analysis")]
+                return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == ["Uno.\n\n", "Dos."]
+    assert second == ["Uno.\n\nDos."]
+    assert len(requests) == 1
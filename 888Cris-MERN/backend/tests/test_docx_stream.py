@@ -0,0 +1,88 @@
+# Escritura en streaming de documentos Word: volcado por secciones, save() y lectura
+# del .docx resultante con python-docx
+
+from docx import Document
+from docx.shared import Pt
+
+from docx_stream import ParagraphEmitter, StreamingDocumentWriter
+from generate_documentation import RUN_FORMATS, add_character_styles
+
+
+def paragraph_texts(path):
+    return [paragraph.text for paragraph in Document(str(path)).paragraphs]
+
+
+def test_flushed_sections_round_trip_in_order(tmp_path):
+    document = Document()
+    add_character_styles(document)
+    writer = StreamingDocumentWriter(document)
+    emitter = ParagraphEmitter(document, RUN_FORMATS)
+    expected = []
+
+    for section in range(3):
+        document.add_heading(f'Sección {section}', level=1)
+        expected.append(f'Sección {section}')
+        for index in range(4):
+            paragraph = document.add_paragraph(f'Párrafo {section}.{index} — ñandú')
+            paragraph.runs[0].font.size = Pt(10)
+            expected.append(f'Párrafo {section}.{index} — ñandú')
+        emitter.add_paragraphs([
+            [('Archivo: ', 'bold'), (f'modulo{section}.js', 'code_identifier')],
+            [('  sangría conservada  ', None)],
+        ])
+        expected += [f'Archivo: modulo{section}.js', '  sangría conservada  ']
+        writer.flush()
+        # Tras el volcado solo queda sectPr en el árbol en memoria
+        assert len(document.element.body) == 1
+
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = 'tabla'
+    document.add_paragraph('Pendiente sin volcar')
+    expected.append('Pendiente sin volcar')
+
+    output = tmp_path / 'documento.docx'
+    writer.save(output)
+    assert paragraph_texts(output) == expected
+    reopened = Document(str(output))
+    assert reopened.tables[0].cell(0, 0).text == 'tabla'
+    assert reopened.paragraphs[0].style.name == 'Heading 1'
+    runs = reopened.paragraphs[5].runs
+    assert [run.style.name for run in runs] == ['MetricLabel', 'CodeIdentifier']
+
+    # Un segundo save() conserva lo volcado y añade lo escrito después
+    document.add_paragraph('Apéndice')
+    writer.save(output)
+    writer.close()
+    assert paragraph_texts(output) == expected + ['Apéndice']
+
+
+def test_sections_rendered_apart_are_appended_in_order(tmp_path):
+    document = Document()
+    writer = StreamingDocumentWriter(document)
+    document.add_paragraph('Inicio')
+
+    fragments = []
+    for name in ('auth', 'cargas', 'qr'):
+        section = StreamingDocumentWriter(Document())
+        section.document.add_paragraph(f'Módulo {name}')
+        section.flush()
+        section.document.add_paragraph(f'Fin {name}')
+        fragments.append(section.collect())
+
+    for fragment in reversed(fragments):
+        writer.append(fragment)
+
+    output = tmp_path / 'documento.docx'
+    writer.save(output)
+    writer.close()
+    assert paragraph_texts(output) == [
+        'Inicio', 'Módulo qr', 'Fin qr', 'Módulo cargas', 'Fin cargas', 'Módulo auth', 'Fin auth'
+    ]
+
+
+def test_save_without_content_gives_empty_document(tmp_path):
+    writer = StreamingDocumentWriter(Document())
+    output = tmp_path / 'vacio.docx'
+    writer.save(output)
+    writer.close()
+    assert paragraph_texts(output) == []
@@ -0,0 +1,122 @@
+# Escáner léxico de JavaScript: comentarios, strings, templates, regex literales y entradas
+# str / bytes / mmap
+
+import pytest
+
+from js_lexer import count_lines, scan_javascript
+from source_walker import MMAP_THRESHOLD, map_source
+
+
+def comments(code):
+    return [text for _, text in scan_javascript(code)['comments']]
+
+
+@pytest.mark.parametrize('code', [
+    "const url = 'http://888cargo.com // ruta'; // real",
+    'const texto = "/* no es comentario */"; // real',
+    "const escapada = 'it\\'s // dentro'; // real",
+])
+def test_comment_markers_inside_strings_are_ignored(code):
+    assert comments(code) == ['real']
+
+
+def test_comment_markers_inside_templates_are_ignored():
+    code = "const t = `a // no ${ valor /* expresión */ } /* tampoco */ b`; // real"
+    assert comments(code) == ['real']
+
+
+def test_comment_markers_inside_regex_literals_are_ignored():
+    code = "const patron = /\\/\\/ [/*] .*\\/\\*/g; // real\nfunction despues() {}"
+    result = scan_javascript(code)
+    assert [text for _, text in result['comments']] == ['real']
+    assert result['functions'] == ['despues']
+
+
+def test_nested_template_expressions():
+    code = (
+        "const t = `a ${ `b ${ { clave: 1 }.clave } // no` } ${ fn({ x: `c` }) } d`;\n"
+        "const u = `function falsa() {}`;\n"
+        "function real() { return `${ `${ 1 }` }`; }\n"
+        "// después"
+    )
+    result = scan_javascript(code)
+    assert result['functions'] == ['real']
+    assert [text for _, text in result['comments']] == ['después']
+
+
+@pytest.mark.parametrize('code', [
+    "const media = total / cuenta / 2; // división\nfunction f() {}",
+    "const x = (a + b) / c; // división\nfunction f() {}",
+    "const y = arr[0] / 4; // división\nfunction f() {}",
+])
+def test_division_is_not_a_regex(code):
+    result = scan_javascript(code)
+    assert [text for _, text in result['comments']] == ['división']
+    assert result['functions'] == ['f']
+
+
+@pytest.mark.parametrize('code', [
+    "const ok = /a\\/b/.test(s); // regex\nfunction f() {}",
+    "function f() { return /[/]\\/\\//.test(s); } // regex",
+    "const no = !/} \\/ {/.exec(s); // regex\nfunction f() {}",
+    "const lista = [/a/, /b/g]; // regex\nfunction f() {}",
+])
+def test_regex_literal_after_operator_or_keyword(code):
+    result = scan_javascript(code)
+    assert [text for _, text in result['comments']] == ['regex']
+    assert result['functions'] == ['f']
+
+
+def test_comment_kinds_and_structure():
+    code = (
+        "/** Servicio de cargas */\n"
+        "import db from '../db.js';\n"
+        "const fs = require('fs');\n"
+        "/* bloque */\n"
+        "export class CargaService {\n"
+        "  static crear(datos) { return datos ?? {}; }\n"
+        "  listar() { if (a && b) { return 1; } }\n"
+        "}\n"
+        "const utilidades = { formatear: (v) => v, validar: function () {} };\n"
+        "export const buscar = async (id) => id ? db.get(id) : null;\n"
+    )
+    result = scan_javascript(code)
+    assert result['comments'] == [('jsdoc', 'Servicio de cargas'), ('block', 'bloque')]
+    assert result['imports'] == ['../db.js', 'fs']
+    assert result['classes'] == ['CargaService']
+    assert result['exports'] == ['CargaService', 'buscar']
+    assert result['functions'] == ['buscar']
+    assert result['methods'] == ['listar']
+    assert result['static_methods'] == ['crear']
+    assert result['object_methods'] == ['formatear', 'validar']
+    # if, &&, ?
+    assert result['complexity_score'] == 3
+
+
+def without_offsets(result):
+    return {key: value for key, value in result.items() if key != 'declaration_offsets'}
+
+
+def test_str_bytes_and_mmap_inputs_agree(tmp_path):
+    block = (
+        "// Gestión de códigos QR — ñandú\n"
+        "const plantilla = `QR ${ `${ id }` } // no`;\n"
+        "const patron = /[/]qr\\/\\d+/g; // patrón\n"
+        "export async function generarQR(id) { return id > 0 ? patron.test(id) : false; }\n"
+    )
+    code = block * (MMAP_THRESHOLD // len(block.encode('utf-8')) + 2)
+    path = tmp_path / 'qr.service.js'
+    path.write_text(code, encoding='utf-8')
+
+    from_str = scan_javascript(code)
+    from_bytes = scan_javascript(code.encode('utf-8'))
+    with map_source(path) as buffer:
+        assert not isinstance(buffer, bytes)  # mmap por encima del umbral
+        from_mmap = scan_javascript(buffer)
+        assert count_lines(buffer) == count_lines(code)
+
+    assert without_offsets(from_bytes) == without_offsets(from_str)
+    assert without_offsets(from_mmap) == without_offsets(from_str)
+    assert from_mmap['declaration_offsets'] == from_bytes['declaration_offsets']
+    assert from_str['comments'][0] == ('line', 'Gestión de códigos QR — ñandú')
+    assert len(from_str['functions']) == code.count('function generarQR')
@@ -0,0 +1,148 @@
+# Reintentos del cliente de IA ante 429 contra un servidor local y cuota por minuto
+
+import asyncio
+import time
+from email.utils import formatdate
+
+from aiohttp import web
+
+from ai_rate_limit import TokenBucket, parse_retry_after
+from conftest import completion_response, stub_server
+
+
+def rate_limited_handler(rejections, retry_after='0.2', status=429):
+    """Responde status (con Retry-After) a las primeras peticiones y 200 al resto"""
+    arrivals = []
+
+    async def handler(request):
+        arrivals.append(time.monotonic())
+        if len(arrivals) <= rejections:
+            return web.json_response(
+                {'error': {'message': 'Rate limit reached'}}, status=status,
+                headers={'Retry-After': retry_after}
+            )
+        return completion_response("contenido generado")
+
+    return handler, arrivals
+
+
+def test_429_is_retried_after_retry_after(make_enhancer):
+    handler, arrivals = rate_limited_handler(rejections=2)
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            # Backoff base muy alto: si el reintento llega pronto es porque se usó Retry-After
+            async with make_enhancer(url, retry_attempts=3, retry_base_delay=30) as enhancer:
+                return await enhancer.call_openai_api(enhancer._build_messages("hola"), label="prueba")
+
+    content = asyncio.run(scenario())
+
+    assert content == "contenido generado"
+    assert len(arrivals) == 3
+    gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+    assert all(0.2 <= gap < 5 for gap in gaps)
+
+
+def test_retry_after_is_capped_by_retry_max_delay(make_enhancer):
+    handler, arrivals = rate_limited_handler(rejections=1, retry_after='3600')
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=1, retry_max_delay=0.2) as enhancer:
+                return await enhancer.call_openai_api(enhancer._build_messages("hola"), label="prueba")
+
+    start = time.monotonic()
+    assert asyncio.run(scenario()) == "contenido generado"
+    assert time.monotonic() - start < 5
+    assert 0.2 <= arrivals[1] - arrivals[0] < 5
+
+
+def test_failed_attempts_refund_reserved_tokens(make_enhancer):
+    async def remaining_tokens(rejections):
+        handler, arrivals = rate_limited_handler(rejections=rejections, retry_after='0')
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=2, max_tokens=100, tokens_per_minute=600) as enhancer:
+                await enhancer.call_openai_api(enhancer._build_messages("hola"), label="prueba")
+                assert len(arrivals) == rejections + 1
+                return enhancer.rate_limiter.tokens.tokens
+
+    # Solo la petición atendida consume cuota: los dos 429 previos no gastan tokens
+    served_directly = asyncio.run(remaining_tokens(0))
+    served_after_429s = asyncio.run(remaining_tokens(2))
+    assert served_directly < 600
+    assert abs(served_after_429s - served_directly) < 5
+
+
+def test_429_pauses_concurrent_requests(make_enhancer):
+    handler, arrivals = rate_limited_handler(rejections=1, retry_after='0.3')
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=2) as enhancer:
+                first = asyncio.create_task(
+                    enhancer.call_openai_api(enhancer._build_messages("uno"), label="prueba")
+                )
+                # La segunda petición sale cuando la primera ya recibió el 429
+                while not arrivals:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                second = enhancer.call_openai_api(enhancer._build_messages("dos"), label="prueba")
+                return await asyncio.gather(first, second)
+
+    results = asyncio.run(scenario())
+
+    assert results == ["contenido generado", "contenido generado"]
+    # Tras el 429 ninguna petición llega antes de que venza el Retry-After
+    assert len(arrivals) == 3
+    assert min(arrivals[1:]) - arrivals[0] >= 0.3
+
+
+def test_exhausted_retries_fall_back_to_static_content(make_enhancer):
+    handler, arrivals = rate_limited_handler(rejections=10, retry_after='0')
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=2, cache_enabled=False) as enhancer:
+                content = await enhancer.enhance_content('architecture_overview', {})
+                return content, enhancer._get_fallback_content('architecture_overview', {})
+
+    content, fallback = asyncio.run(scenario())
+
+    assert len(arrivals) == 3
+    assert content == fallback
+
+
+def test_client_errors_are_not_retried(make_enhancer):
+    handler, arrivals = rate_limited_handler(rejections=10, status=400)
+
+    async def scenario():
+        async with stub_server(handler) as url:
+            async with make_enhancer(url, retry_attempts=3) as enhancer:
+                try:
+                    await enhancer.call_openai_api(enhancer._build_messages("hola"))
+                except Exception as e:
+                    return e
+
+    error = asyncio.run(scenario())
+
+    assert getattr(error, 'status', None) == 400
+    assert len(arrivals) == 1
+
+
+def test_parse_retry_after_formats():
+    assert parse_retry_after({'Retry-After': '7'}) == 7.0
+    assert parse_retry_after({'retry-after-ms': '250', 'Retry-After': '7'}) == 0.25
+    assert 8 <= parse_retry_after({'Retry-After': formatdate(time.time() + 10, usegmt=True)}) <= 10
+    assert parse_retry_after({}) is None
+
+
+def test_token_bucket_holds_requests_to_the_quota():
+    async def scenario():
+        bucket = TokenBucket(rate_per_minute=120, capacity=2)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Dos unidades de capacidad: la tercera espera medio segundo (120 por minuto)
+    assert 0.4 <= asyncio.run(scenario()) < 2
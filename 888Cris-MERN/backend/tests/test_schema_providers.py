@@ -0,0 +1,196 @@
+# Proveedores de esquema contra una base SQLite creada con migrations/ y, para el proveedor
+# de information_schema, un catálogo estilo MySQL adjuntado a esa misma base (sin servidor)
+
+import sqlite3
+import threading
+
+import pytest
+
+from analysis_core import AnalysisEngine
+from conftest import BACKEND_PATH
+from schema_providers import (
+    InformationSchemaProvider, SchemaProvider, SQLiteSchemaProvider, find_sqlite_database, format_row_count,
+    schema_provider_from_env
+)
+
+SCHEMA = '888cargo'
+
+INFORMATION_SCHEMA_TABLES = """
+CREATE TABLE tables (table_schema, table_name, table_type, table_rows);
+CREATE TABLE columns (table_schema, table_name, ordinal_position, column_name, data_type, is_nullable, column_default);
+CREATE TABLE table_constraints (constraint_schema, table_schema, table_name, constraint_name, constraint_type);
+CREATE TABLE key_column_usage (constraint_schema, table_schema, table_name, constraint_name, column_name,
+                               ordinal_position, referenced_table_name, referenced_column_name);
+CREATE TABLE referential_constraints (constraint_schema, constraint_name, table_name, update_rule, delete_rule);
+CREATE TABLE statistics (table_schema, table_name, index_name, non_unique, seq_in_index, column_name);
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Proyecto con backend/ y db/packing_list.db creada a partir de las migraciones"""
+    (tmp_path / 'backend').mkdir()
+    (tmp_path / 'db').mkdir()
+    db_path = tmp_path / 'db' / 'packing_list.db'
+    conn = sqlite3.connect(db_path)
+    for migration in sorted((BACKEND_PATH / 'migrations').glob('*.sql')):
+        conn.executescript(migration.read_text(encoding='utf-8'))
+    conn.commit()
+    conn.close()
+    return tmp_path
+
+
+def build_information_schema(path, schema_info):
+    """Catálogo information_schema (estilo MySQL) equivalente al esquema SQLite analizado"""
+    conn = sqlite3.connect(path)
+    conn.executescript(INFORMATION_SCHEMA_TABLES)
+    for table, table_info in schema_info.items():
+        conn.execute("INSERT INTO tables VALUES (?, ?, 'BASE TABLE', 10)", (SCHEMA, table))
+        for column in table_info['columns']:
+            conn.execute("INSERT INTO columns VALUES (?, ?, ?, ?, ?, ?, ?)", (
+                SCHEMA, table, column['cid'] + 1, column['name'], (column['type'] or 'text').lower(),
+                'NO' if column['notnull'] or column['pk'] else 'YES', column['default']
+            ))
+        primary_key = sorted((column['pk'], column['name']) for column in table_info['columns'] if column['pk'])
+        if primary_key:
+            conn.execute("INSERT INTO table_constraints VALUES (?, ?, ?, 'PRIMARY', 'PRIMARY KEY')", (SCHEMA, SCHEMA, table))
+        for position, name in primary_key:
+            conn.execute("INSERT INTO key_column_usage VALUES (?, ?, ?, 'PRIMARY', ?, ?, NULL, NULL)",
+                         (SCHEMA, SCHEMA, table, name, position))
+            conn.execute("INSERT INTO statistics VALUES (?, ?, 'PRIMARY', 0, ?, ?)", (SCHEMA, table, position, name))
+        for index in table_info['indexes']:
+            if index['origin'] == 'pk':
+                continue
+            for position, name in enumerate(index['columns'], 1):
+                conn.execute("INSERT INTO statistics VALUES (?, ?, ?, ?, ?, ?)",
+                             (SCHEMA, table, index['name'], 0 if index['unique'] else 1, position, name))
+        for foreign_key in table_info['foreign_keys']:
+            name = f"fk_{table}_{foreign_key['id']}"
+            conn.execute("INSERT INTO referential_constraints VALUES (?, ?, ?, ?, ?)",
+                         (SCHEMA, name, table, foreign_key['on_update'], foreign_key['on_delete']))
+            columns = zip(foreign_key['columns'], foreign_key['referenced_columns'])
+            for position, (column, referenced) in enumerate(columns, 1):
+                conn.execute("INSERT INTO key_column_usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (SCHEMA, SCHEMA, table, name, column, position, foreign_key['references'], referenced))
+    conn.commit()
+    conn.close()
+
+
+def column_summary(schema_info):
+    return {
+        table: [(column['name'], column['pk'], bool(column['notnull'] or column['pk'])) for column in info['columns']]
+        for table, info in schema_info.items()
+    }
+
+
+def foreign_key_summary(schema_info):
+    return {
+        table: [(fk['columns'], fk['references'], fk['referenced_columns']) for fk in info['foreign_keys']]
+        for table, info in schema_info.items()
+    }
+
+
+def test_find_sqlite_database_prefers_database_path(project, monkeypatch):
+    monkeypatch.delenv('DATABASE_PATH', raising=False)
+    assert find_sqlite_database(project / 'backend') == project / 'db' / 'packing_list.db'
+
+    (project / 'data').mkdir()
+    custom = project / 'data' / 'custom.db'
+    sqlite3.connect(custom).close()
+    monkeypatch.setenv('DATABASE_PATH', 'data/custom.db')
+    assert find_sqlite_database(project / 'backend') == custom
+
+
+def test_sqlite_provider_reads_migrated_schema(project, monkeypatch):
+    monkeypatch.delenv('DATABASE_PATH', raising=False)
+    engine = AnalysisEngine(project / 'backend')
+    schema_info = engine.analyze_database_schema()
+    performance = engine.analyze_database_performance(schema_info)
+
+    assert {'carga', 'articulo_packing_list', 'caja', 'qr', 'clientes'} <= set(schema_info)
+    assert ('id_carga', 1, True) in column_summary(schema_info)['carga']
+    assert (['id_carga'], 'carga', ['id_carga']) in foreign_key_summary(schema_info)['articulo_packing_list']
+    # Sin sqlite_stat1 el número de filas es una estimación
+    assert schema_info['carga']['row_count_exact'] is False
+
+    assert performance['page_size'] > 0
+    assert len(performance['query_plans']) > 0
+    assert all(plan.get('error') is None for plan in performance['query_plans'])
+
+    # Los generadores describen el origen del esquema con la descripción del proveedor
+    assert AnalysisEngine(project / 'backend').scan().database_description == 'SQLite packing_list.db'
+
+
+def test_sqlite_provider_exact_counts_and_fingerprint(project):
+    db_path = project / 'db' / 'packing_list.db'
+    provider = SQLiteSchemaProvider(db_path, exact_row_counts=True)
+    schema_info = provider.analyze_schema()
+    assert schema_info['carga']['row_count'] == 0
+    assert schema_info['carga']['row_count_exact'] is True
+    assert format_row_count(schema_info['carga']) == '0'
+
+    before = provider.fingerprint()
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE auditoria (id INTEGER PRIMARY KEY, detalle TEXT)")
+    conn.commit()
+    conn.close()
+    assert provider.fingerprint() != before
+
+
+def test_information_schema_provider_matches_sqlite(project):
+    db_path = project / 'db' / 'packing_list.db'
+    sqlite_schema = SQLiteSchemaProvider(db_path).analyze_schema()
+    catalog = project / 'information_schema.db'
+    build_information_schema(catalog, sqlite_schema)
+
+    opened = []
+
+    def connect():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute(f"ATTACH DATABASE '{catalog}' AS information_schema")
+        opened.append(threading.get_ident())
+        return conn
+
+    with InformationSchemaProvider(connect, SCHEMA, dialect='mysql', paramstyle='qmark', pool_size=3) as provider:
+        engine = AnalysisEngine(project / 'backend', schema_provider=provider)
+        schema_info = engine.analyze_database_schema()
+        performance = engine.analyze_database_performance(schema_info)
+        fingerprint = provider.fingerprint()
+
+    assert column_summary(schema_info) == column_summary(sqlite_schema)
+    assert foreign_key_summary(schema_info) == foreign_key_summary(sqlite_schema)
+    # Los catálogos se consultan en paralelo sin superar el tamaño del pool
+    assert 1 <= len(opened) <= 3
+    # Estimación de table_rows del catálogo
+    assert format_row_count(schema_info['carga']) == '≈10'
+    assert performance['query_plans'] == []
+    sqlite_performance = SQLiteSchemaProvider(db_path).analyze_performance(sqlite_schema)
+    assert sorted(map(str, performance['unindexed_foreign_keys'])) == sorted(
+        map(str, sqlite_performance['unindexed_foreign_keys']))
+    assert fingerprint.startswith(f"mysql {SCHEMA}:")
+
+    exact = InformationSchemaProvider(connect, SCHEMA, paramstyle='qmark', exact_row_counts=True)
+    assert format_row_count(exact.analyze_schema()['carga']) == '0'
+    exact.close()
+
+
+def test_provider_without_analyze_schema_cannot_be_created():
+    class IncompleteProvider(SchemaProvider):
+        description = 'incompleto'
+
+    with pytest.raises(TypeError):
+        IncompleteProvider()
+
+
+def test_information_schema_provider_rejects_unknown_dialect():
+    with pytest.raises(ValueError):
+        InformationSchemaProvider(lambda: None, SCHEMA, dialect='oracle')
+
+
+def test_schema_provider_from_env(monkeypatch):
+    monkeypatch.delenv('DOC_DB_DRIVER', raising=False)
+    assert schema_provider_from_env() is None
+
+    # Un driver no instalado deja paso a la base de datos SQLite local
+    monkeypatch.setenv('DOC_DB_DRIVER', 'driver_inexistente_888cargo')
+    assert schema_provider_from_env() is None
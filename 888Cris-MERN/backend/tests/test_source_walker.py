@@ -0,0 +1,68 @@
+# Recorrido de fuentes: .gitignore del repositorio y del proyecto aplicados al backend
+
+from analysis_core import AnalysisEngine
+from source_walker import find_ignore_root, walk_source_files
+
+
+def make_tree(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def walked(engine, directory):
+    return sorted(str(path.relative_to(engine.backend_path)) for path in engine.directory_js_files(directory))
+
+
+def test_parent_gitignore_excludes_files_under_backend(tmp_path):
+    (tmp_path / '.git').mkdir()
+    make_tree(tmp_path, {
+        '.gitignore': 'dist/\n',
+        'app/.gitignore': 'logs/\n/backend/config/local.js\n',
+        'app/backend/controllers/a.controller.js': 'export const a = () => 1;\n',
+        'app/backend/controllers/dist/bundle.js': 'var x;\n',
+        'app/backend/controllers/logs/trace.js': 'var y;\n',
+        'app/backend/config/local.js': 'var z;\n',
+        'app/backend/config/db.js': 'var w;\n',
+    })
+    backend = tmp_path / 'app' / 'backend'
+    engine = AnalysisEngine(backend)
+
+    assert find_ignore_root(backend) == tmp_path.resolve()
+    assert walked(engine, backend / 'controllers') == ['controllers/a.controller.js']
+    assert walked(engine, backend / 'config') == ['config/db.js']
+
+
+def test_project_root_rules_apply_outside_a_repository(tmp_path):
+    make_tree(tmp_path, {
+        'project/.gitignore': 'build/\n!build/keep.js\n',
+        'project/backend/utils/build/out.js': 'var a;\n',
+        'project/backend/utils/build/keep.js': 'var b;\n',
+        'project/backend/utils/format.js': 'var c;\n',
+    })
+    backend = tmp_path / 'project' / 'backend'
+    engine = AnalysisEngine(backend)
+
+    assert engine.ignore_root == (tmp_path / 'project').resolve()
+    # Como en git, un archivo no se re-incluye si su directorio está ignorado
+    assert walked(engine, backend / 'utils') == ['utils/format.js']
+
+
+def test_rules_are_relative_to_their_gitignore(tmp_path):
+    (tmp_path / '.git').mkdir()
+    make_tree(tmp_path, {
+        '.gitignore': '/generated.js\n',
+        'backend/generated.js': 'var a;\n',
+        'backend/services/.gitignore': '*.min.js\n',
+        'backend/services/app.min.js': 'var b;\n',
+        'backend/services/app.js': 'var c;\n',
+    })
+    backend = tmp_path / 'backend'
+
+    files = [path.name for path, _ in walk_source_files(backend, ignore_root=tmp_path)]
+    # '/generated.js' está anclado a la raíz del repositorio, no al backend
+    assert files == ['generated.js', 'app.js']
+    assert [path.name for path, _ in walk_source_files(backend, use_gitignore=False)] == [
+        'generated.js', 'app.js', 'app.min.js'
+    ]